@@ -9,21 +9,41 @@ from typing import List, Tuple, Optional, Dict
 from dataclasses import dataclass
 import math
 import random
+import time
+
+class PlanStatus:
+    """
+    规划结果状态码
+    """
+    SUCCESS = 'success'                # 找到完整路径
+    NO_PATH = 'no_path'                # 搜索空间耗尽，无可行路径
+    TIMEOUT = 'timeout'                # 超过时间预算，返回部分路径
+    MAX_ITERATIONS = 'max_iterations'  # 超过迭代预算，返回部分路径
 
-@dataclass
 class VehicleState:
     """
     车辆状态数据结构
     
     包含车辆的位置、姿态和运动状态
+    
+    搜索中每个节点都会创建一个状态，用__slots__代替dataclass，
+    去掉每个对象的__dict__，节省内存和创建时间
     """
-    x: float          # X坐标 (米)
-    y: float          # Y坐标 (米)
-    theta: float      # 航向角 (弧度)
-    gear: int         # 挡位: 1(前进), -1(后退)
-    cost: float       # 到达此状态的代价
-    parent: Optional['VehicleState'] = None  # 父状态
-    action: Optional[str] = None  # 到达此状态的动作
+    __slots__ = ('x', 'y', 'theta', 'gear', 'cost', 'parent', 'action')
+    
+    def __init__(self, x: float, y: float, theta: float, gear: int, cost: float,
+                 parent: Optional['VehicleState'] = None, action: Optional[str] = None):
+        self.x = x            # X坐标 (米)
+        self.y = y            # Y坐标 (米)
+        self.theta = theta    # 航向角 (弧度)
+        self.gear = gear      # 挡位: 1(前进), -1(后退)
+        self.cost = cost      # 到达此状态的代价
+        self.parent = parent  # 父状态
+        self.action = action  # 到达此状态的动作
+    
+    def __repr__(self) -> str:
+        return (f"VehicleState(x={self.x}, y={self.y}, theta={self.theta}, "
+                f"gear={self.gear}, cost={self.cost}, action={self.action!r})")
 
 @dataclass
 class VehicleParams:
@@ -50,18 +70,30 @@ class HybridAStar:
     4. 优化路径的平滑性和效率
     """
     
-    def __init__(self, grid_map, vehicle_params: VehicleParams):
+    def __init__(self, grid_map, vehicle_params: VehicleParams, collision_mode: str = 'corners'):
         """
         初始化Hybrid A*算法
         
         Args:
             grid_map: 栅格地图，0表示可通行，1表示障碍物
             vehicle_params: 车辆参数
+            collision_mode: 碰撞检测方式
+                - 'corners': 检查车辆四个角点
+                - 'circles': 圆覆盖车身 + 距离变换查表
         """
         self.grid_map = grid_map
         self.vehicle_params = vehicle_params
         self.height, self.width = grid_map.shape
         
+        if collision_mode not in ('corners', 'circles'):
+            raise ValueError(f"未知的碰撞检测方式: {collision_mode}")
+        self.collision_mode = collision_mode
+        if collision_mode == 'circles':
+            self._init_circle_collision()
+        
+        # 最近一次搜索的状态码
+        self.status = PlanStatus.NO_PATH
+        
         # 搜索方向：直行、左转、右转
         self.directions = [0, vehicle_params.max_steer, -vehicle_params.max_steer]
         
@@ -160,6 +192,54 @@ class HybridAStar:
         
         return new_state
     
+    def _init_circle_collision(self):
+        """
+        初始化圆覆盖碰撞检测
+        
+        用n个圆沿车身纵轴覆盖车辆矩形，并预计算距离变换图:
+        每个圆只需一次查表，同一张图还能直接给出障碍物代价
+        """
+        from scipy.ndimage import distance_transform_edt
+        
+        length = self.vehicle_params.length
+        width = self.vehicle_params.width
+        n_circles = max(1, int(math.ceil(length / width)))
+        seg = length / n_circles
+        
+        # 圆心（车辆坐标系，车身中心为原点）与半径
+        self.circle_offsets = [-length / 2 + seg * (i + 0.5) for i in range(n_circles)]
+        self.circle_radius = math.hypot(seg / 2, width / 2)
+        
+        # 每个格子中心到最近障碍物格子中心的距离 (米)，
+        # 外围补一圈障碍物，使地图边界也产生距离
+        free = np.pad(self.grid_map != 1, 1, mode='constant', constant_values=False)
+        self.distance_map = distance_transform_edt(free)[1:-1, 1:-1]
+    
+    def _get_circle_clearances(self, state: VehicleState) -> List[float]:
+        """
+        计算每个覆盖圆到障碍物的净空（距离图查表）
+        
+        Args:
+            state: 车辆状态
+            
+        Returns:
+            clearances: 每个圆的净空 (米)，地图外的圆净空为 -半径（视为碰撞）
+        """
+        cos_theta = math.cos(state.theta)
+        sin_theta = math.sin(state.theta)
+        
+        clearances = []
+        for offset in self.circle_offsets:
+            # floor而不是int: 地图左/下边界外 (-1, 0) 内的圆心不能截断到第0格
+            grid_x = math.floor(state.x + offset * cos_theta)
+            grid_y = math.floor(state.y + offset * sin_theta)
+            if 0 <= grid_x < self.width and 0 <= grid_y < self.height:
+                clearances.append(self.distance_map[grid_y, grid_x] - self.circle_radius)
+            else:
+                clearances.append(-self.circle_radius)
+        
+        return clearances
+    
     def _is_collision(self, state: VehicleState) -> bool:
         """
         检查车辆是否与障碍物碰撞
@@ -170,6 +250,11 @@ class HybridAStar:
         Returns:
             is_collision: 是否碰撞
         """
+        if self.collision_mode == 'circles':
+            # 距离图是格子中心之间的距离，圆心和障碍物都可能在各自格子内任意位置，
+            # 各差半条对角线 → 净空小于√2时圆可能与障碍物格子重叠
+            return any(c < math.sqrt(2) for c in self._get_circle_clearances(state))
+        
         # 计算车辆四个角点的世界坐标
         corners = self._get_vehicle_corners(state)
         
@@ -265,6 +350,14 @@ class HybridAStar:
         # 计算车辆周围的安全距离
         safety_distance = 1.0  # 安全距离 (米)
         
+        if self.collision_mode == 'circles':
+            # 直接复用距离变换图，无需扫描邻域
+            clearances = self._get_circle_clearances(state)
+            min_distance = min(clearances) if clearances else float('inf')
+            if min_distance < safety_distance:
+                return 1.0 / (max(min_distance, 0.0) + 0.1)
+            return 0.0
+        
         # 检查车辆周围的安全区域
         corners = self._get_vehicle_corners(state)
         
@@ -289,17 +382,27 @@ class HybridAStar:
         return 0.0
     
     def search(self, start: Tuple[float, float, float], 
-               goal: Tuple[float, float, float]) -> Optional[List[VehicleState]]:
+               goal: Tuple[float, float, float],
+               max_iterations: int = 50000,
+               deadline_ms: Optional[float] = None) -> Optional[List[VehicleState]]:
         """
         执行Hybrid A*搜索
         
         Args:
             start: 起始状态 (x, y, theta)
             goal: 目标状态 (x, y, theta)
+            max_iterations: 最大迭代次数
+            deadline_ms: 搜索时间上限 (毫秒)，None表示不限制
             
         Returns:
             path: 路径状态列表或None
+                  预算用尽时返回最接近目标（启发值最小）的部分路径，
+                  通过 self.status 区分完整路径和部分路径
         """
+        start_time = time.perf_counter()
+        deadline = None if deadline_ms is None else start_time + deadline_ms / 1000.0
+        self.status = PlanStatus.NO_PATH
+
         # 初始化起始状态
         start_state = VehicleState(
             x=start[0], y=start[1], theta=start[2],
@@ -314,10 +417,19 @@ class HybridAStar:
         start_key = self._discretize_state(start_state)
         g_score[start_key] = 0
 
-        max_iterations = 50000  # 最大迭代次数
+        # 最接近目标的状态（预算用尽时返回部分路径）
+        best_state = start_state
+        best_h = self.heuristic(start_state, goal)
+
         iteration = 0
 
-        while open_list and iteration < max_iterations:
+        while open_list:
+            if iteration >= max_iterations:
+                self.status = PlanStatus.MAX_ITERATIONS
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.status = PlanStatus.TIMEOUT
+                break
             iteration += 1
 
             # 取出代价最小的状态
@@ -326,6 +438,7 @@ class HybridAStar:
             # 检查是否到达目标
             if self._is_goal_reached(current_state, goal):
                 print(f"找到路径! 迭代次数: {iteration}")
+                self.status = PlanStatus.SUCCESS
                 return self._reconstruct_path(current_state)
 
             # 添加到关闭列表
@@ -334,6 +447,10 @@ class HybridAStar:
                 continue
             closed_set.add(state_key)
             
+            current_h = self.heuristic(current_state, goal)
+            if current_h < best_h:
+                best_state, best_h = current_state, current_h
+            
             # 扩展邻居状态
             neighbors = self.get_neighbors(current_state)
 
@@ -361,8 +478,13 @@ class HybridAStar:
                     counter += 1
                     heapq.heappush(open_list, (f_score, counter, neighbor_state))
 
-        if iteration >= max_iterations:
-            print(f"达到最大迭代次数 {max_iterations}，搜索终止")
+        if self.status == PlanStatus.MAX_ITERATIONS:
+            print(f"达到最大迭代次数 {max_iterations}，返回部分路径")
+            return self._reconstruct_path(best_state)
+        if self.status == PlanStatus.TIMEOUT:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(f"超过时间预算 ({elapsed_ms:.0f} ms)，返回部分路径")
+            return self._reconstruct_path(best_state)
 
         return None  # 未找到路径
     
@@ -791,7 +913,9 @@ def demo_hybrid_astar():
     print("开始路径规划...")
     path = planner.search(start, goal)
     
-    if path:
+    if path and planner.status != PlanStatus.SUCCESS:
+        print(f"路径规划未完成 ({planner.status})，部分路径长度: {len(path)} 个状态")
+    elif path:
         print(f"路径规划成功！路径长度: {len(path)} 个状态")
         print(f"总代价: {path[-1].cost:.2f}")
         
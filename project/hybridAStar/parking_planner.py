@@ -10,20 +10,30 @@ from dataclasses import dataclass
 import math
 import random
 
-@dataclass
 class VehicleState:
     """
     车辆状态数据结构
 
     包含车辆的位置、姿态和运动状态
+
+    搜索中每个节点都会创建一个状态，用__slots__代替dataclass，
+    去掉每个对象的__dict__，节省内存和创建时间
     """
-    x: float          # X坐标 (米)
-    y: float          # Y坐标 (米)
-    theta: float      # 航向角 (弧度)
-    gear: int         # 挡位: 1(前进), -1(后退)
-    cost: float       # 到达此状态的代价
-    parent: Optional['VehicleState'] = None  # 父状态
-    action: Optional[str] = None  # 到达此状态的动作
+    __slots__ = ('x', 'y', 'theta', 'gear', 'cost', 'parent', 'action')
+
+    def __init__(self, x: float, y: float, theta: float, gear: int, cost: float,
+                 parent: Optional['VehicleState'] = None, action: Optional[str] = None):
+        self.x = x            # X坐标 (米)
+        self.y = y            # Y坐标 (米)
+        self.theta = theta    # 航向角 (弧度)
+        self.gear = gear      # 挡位: 1(前进), -1(后退)
+        self.cost = cost      # 到达此状态的代价
+        self.parent = parent  # 父状态
+        self.action = action  # 到达此状态的动作
+
+    def __repr__(self) -> str:
+        return (f"VehicleState(x={self.x}, y={self.y}, theta={self.theta}, "
+                f"gear={self.gear}, cost={self.cost}, action={self.action!r})")
 
 @dataclass
 class VehicleParams:
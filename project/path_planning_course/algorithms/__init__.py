@@ -4,15 +4,27 @@
 包含:
 - A* 算法 (algorithms.a_star)
 - Hybrid A* 算法 (algorithms.hybrid_astar)
+- 碰撞检测 (algorithms.collision)
+- 多目标并行规划 (algorithms.multi_goal)
+- 搜索树导出 (algorithms.search_tree_io)
 """
 
 from .a_star import AStar, AStarNode
-from .hybrid_astar import HybridAStar, HybridAStarNode
+from .hybrid_astar import HybridAStar, HybridAStarNode, PlanStatus
+from .collision import FootprintCollisionChecker, CircleCollisionChecker
+from .multi_goal import plan_multi_goal
+from .search_tree_io import SearchTreeWriter, SearchTreeReader
 
 __all__ = [
     'AStar',
     'AStarNode',
     'HybridAStar',
     'HybridAStarNode',
+    'PlanStatus',
+    'FootprintCollisionChecker',
+    'CircleCollisionChecker',
+    'plan_multi_goal',
+    'SearchTreeWriter',
+    'SearchTreeReader',
 ]
 
@@ -0,0 +1,327 @@
+"""
+碰撞检测模块
+
+为Hybrid A*提供整车碰撞检测，车身是一个矩形，只检查后轴中心点是不安全的。
+
+两种后端:
+1. FootprintCollisionChecker: 矩形footprint只与朝向有关
+   → 按角度bin预先栅格化成掩码，再把占据网格按掩码膨胀成每个bin的碰撞表，
+     查询只需一次查表（与只检查参考点的代价相同）
+2. CircleCollisionChecker: 用几个圆覆盖车身
+   → 每个圆心在预计算的距离变换图上查一次表，同时给出净空代价
+
+网格约定:
+- grid[y, x]，每个格子边长 1m
+- 世界坐标 (x, y) 所在格子为 (int(x), int(y))
+- 地图外视为障碍物
+
+作者: Path Planning Course Team
+"""
+
+import math
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+class FootprintCollisionChecker:
+    """
+    基于预计算旋转掩码的整车碰撞检测器
+
+    对每个角度bin预先计算一个布尔掩码，标记车身可能覆盖的格子
+    （相对于参考点所在格子的偏移）。掩码是保守的:
+    - 参考点在格子内的任意位置
+    - 朝向在bin内的任意角度
+    都不会漏检。
+
+    使用方法:
+        >>> checker = FootprintCollisionChecker(grid, length=4.5, width=1.8)
+        >>> checker.collides(x, y, theta)
+    """
+
+    def __init__(
+        self,
+        grid: np.ndarray,
+        length: float,
+        width: float,
+        rear_overhang: Optional[float] = None,
+        n_yaw_bins: int = 72
+    ):
+        """
+        初始化footprint碰撞检测器
+
+        Args:
+            grid: 2D占据网格，0=空闲，非0=障碍物
+            length: 车身长度 (m)
+            width: 车身宽度 (m)
+            rear_overhang: 参考点到车尾的距离 (m)，默认length/2（参考点在车身中心）
+            n_yaw_bins: 角度bin数量（默认72，即5°一个bin）
+        """
+        self.length = length
+        self.width = width
+        self.rear_overhang = length / 2 if rear_overhang is None else rear_overhang
+        self.n_yaw_bins = n_yaw_bins
+        self.yaw_bin_size = 2 * np.pi / n_yaw_bins
+
+        # 预计算每个角度bin的掩码: (mask, (x0, y0))
+        self.masks: List[Tuple[np.ndarray, Tuple[int, int]]] = [
+            self._rasterize(k * self.yaw_bin_size) for k in range(n_yaw_bins)
+        ]
+
+        # 用障碍物填充边界，掩码覆盖的格子永远不会越界
+        self.pad = max(
+            max(abs(x0), abs(y0), mask.shape[0] + y0, mask.shape[1] + x0)
+            for mask, (x0, y0) in self.masks
+        )
+        self.occupancy = np.pad(
+            np.asarray(grid) != 0, self.pad, mode='constant', constant_values=True
+        )
+
+        # 每个bin的掩码格子（相对掩码左下角的行列），补齐到相同长度（重复第一个格子）
+        cells = [np.argwhere(mask) for mask, _ in self.masks]
+        max_cells = max(len(c) for c in cells)
+        cells = np.stack([np.vstack([c, np.repeat(c[:1], max_cells - len(c), axis=0)]) for c in cells])
+        origins = np.array([(y0, x0) for _, (x0, y0) in self.masks])
+
+        # 相对参考点格子的偏移
+        self.cell_offsets = cells + origins[:, None, :]  # (n_yaw_bins, max_cells, 2) → (dy, dx)
+
+        # 碰撞表: collision_table[k, iy, ix] = 参考点在格子(ix, iy)、朝向在bin k时车身是否碰撞，
+        # 即占据网格按bin k的掩码膨胀（每个掩码格子一次平移 + 或运算）。
+        # 查询只剩一次查表；内存 n_yaw_bins·H·W 字节（72个bin、200×200地图约2.9MB）
+        self.n_rows, self.n_cols = np.shape(grid)
+        self.collision_table = np.zeros((n_yaw_bins, self.n_rows, self.n_cols), dtype=bool)
+        for k in range(n_yaw_bins):
+            table = self.collision_table[k]
+            for dy, dx in np.unique(self.cell_offsets[k], axis=0) + self.pad:
+                table |= self.occupancy[dy:dy + self.n_rows, dx:dx + self.n_cols]
+
+    def _rasterize(self, theta: float) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        栅格化一个角度bin的车身footprint
+
+        Args:
+            theta: bin中心角度 (rad)
+
+        Returns:
+            (mask, (x0, y0)):
+                - mask: 布尔掩码，形状(h, w)
+                - (x0, y0): 掩码左下角相对参考点格子的偏移
+
+        判定方法（分离轴定理）:
+            参考点在格子内任意位置 ⇔ 格子偏移(i, j)以(i, j)为中心、
+            半边长为1的正方形与车身矩形相交
+        """
+        # 车身矩形（局部坐标系）: x ∈ [-rear, length-rear], y ∈ [-w/2, w/2]
+        half_l = self.length / 2
+        half_w = self.width / 2
+        center_local = half_l - self.rear_overhang
+
+        # 角度bin内的旋转误差 → 膨胀矩形
+        radius = np.hypot(max(self.rear_overhang, self.length - self.rear_overhang), half_w)
+        margin = radius * self.yaw_bin_size / 2
+        a = half_l + margin
+        b = half_w + margin
+
+        c, s = np.cos(theta), np.sin(theta)
+        cx, cy = center_local * c, center_local * s
+
+        # 候选偏移范围
+        ext_x = a * abs(c) + b * abs(s) + 1
+        ext_y = a * abs(s) + b * abs(c) + 1
+        x0 = int(np.floor(cx - ext_x))
+        y0 = int(np.floor(cy - ext_y))
+        x1 = int(np.ceil(cx + ext_x))
+        y1 = int(np.ceil(cy + ext_y))
+        jj, ii = np.mgrid[y0:y1 + 1, x0:x1 + 1]
+
+        dx = cx - ii
+        dy = cy - jj
+
+        # 分离轴: x, y, 车身纵轴u, 车身横轴v
+        mask = (
+            (np.abs(dx) <= ext_x)
+            & (np.abs(dy) <= ext_y)
+            & (np.abs(dx * c + dy * s) <= a + abs(c) + abs(s))
+            & (np.abs(-dx * s + dy * c) <= b + abs(s) + abs(c))
+        )
+
+        return mask, (x0, y0)
+
+    def yaw_bin(self, theta: float) -> int:
+        """计算角度所属的bin"""
+        return int(round(theta / self.yaw_bin_size)) % self.n_yaw_bins
+
+    def collides(self, x: float, y: float, theta: float) -> bool:
+        """
+        整车碰撞检测
+
+        Args:
+            x, y: 参考点位置 (m)
+            theta: 航向角 (rad)
+
+        Returns:
+            True if 车身与障碍物（或地图边界）重叠
+        """
+        # 标量用math.floor（np.floor + int 慢一个数量级）
+        ix = math.floor(x)
+        iy = math.floor(y)
+
+        # 参考点在地图外 → 车身必然压到地图边界
+        if not (0 <= ix < self.n_cols and 0 <= iy < self.n_rows):
+            return True
+
+        # round对np.float64要慢一个数量级，先转成Python float
+        k = round(float(theta) / self.yaw_bin_size) % self.n_yaw_bins
+        return bool(self.collision_table[k, iy, ix])
+
+    def collides_batch(self, x: np.ndarray, y: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        """
+        批量整车碰撞检测（一次花式索引查表）
+
+        Args:
+            x, y, theta: 形状(M,)的位姿数组
+
+        Returns:
+            形状(M,)的布尔数组
+        """
+        bins = np.round(theta / self.yaw_bin_size).astype(int) % self.n_yaw_bins
+        ix = np.floor(x).astype(int)
+        iy = np.floor(y).astype(int)
+
+        # 参考点在地图外的位姿直接判为碰撞
+        inside = (ix >= 0) & (iy >= 0) & (ix < self.n_cols) & (iy < self.n_rows)
+        result = ~inside
+        result[inside] = self.collision_table[bins[inside], iy[inside], ix[inside]]
+
+        return result
+
+
+def compute_distance_map(grid: np.ndarray) -> np.ndarray:
+    """
+    计算欧几里得距离变换
+
+    Args:
+        grid: 2D占据网格，0=空闲，非0=障碍物
+
+    Returns:
+        distance_map: 每个格子中心到最近障碍物格子中心的距离 (m)，
+                      形状与grid相同。地图边界外视为障碍物。
+    """
+    from scipy.ndimage import distance_transform_edt
+
+    # 外围补一圈障碍物，使地图边界也产生距离
+    free = np.pad(np.asarray(grid) == 0, 1, mode='constant', constant_values=False)
+    return distance_transform_edt(free)[1:-1, 1:-1]
+
+
+class CircleCollisionChecker:
+    """
+    基于圆覆盖 + 距离变换的碰撞检测器
+
+    思路:
+    - 用n个圆沿车身纵轴覆盖车辆矩形
+    - 预先计算整张地图的距离变换
+    - 每个圆只需一次查表: 距离 < 半径 → 碰撞
+
+    同一张距离图还可以直接给出到障碍物的净空(clearance)，
+    用于代价函数，无需额外计算。
+
+    使用方法:
+        >>> checker = CircleCollisionChecker(grid, length=4.5, width=1.8)
+        >>> checker.collides(x, y, theta)
+        >>> checker.clearance(x, y)
+    """
+
+    def __init__(
+        self,
+        grid: np.ndarray,
+        length: float,
+        width: float,
+        rear_overhang: Optional[float] = None,
+        n_circles: Optional[int] = None,
+        safety_margin: float = 0.0
+    ):
+        """
+        初始化圆覆盖碰撞检测器
+
+        Args:
+            grid: 2D占据网格，0=空闲，非0=障碍物
+            length: 车身长度 (m)
+            width: 车身宽度 (m)
+            rear_overhang: 参考点到车尾的距离 (m)，默认length/2
+            n_circles: 圆的数量，默认 ceil(length/width)
+            safety_margin: 额外安全距离 (m)，叠加在格子离散化余量之上
+        """
+        self.length = length
+        self.width = width
+        self.rear_overhang = length / 2 if rear_overhang is None else rear_overhang
+        if n_circles is None:
+            n_circles = max(1, int(np.ceil(length / width)))
+        self.n_circles = n_circles
+
+        # 圆心（车辆坐标系，沿纵轴均匀分布）与半径
+        seg = length / n_circles
+        self.offsets = -self.rear_overhang + seg * (np.arange(n_circles) + 0.5)
+        self.radius = float(np.hypot(seg / 2, width / 2))
+
+        # 距离图是格子中心之间的距离，圆心和障碍物都可能在各自格子内任意位置，
+        # 各差半条对角线 → 阈值加√2（格子边长1m），保证不漏检
+        self.threshold = self.radius + math.sqrt(2) + safety_margin
+
+        self.distance_map = compute_distance_map(grid)
+        self.height, self.width_cells = self.distance_map.shape
+
+    def clearance_batch(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """批量查询距离图，地图外返回0"""
+        ix = np.floor(x).astype(int)
+        iy = np.floor(y).astype(int)
+        inside = (ix >= 0) & (ix < self.width_cells) & (iy >= 0) & (iy < self.height)
+        dist = np.zeros(np.shape(ix))
+        dist[inside] = self.distance_map[iy[inside], ix[inside]]
+        return dist
+
+    def clearance(self, x: float, y: float) -> float:
+        """
+        参考点到最近障碍物的距离 (m)
+
+        Args:
+            x, y: 位置 (m)
+
+        Returns:
+            距离，地图外为0
+        """
+        ix, iy = int(np.floor(x)), int(np.floor(y))
+        if not (0 <= ix < self.width_cells and 0 <= iy < self.height):
+            return 0.0
+        return float(self.distance_map[iy, ix])
+
+    def collides(self, x: float, y: float, theta: float) -> bool:
+        """
+        整车碰撞检测（每个圆一次查表）
+
+        Args:
+            x, y: 参考点位置 (m)
+            theta: 航向角 (rad)
+
+        Returns:
+            True if 任一圆与障碍物重叠
+        """
+        c, s = math.cos(theta), math.sin(theta)
+        for offset in self.offsets:
+            if self.clearance(x + offset * c, y + offset * s) < self.threshold:
+                return True
+        return False
+
+    def collides_batch(self, x: np.ndarray, y: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        """
+        批量碰撞检测
+
+        Args:
+            x, y, theta: 形状(M,)的位姿数组
+
+        Returns:
+            形状(M,)的布尔数组
+        """
+        cx = x[:, None] + self.offsets[None, :] * np.cos(theta)[:, None]
+        cy = y[:, None] + self.offsets[None, :] * np.sin(theta)[:, None]
+        return np.any(self.clearance_batch(cx, cy) < self.threshold, axis=1)
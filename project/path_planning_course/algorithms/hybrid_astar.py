@@ -19,11 +19,17 @@ Hybrid A*是A*算法的扩展，考虑车辆运动学约束。
 import numpy as np
 import math
 import heapq
-from typing import List, Tuple, Optional, Dict, Set
+import copy
+import time
+from typing import Callable, List, Tuple, Optional, Dict, Set, Sequence
 from dataclasses import dataclass, field
 import sys
 sys.path.append('..')
 from vehicle.bicycle_model import BicycleModel
+from algorithms.collision import (
+    FootprintCollisionChecker, CircleCollisionChecker, compute_distance_map
+)
+from algorithms.search_tree_io import SearchTreeWriter
 
 
 @dataclass
@@ -47,6 +53,21 @@ class MotionPrimitive:
         return f"MP(δ={np.rad2deg(self.steer):.1f}°, d={self.distance:.1f}m, {dir_str})"
 
 
+class PlanStatus:
+    """
+    规划结果状态码
+    
+    用字符串常量，便于打印和写入日志/JSON
+    """
+    SUCCESS = 'success'                # 找到完整路径
+    NO_PATH = 'no_path'                # 搜索空间耗尽，无可行路径
+    TIMEOUT = 'timeout'                # 超过时间预算，返回部分路径
+    MAX_EXPANSIONS = 'max_expansions'  # 超过扩展预算，返回部分路径
+    INVALID_START = 'invalid_start'    # 起点碰撞
+    INVALID_GOAL = 'invalid_goal'      # 终点碰撞
+    CANCELLED = 'cancelled'            # 被外部取消（如多目标并行搜索）
+
+
 @dataclass(order=True)
 class HybridAStarNode:
     """
@@ -64,6 +85,8 @@ class HybridAStarNode:
     parent: Optional['HybridAStarNode'] = field(default=None, compare=False)
     primitive: Optional[MotionPrimitive] = field(default=None, compare=False)
     trajectory: Optional[np.ndarray] = field(default=None, compare=False)
+    index: Optional[Tuple[int, ...]] = field(default=None, compare=False)  # 批量扩展时预先计算
+    node_id: int = field(default=-1, compare=False)  # 扩展顺序编号（导出搜索树时使用）
 
 
 class HybridAStar:
@@ -88,7 +111,11 @@ class HybridAStar:
         grid: np.ndarray,
         xy_resolution: float = 0.5,
         yaw_resolution: float = np.deg2rad(15),
-        use_reverse: bool = False
+        use_reverse: bool = False,
+        collision_mode: str = 'point',
+        clearance_weight: float = 0.0,
+        adaptive_step: bool = False,
+        step_scales: Tuple[float, ...] = (1.0, 2.0, 4.0)
     ):
         """
         初始化Hybrid A*规划器
@@ -99,6 +126,16 @@ class HybridAStar:
             xy_resolution: 位置离散化分辨率 (m)
             yaw_resolution: 角度离散化分辨率 (rad)
             use_reverse: 是否使用后退运动原语
+            collision_mode: 碰撞检测方式
+                - 'point': 只检查后轴中心点（最快，需要膨胀地图）
+                - 'footprint': 整车矩形检测（预计算旋转掩码）
+                - 'circles': 圆覆盖 + 距离变换查表
+            clearance_weight: 净空代价权重（仅'circles'模式），
+                越大越倾向远离障碍物
+            adaptive_step: 是否根据净空自适应选择原语步长
+                （开阔区域用长步，靠近障碍物用短步）
+            step_scales: 自适应步长的候选倍数（相对基础步长1m），
+                最小值必须保证一步能离开当前位置格子
         """
         self.vehicle = vehicle_model
         self.grid = grid
@@ -109,25 +146,68 @@ class HybridAStar:
         self.height, self.width = grid.shape
         self.n_yaw = int(2 * np.pi / yaw_resolution)  # 角度bins数量
         
+        # 碰撞检测器
+        self.collision_mode = collision_mode
+        if collision_mode == 'point':
+            self.collision_checker = None
+        elif collision_mode == 'footprint':
+            self.collision_checker = FootprintCollisionChecker(
+                grid, vehicle_model.length, vehicle_model.width
+            )
+        elif collision_mode == 'circles':
+            self.collision_checker = CircleCollisionChecker(
+                grid, vehicle_model.length, vehicle_model.width
+            )
+        else:
+            raise ValueError(f"未知的碰撞检测方式: {collision_mode}")
+        self.clearance_weight = clearance_weight
+        
+        # 搜索区域掩码（多分辨率规划时限制在走廊内，None表示不限制）
+        self.corridor_mask: Optional[np.ndarray] = None
+        
+        # 运动原语步长与到达目标的容差
+        self.primitive_distance = 1.0
+        self.goal_pos_tol = 1.0
+        self.goal_angle_tol = np.deg2rad(15)
+        
+        # 倒车代价: 倒车距离乘以系数，每次换挡（前进↔后退）额外加罚
+        self.reverse_penalty = 1.5
+        self.gear_switch_cost = 2.0
+        
         # 创建运动原语集
         self.motion_primitives = self._create_motion_primitives()
         
+        # 自适应步长: 每种步长一套原语，按节点处的净空选择
+        self.adaptive_step = adaptive_step
+        self.step_scales = tuple(sorted(step_scales))
+        self.primitive_sets = self._create_primitive_sets() if adaptive_step else None
+        self._clearance_map: Optional[np.ndarray] = None
+        
         # 统计信息
         self.nodes_expanded = 0
         self.nodes_visited = 0
+        self.status = PlanStatus.NO_PATH
+        self.path_cost: Optional[float] = None
+        self.multires_stats: Optional[dict] = None  # plan_multiresolution填写
         
         print(f"[Hybrid A*] 初始化完成")
         print(f"  地图大小: {self.width} × {self.height}")
         print(f"  位置分辨率: {xy_resolution} m")
         print(f"  角度分辨率: {np.rad2deg(yaw_resolution):.1f}° ({self.n_yaw}个bins)")
         print(f"  运动原语数量: {len(self.motion_primitives)}")
+        print(f"  碰撞检测: {collision_mode}")
         if use_reverse:
             print(f"  支持后退运动")
+        if adaptive_step:
+            print(f"  自适应步长: {[self.primitive_distance * k for k in self.step_scales]} m")
     
-    def _create_motion_primitives(self) -> List[MotionPrimitive]:
+    def _create_motion_primitives(self, distance: Optional[float] = None) -> List[MotionPrimitive]:
         """
         创建运动原语集
         
+        Args:
+            distance: 行驶距离 (m)，默认使用 self.primitive_distance
+        
         Returns:
             运动原语列表
         
@@ -148,7 +228,8 @@ class HybridAStar:
         ]
         
         # 行驶距离
-        distance = 1.0  # 1米
+        if distance is None:
+            distance = self.primitive_distance
         
         # 前进原语
         for steer in steer_angles:
@@ -161,30 +242,110 @@ class HybridAStar:
         
         return primitives
     
-    def calc_index(self, state: Tuple[float, float, float, float]) -> Tuple[int, int, int]:
+    def _create_primitive_sets(self) -> Dict[float, List[MotionPrimitive]]:
+        """
+        创建自适应步长的原语集
+        
+        Returns:
+            {步长: 运动原语列表}，步长从小到大
+        
+        注意:
+            所有原语集共享同样的转向角和方向，只是距离不同；
+            代价仍然等于行驶距离，因此长步和多个短步的代价一致
+        """
+        return {
+            self.primitive_distance * k: self._create_motion_primitives(self.primitive_distance * k)
+            for k in self.step_scales
+        }
+    
+    def _primitive_table(self) -> List[MotionPrimitive]:
+        """所有原语（含自适应步长的各个原语集），下标即导出搜索树时的原语编号"""
+        table = list(self.motion_primitives)
+        if self.primitive_sets is not None:
+            for primitives in self.primitive_sets.values():
+                table.extend(primitives)
+        return table
+    
+    def clearance(self, x: float, y: float) -> float:
+        """
+        查询位置到最近障碍物的距离 (m)
+        
+        距离图只计算一次并缓存；'circles'模式下直接复用碰撞检测器的距离图
+        """
+        if self._clearance_map is None:
+            if self.collision_mode == 'circles':
+                self._clearance_map = self.collision_checker.distance_map
+            else:
+                self._clearance_map = compute_distance_map(self.grid)
+        
+        ix, iy = int(x), int(y)
+        if not (0 <= ix < self.width and 0 <= iy < self.height):
+            return 0.0
+        return float(self._clearance_map[iy, ix])
+    
+    def select_primitives(self, node: HybridAStarNode) -> List[MotionPrimitive]:
+        """
+        为节点选择运动原语集
+        
+        自适应步长规则:
+        - 可自由行驶距离 = 净空 - 车身外接圆半径 - 0.5m格子误差
+        - 选择不超过可自由行驶距离的最长步长，至少用最短步长
+        - 步长不超过到目标的距离，避免反复越过目标
+        
+        Args:
+            node: 当前节点
+        
+        Returns:
+            运动原语列表
+        """
+        if not self.adaptive_step:
+            return self.motion_primitives
+        
+        x, y = node.state[0], node.state[1]
+        body_radius = math.hypot(self.vehicle.length / 2, self.vehicle.width / 2)
+        free_distance = self.clearance(x, y) - body_radius - 0.5
+        
+        gx, gy = self.goal[0], self.goal[1]
+        free_distance = min(free_distance, math.hypot(gx - x, gy - y))
+        
+        lengths = list(self.primitive_sets.keys())
+        chosen = lengths[0]
+        for length in lengths:
+            if length <= free_distance:
+                chosen = length
+        
+        return self.primitive_sets[chosen]
+    
+    def calc_index(self, state: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
         """
         计算状态的离散索引
         
         Args:
-            state: (x, y, θ, v)
+            state: (x, y, θ, v)，v的符号表示到达该状态时的行驶方向
         
         Returns:
-            (ix, iy, iyaw): 离散索引
+            (ix, iy, iyaw, idir): 离散索引，idir=0前进/1后退
         
         目的:
             避免重复搜索相近的状态
         
         示例:
-            state1 = (2.3, 1.8, 32°) → index = (5, 4, 2)
-            state2 = (2.4, 1.9, 31°) → index = (5, 4, 2)  # 相同索引
+            state1 = (2.3, 1.8, 32°, 2) → index = (5, 4, 2, 0)
+            state2 = (2.4, 1.9, 31°, 2) → index = (5, 4, 2, 0)   # 相同索引
+            state3 = (2.4, 1.9, 31°, -2) → index = (5, 4, 2, 1)  # 倒车到达，不同状态
+        
+        为什么要区分方向:
+            前进和倒车到达同一格子后，下一步是否需要换挡不同，代价也不同；
+            合并成一个状态会互相覆盖，导致反复重新扩展
         """
         x, y, theta, v = state
         
         ix = round(x / self.xy_res)
         iy = round(y / self.xy_res)
         iyaw = round(theta / self.yaw_res) % self.n_yaw
+        idir = 1 if v < 0 else 0
         
-        return (ix, iy, iyaw)
+        return (ix, iy, iyaw, idir)
     
     def heuristic(self, state: Tuple[float, float, float, float]) -> float:
         """
@@ -218,8 +379,9 @@ class HybridAStar:
         """
         碰撞检测
         
-        简化版本：只检查车辆中心点
-        实际应用中应检查车辆footprint
+        - 'point'模式: 只检查车辆中心点
+        - 'footprint'模式: 检查整车矩形（预计算的每个角度bin的碰撞表，一次查表，与点检测代价相同）
+        - 'circles'模式: 检查覆盖车身的几个圆（每个圆一次距离图查表）
         
         Args:
             state: (x, y, θ, v)
@@ -237,10 +399,25 @@ class HybridAStar:
         if not (0 <= ix < self.width and 0 <= iy < self.height):
             return True
         
+        # 走廊检查（多分辨率规划的第二阶段）
+        if self.corridor_mask is not None and not self.corridor_mask[iy, ix]:
+            return True
+        
+        # 整车检测: footprint碰撞表已包含参考点所在格子，边界也已检查，
+        # 直接查表代替查grid（与collides相同，省去一次方法调用和重复的边界检查）
+        if self.collision_mode == 'footprint':
+            checker = self.collision_checker
+            k = round(float(theta) / checker.yaw_bin_size) % checker.n_yaw_bins
+            return bool(checker.collision_table[k, iy, ix])
+        
         # 障碍物检查
         if self.grid[iy, ix] == 1:
             return True
         
+        # 整车检测
+        if self.collision_checker is not None:
+            return self.collision_checker.collides(x, y, theta)
+        
         return False
     
     def simulate_primitive(
@@ -259,27 +436,27 @@ class HybridAStar:
         
         Returns:
             (final_state, trajectory):
-                - final_state: 最终状态
+                - final_state: 最终状态，速度带符号（负值表示倒车到达）
                 - trajectory: 轨迹，形状(num_steps+1, 4)
         """
-        dt = primitive.distance / (num_steps * 2.0)  # 时间步长
+        speed = 2.0
         
         # 设置速度（前进或后退）
-        target_v = 2.0 * primitive.direction
+        target_v = speed * primitive.direction
         
-        trajectory = [state.copy()]
-        current_state = state.copy()
-        current_state[3] = target_v  # 设置速度
+        # 转向角不变 → 轨迹是圆弧，各采样点用闭式解直接算出，
+        # num_steps只决定碰撞检测的采样密度，不影响精度
+        delta = np.clip(primitive.steer, -self.vehicle.delta_max, self.vehicle.delta_max)
+        s = np.linspace(0.0, primitive.distance * primitive.direction, num_steps + 1)
         
-        for _ in range(num_steps):
-            # 控制输入: [转向角, 加速度]
-            control = np.array([primitive.steer, 0.0])
-            
-            # 仿真一步
-            current_state = self.vehicle.step(current_state, control, dt)
-            trajectory.append(current_state.copy())
+        trajectory = np.empty((num_steps + 1, 4))
+        trajectory[:, 0], trajectory[:, 1], trajectory[:, 2] = self.vehicle.arc_pose(
+            state[0], state[1], state[2], s, delta
+        )
+        trajectory[0] = state
+        trajectory[1:, 3] = target_v
         
-        return current_state, np.array(trajectory)
+        return trajectory[-1].copy(), trajectory
     
     def expand_node(self, node: HybridAStarNode) -> List[HybridAStarNode]:
         """
@@ -294,7 +471,7 @@ class HybridAStar:
         successors = []
         current_state = np.array(node.state)
         
-        for primitive in self.motion_primitives:
+        for primitive in self.select_primitives(node):
             # 模拟运动原语
             new_state, trajectory = self.simulate_primitive(current_state, primitive)
             
@@ -314,7 +491,16 @@ class HybridAStar:
             
             # 后退代价更高（鼓励前进）
             if primitive.direction < 0:
-                step_cost *= 1.5
+                step_cost *= self.reverse_penalty
+            
+            # 换挡代价（起点速度为0，不算换挡）
+            if node.state[3] * primitive.direction < 0:
+                step_cost += self.gear_switch_cost
+            
+            # 净空代价（距离图查表，几乎无额外开销）
+            if self.clearance_weight > 0 and self.collision_mode == 'circles':
+                clearance = self.collision_checker.clearance(new_state[0], new_state[1])
+                step_cost += self.clearance_weight / (1.0 + clearance)
             
             # 创建后继节点
             new_g = node.g + step_cost
@@ -335,6 +521,167 @@ class HybridAStar:
         
         return successors
     
+    def calc_index_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        批量计算离散索引（与calc_index一致）
+        
+        Args:
+            states: 状态数组 (M, 4)
+        
+        Returns:
+            索引数组 (M, 4): (ix, iy, iyaw, idir)
+        """
+        ix = np.round(states[:, 0] / self.xy_res)
+        iy = np.round(states[:, 1] / self.xy_res)
+        iyaw = np.mod(np.round(states[:, 2] / self.yaw_res), self.n_yaw)
+        idir = states[:, 3] < 0
+        return np.stack([ix, iy, iyaw, idir], axis=1).astype(int)
+    
+    def heuristic_batch(self, states: np.ndarray) -> np.ndarray:
+        """批量启发式函数（与heuristic一致）"""
+        gx, gy, gtheta, gv = self.goal
+        pos_dist = np.hypot(states[:, 0] - gx, states[:, 1] - gy)
+        dtheta = states[:, 2] - gtheta
+        angle_diff = np.abs(np.arctan2(np.sin(dtheta), np.cos(dtheta)))
+        return pos_dist + 0.5 * angle_diff
+    
+    def is_collision_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        批量碰撞检测（与is_collision一致）
+        
+        Args:
+            states: 状态数组 (M, 4)
+        
+        Returns:
+            布尔数组 (M,)
+        """
+        x, y, theta = states[:, 0], states[:, 1], states[:, 2]
+        ix = x.astype(int)
+        iy = y.astype(int)
+        
+        # 边界检查
+        inside = (ix >= 0) & (ix < self.width) & (iy >= 0) & (iy < self.height)
+        collision = ~inside
+        
+        # 障碍物与走廊检查
+        blocked = self.grid[iy[inside], ix[inside]] == 1
+        if self.corridor_mask is not None:
+            blocked |= ~self.corridor_mask[iy[inside], ix[inside]]
+        collision[inside] = blocked
+        
+        # 整车检测（只检查还没判为碰撞的位姿）
+        if self.collision_checker is not None:
+            rest = ~collision
+            collision[rest] = self.collision_checker.collides_batch(x[rest], y[rest], theta[rest])
+        
+        return collision
+    
+    def simulate_primitives_batch(
+        self,
+        states: np.ndarray,
+        steer: np.ndarray,
+        distance: np.ndarray,
+        direction: np.ndarray,
+        num_steps: int = 10
+    ) -> np.ndarray:
+        """
+        批量模拟运动原语（与simulate_primitive一致）
+        
+        Args:
+            states: 初始状态 (M, 4)
+            steer: 转向角 (M,)
+            distance: 行驶距离 (M,)
+            direction: 方向 (M,)
+            num_steps: 离散化步数
+        
+        Returns:
+            trajectories: 轨迹 (M, num_steps+1, 4)
+        """
+        speed = 2.0
+        delta = np.clip(steer, -self.vehicle.delta_max, self.vehicle.delta_max)
+        
+        # 每条原语的采样点沿弧长均匀分布，闭式解一次算出 (M, num_steps+1)
+        fraction = np.linspace(0.0, 1.0, num_steps + 1)
+        s = (distance * direction)[:, None] * fraction
+        
+        trajectories = np.empty((len(states), num_steps + 1, 4))
+        trajectories[:, :, 0], trajectories[:, :, 1], trajectories[:, :, 2] = self.vehicle.arc_pose(
+            states[:, 0:1], states[:, 1:2], states[:, 2:3], s, delta[:, None]
+        )
+        trajectories[:, 0] = states
+        trajectories[:, 1:, 3] = (speed * direction)[:, None]
+        
+        return trajectories
+    
+    def expand_batch(self, nodes: List[HybridAStarNode]) -> List[HybridAStarNode]:
+        """
+        批量扩展k个节点
+        
+        所有节点 × 所有原语一次性用NumPy处理:
+        原语仿真、碰撞检测、代价、启发值和离散索引都是向量化计算，
+        只有最终创建节点对象时才回到Python循环。
+        
+        Args:
+            nodes: 待扩展节点列表
+        
+        Returns:
+            后继节点列表（已填充index）
+        """
+        # 展开 (节点, 原语) 组合
+        owners = []
+        primitives = []
+        for i, node in enumerate(nodes):
+            for primitive in self.select_primitives(node):
+                owners.append(i)
+                primitives.append(primitive)
+        
+        owners = np.array(owners)
+        steer = np.array([p.steer for p in primitives])
+        distance = np.array([p.distance for p in primitives])
+        direction = np.array([p.direction for p in primitives], dtype=float)
+        
+        states = np.array([node.state for node in nodes], dtype=float)[owners]
+        g_parent = np.array([node.g for node in nodes])[owners]
+        
+        # 原语仿真
+        trajectories = self.simulate_primitives_batch(states, steer, distance, direction)
+        n, n_points, _ = trajectories.shape
+        
+        # 碰撞检测（整条轨迹）
+        collision = self.is_collision_batch(trajectories.reshape(-1, 4)).reshape(n, n_points)
+        keep = np.flatnonzero(~collision.any(axis=1))
+        if len(keep) == 0:
+            return []
+        
+        final_states = trajectories[keep, -1]
+        
+        # 代价
+        step_cost = distance[keep] * np.where(direction[keep] < 0, self.reverse_penalty, 1.0)
+        step_cost += self.gear_switch_cost * (states[keep, 3] * direction[keep] < 0)
+        if self.clearance_weight > 0 and self.collision_mode == 'circles':
+            clearance = self.collision_checker.clearance_batch(final_states[:, 0], final_states[:, 1])
+            step_cost += self.clearance_weight / (1.0 + clearance)
+        
+        g = g_parent[keep] + step_cost
+        h = self.heuristic_batch(final_states)
+        f = g + h
+        indices = self.calc_index_batch(final_states)
+        
+        successors = []
+        for j, k in enumerate(keep):
+            successors.append(HybridAStarNode(
+                f=f[j],
+                state=tuple(final_states[j]),
+                g=g[j],
+                h=h[j],
+                parent=nodes[owners[k]],
+                primitive=primitives[k],
+                trajectory=trajectories[k],
+                index=tuple(indices[j])
+            ))
+        
+        return successors
+    
     def near_goal(
         self,
         state: Tuple[float, float, float, float],
@@ -375,11 +722,11 @@ class HybridAStar:
         
         while current.parent is not None:
             if current.trajectory is not None:
-                # 反转轨迹（因为是从终点回溯）
-                path_segments.append(current.trajectory[::-1])
+                # 每段轨迹本身是正向的（父节点 → 当前节点），只需反转段的顺序
+                path_segments.append(current.trajectory)
             current = current.parent
         
-        # 反转整个路径
+        # 反转段的顺序（因为是从终点回溯）
         path_segments.reverse()
         
         # 合并所有轨迹段
@@ -394,7 +741,12 @@ class HybridAStar:
         self,
         start: Tuple[float, float, float, float],
         goal: Tuple[float, float, float, float],
-        verbose: bool = True
+        verbose: bool = True,
+        max_expansions: Optional[int] = None,
+        deadline_ms: Optional[float] = None,
+        batch_size: int = 1,
+        should_stop: Optional[Callable[[], bool]] = None,
+        tree_writer: Optional[SearchTreeWriter] = None
     ) -> Optional[np.ndarray]:
         """
         Hybrid A*路径规划主函数
@@ -403,13 +755,34 @@ class HybridAStar:
             start: 起点状态 (x, y, θ, v)
             goal: 终点状态 (x, y, θ, v)
             verbose: 是否打印详细信息
+            max_expansions: 最大扩展节点数，None表示不限制
+            deadline_ms: 规划时间上限 (ms)，None表示不限制
+            batch_size: 每次取出并批量扩展的节点数k
+                - 1: 标准A*，逐个扩展
+                - k>1: 一次取出f最小的k个节点，用NumPy批量生成后继，
+                  减少每个节点的Python开销（路径可能略次优）
+            should_stop: 取消回调，每轮检查一次，返回True时停止搜索
+                （状态为CANCELLED，返回None）
+            tree_writer: 搜索树导出器，
+                每扩展一个节点写入一行，None表示不导出
         
         Returns:
             路径数组 (N, 4) 或 None
+            
+            预算（时间/扩展数）用尽时返回到目前为止最接近目标（h最小）
+            的部分路径，并通过 self.status 区分:
+                PlanStatus.SUCCESS / NO_PATH / TIMEOUT / MAX_EXPANSIONS /
+                INVALID_START / INVALID_GOAL / CANCELLED
+            self.path_cost 为返回路径的代价g
         """
         self.goal = goal
         self.nodes_expanded = 0
         self.nodes_visited = 0
+        self.status = PlanStatus.NO_PATH
+        self.path_cost = None
+        
+        start_time = time.perf_counter()
+        deadline = None if deadline_ms is None else start_time + deadline_ms / 1000.0
         
         if verbose:
             print(f"\n[Hybrid A*] 开始规划...")
@@ -419,14 +792,19 @@ class HybridAStar:
         # 检查起点和终点
         if self.is_collision(start):
             print("[Hybrid A*] 错误: 起点在障碍物中！")
+            self.status = PlanStatus.INVALID_START
             return None
         if self.is_collision(goal):
             print("[Hybrid A*] 错误: 终点在障碍物中！")
+            self.status = PlanStatus.INVALID_GOAL
             return None
         
         # 初始化
         open_list = []
-        closed_dict: Dict[Tuple[int, int, int], HybridAStarNode] = {}
+        # 每个离散状态目前最优（g最小）的节点，入队或已扩展；
+        # 队列里不是该状态最优节点的项已过期，出队时直接丢弃
+        best: Dict[Tuple[int, ...], HybridAStarNode] = {}
+        closed = set()
         counter = 0
         
         # 起点节点
@@ -438,54 +816,129 @@ class HybridAStar:
             parent=None
         )
         
+        start_node.index = self.calc_index(start)
+        best[start_node.index] = start_node
         heapq.heappush(open_list, (start_node.f, counter, start_node))
         counter += 1
         
+        # 最接近目标的节点（预算用尽时返回部分路径）
+        best_node = start_node
+        
+        # 搜索树导出: 原语编号表写入元数据
+        if tree_writer is not None:
+            primitive_table = self._primitive_table()
+            primitive_ids = {id(p): i for i, p in enumerate(primitive_table)}
+            tree_writer.metadata.update({
+                'start': [float(v) for v in start],
+                'goal': [float(v) for v in goal],
+                'xy_resolution': self.xy_res,
+                'yaw_resolution': self.yaw_res,
+                'primitives': [[p.steer, p.distance, p.direction] for p in primitive_table],
+            })
+        
         # 主搜索循环
         while open_list:
-            _, _, current = heapq.heappop(open_list)
-            self.nodes_visited += 1
+            # 预算检查
+            if max_expansions is not None and self.nodes_expanded >= max_expansions:
+                self.status = PlanStatus.MAX_EXPANSIONS
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.status = PlanStatus.TIMEOUT
+                break
+            if should_stop is not None and should_stop():
+                self.status = PlanStatus.CANCELLED
+                break
             
-            # 到达目标
-            if self.near_goal(current.state):
-                path = self.extract_path(current)
+            # 取出最多k个待扩展节点
+            batch = []
+            while open_list and len(batch) < batch_size:
+                if max_expansions is not None and self.nodes_expanded >= max_expansions:
+                    break
                 
-                if verbose:
-                    print(f"\n[Hybrid A*] ✓ 找到路径！")
-                    print(f"  路径点数: {len(path)}")
-                    print(f"  路径代价: {current.g:.2f}")
-                    print(f"  扩展节点: {self.nodes_expanded}")
-                    print(f"  访问节点: {self.nodes_visited}")
+                _, _, current = heapq.heappop(open_list)
+                self.nodes_visited += 1
                 
-                return path
-            
-            # 计算索引
-            index = self.calc_index(current.state)
-            
-            # 检查是否已访问过
-            if index in closed_dict:
-                if current.g >= closed_dict[index].g:
+                # 到达目标
+                if self.near_goal(current.state, self.goal_pos_tol, self.goal_angle_tol):
+                    path = self.extract_path(current)
+                    self.status = PlanStatus.SUCCESS
+                    self.path_cost = current.g
+                    
+                    if verbose:
+                        print(f"\n[Hybrid A*] ✓ 找到路径！")
+                        print(f"  路径点数: {len(path)}")
+                        print(f"  路径代价: {current.g:.2f}")
+                        print(f"  扩展节点: {self.nodes_expanded}")
+                        print(f"  访问节点: {self.nodes_visited}")
+                    
+                    return path
+                
+                # 过期项: 同一状态之后有g更小的节点入队
+                if best[current.index] is not current:
                     continue
+                
+                # 加入closed set
+                closed.add(current.index)
+                self.nodes_expanded += 1
+                batch.append(current)
+                
+                if tree_writer is not None:
+                    current.node_id = tree_writer.write(
+                        current.parent.node_id if current.parent is not None else -1,
+                        primitive_ids.get(id(current.primitive), -1),
+                        current.state[0], current.state[1], current.state[2],
+                        current.g, current.h
+                    )
+                
+                if current.h < best_node.h:
+                    best_node = current
+                
+                # 打印进度
+                if verbose and self.nodes_expanded % 50 == 0:
+                    print(f"  已扩展 {self.nodes_expanded} 个节点...", end='\r')
             
-            # 加入closed set
-            closed_dict[index] = current
-            self.nodes_expanded += 1
-            
-            # 打印进度
-            if verbose and self.nodes_expanded % 50 == 0:
-                print(f"  已扩展 {self.nodes_expanded} 个节点...", end='\r')
+            if not batch:
+                continue
             
             # 扩展后继节点
-            successors = self.expand_node(current)
+            if batch_size == 1:
+                successors = self.expand_node(batch[0])
+            else:
+                successors = self.expand_batch(batch)
             
             for succ in successors:
-                succ_index = self.calc_index(succ.state)
+                succ_index = succ.index if succ.index is not None else self.calc_index(succ.state)
                 
-                # 检查是否找到更好的路径
-                if succ_index not in closed_dict or succ.g < closed_dict[succ_index].g:
+                # 只有g更小时才入队（已扩展的状态重新打开）；
+                # g相同时未扩展的状态换成h更小的连续状态
+                # （例如同一格子里朝向目标的那条原语），已扩展的不再重复
+                other = best.get(succ_index)
+                if (other is None or succ.g < other.g
+                        or (succ.g == other.g and succ.h < other.h and succ_index not in closed)):
+                    succ.index = succ_index
+                    best[succ_index] = succ
                     heapq.heappush(open_list, (succ.f, counter, succ))
                     counter += 1
         
+        # 预算用尽 → 返回部分路径
+        if self.status in (PlanStatus.TIMEOUT, PlanStatus.MAX_EXPANSIONS):
+            path = self.extract_path(best_node)
+            self.path_cost = best_node.g
+            
+            if verbose:
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                print(f"\n[Hybrid A*] ⚠ 预算用尽 ({self.status})，返回部分路径")
+                print(f"  用时: {elapsed_ms:.1f} ms")
+                print(f"  剩余启发值: {best_node.h:.2f}")
+                print(f"  扩展节点: {self.nodes_expanded}")
+            
+            return path
+        
+        if self.status == PlanStatus.CANCELLED:
+            if verbose:
+                print(f"\n[Hybrid A*] 搜索已取消")
+            return None
+        
         # 未找到路径
         if verbose:
             print(f"\n[Hybrid A*] ✗ 未找到路径")
@@ -493,6 +946,150 @@ class HybridAStar:
             print(f"  访问节点: {self.nodes_visited}")
         
         return None
+    
+    def _build_corridor_mask(
+        self,
+        coarse_path: np.ndarray,
+        corridor_width: float
+    ) -> np.ndarray:
+        """
+        构建粗路径周围的走廊掩码
+        
+        Args:
+            coarse_path: 粗搜索得到的路径 (N, 4)
+            corridor_width: 走廊半宽 (m)
+        
+        Returns:
+            布尔掩码，形状与grid相同，True表示允许搜索
+        """
+        from scipy.ndimage import distance_transform_edt
+        
+        ix = np.clip(coarse_path[:, 0].astype(int), 0, self.width - 1)
+        iy = np.clip(coarse_path[:, 1].astype(int), 0, self.height - 1)
+        
+        not_on_path = np.ones(self.grid.shape, dtype=bool)
+        not_on_path[iy, ix] = False
+        
+        return distance_transform_edt(not_on_path) <= corridor_width
+    
+    def plan_multiresolution(
+        self,
+        start: Tuple[float, float, float, float],
+        goal: Tuple[float, float, float, float],
+        coarse_xy_resolution: float = 2.0,
+        coarse_yaw_resolution: float = np.deg2rad(30),
+        corridor_width: float = 3.0,
+        verbose: bool = True
+    ) -> Optional[np.ndarray]:
+        """
+        多分辨率Hybrid A*规划
+        
+        大地图上细分辨率搜索太慢，分两阶段:
+        1. 粗搜索: 大的位置/角度分辨率 + 更长的运动原语，快速得到粗路径
+        2. 细搜索: 原分辨率，但只允许在粗路径周围的走廊内搜索
+        
+        走廊内搜索失败（走廊太窄等）时，回退到不受限的完整搜索。
+        
+        Args:
+            start: 起点状态 (x, y, θ, v)
+            goal: 终点状态 (x, y, θ, v)
+            coarse_xy_resolution: 粗搜索位置分辨率 (m)
+            coarse_yaw_resolution: 粗搜索角度分辨率 (rad)
+            corridor_width: 走廊半宽 (m)
+            verbose: 是否打印详细信息
+        
+        Returns:
+            路径数组 (N, 4) 或 None
+        
+        统计信息保存在 self.multires_stats 中
+        """
+        # ===== 阶段1: 粗搜索 =====
+        # 浅拷贝共享地图与碰撞检测器，只替换离散化参数
+        coarse = copy.copy(self)
+        coarse.xy_res = coarse_xy_resolution
+        coarse.yaw_res = coarse_yaw_resolution
+        coarse.n_yaw = int(2 * np.pi / coarse_yaw_resolution)
+        coarse.primitive_distance = max(self.primitive_distance, 1.5 * coarse_xy_resolution)
+        coarse.goal_pos_tol = max(self.goal_pos_tol, coarse_xy_resolution)
+        coarse.goal_angle_tol = max(self.goal_angle_tol, coarse_yaw_resolution)
+        coarse.motion_primitives = coarse._create_motion_primitives()
+        if self.adaptive_step:
+            coarse.primitive_sets = coarse._create_primitive_sets()
+        
+        if verbose:
+            print(f"\n[Hybrid A*] 多分辨率规划 - 阶段1: 粗搜索 "
+                  f"({coarse_xy_resolution} m, {np.rad2deg(coarse_yaw_resolution):.0f}°)")
+        coarse_path = coarse.plan(start, goal, verbose=False)
+        
+        self.multires_stats = {
+            'coarse_expanded': coarse.nodes_expanded,
+            'fine_expanded': 0,
+            'fallback': False,
+        }
+        
+        # ===== 阶段2: 走廊内细搜索 =====
+        path = None
+        if coarse_path is not None:
+            # 起终点也加入走廊，粗路径终点可能与目标有偏差
+            anchors = np.array([start, goal], dtype=float)
+            corridor_seed = np.vstack([coarse_path, anchors])
+            
+            if verbose:
+                print(f"[Hybrid A*] 阶段2: 走廊内细搜索 (走廊半宽 {corridor_width} m, "
+                      f"粗搜索扩展 {coarse.nodes_expanded} 个节点)")
+            
+            self.corridor_mask = self._build_corridor_mask(corridor_seed, corridor_width)
+            try:
+                path = self.plan(start, goal, verbose=verbose)
+            finally:
+                self.corridor_mask = None
+            self.multires_stats['fine_expanded'] = self.nodes_expanded
+        
+        # ===== 回退: 完整搜索 =====
+        if path is None:
+            if verbose:
+                print("[Hybrid A*] 走廊搜索失败，回退到完整搜索")
+            self.multires_stats['fallback'] = True
+            path = self.plan(start, goal, verbose=verbose)
+            self.multires_stats['fine_expanded'] += self.nodes_expanded
+        
+        return path
+    
+    def plan_multi_goal(
+        self,
+        start: Tuple[float, float, float, float],
+        goals: Sequence[Tuple[float, float, float, float]],
+        max_workers: Optional[int] = None,
+        cancel_when_best: bool = True,
+        verbose: bool = True,
+        **plan_kwargs
+    ) -> List[dict]:
+        """
+        同一起点到多个候选目标的并行规划（例如在多个车位中选最优）
+        
+        地图和碰撞检测表通过共享内存传给工作进程，详见 algorithms.multi_goal
+        
+        Args:
+            start: 起点状态 (x, y, θ, v)
+            goals: 候选目标列表
+            max_workers: 进程数，默认CPU核数
+            cancel_when_best: 最优结果可证明后取消其余搜索
+            verbose: 是否打印信息
+            **plan_kwargs: 传给plan()的其他参数
+        
+        Returns:
+            按代价排序的结果列表，每项包含
+            goal_index, goal, status, cost, path, nodes_expanded, time
+        """
+        from algorithms.multi_goal import plan_multi_goal
+        
+        return plan_multi_goal(
+            self, start, goals,
+            max_workers=max_workers,
+            cancel_when_best=cancel_when_best,
+            verbose=verbose,
+            **plan_kwargs
+        )
 
 
 # ===== 测试代码 =====
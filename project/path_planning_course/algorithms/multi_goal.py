@@ -0,0 +1,210 @@
+"""
+多目标并行Hybrid A*
+
+典型场景: 代客泊车，同一起点评估10-50个候选车位，选代价最小的。
+
+实现要点:
+1. 进程池并行: 每个目标一次独立搜索
+2. 共享内存: 地图、碰撞掩码、距离图等只读大数组放入共享内存，
+   工作进程直接映射，不需要逐个拷贝/重新计算
+3. 提前取消: 欧几里得距离是路径代价的下界；
+   当已找到的最优代价 ≤ 所有未完成目标的下界时，其余搜索不可能更优，
+   通过共享标志通知工作进程停止
+
+作者: Path Planning Course Team
+"""
+
+import copy
+import math
+import time
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed, CancelledError
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# 需要放入共享内存的只读数组属性
+# FootprintCollisionChecker.masks（每个bin一个小掩码，共几KB，检测时不再使用）
+# 是数组列表，随模板pickle到每个工作进程；碰撞检测只查 collision_table
+_PLANNER_SHARED_FIELDS = ('grid', '_clearance_map')
+_CHECKER_SHARED_FIELDS = ('occupancy', 'cell_offsets', 'collision_table', 'distance_map')
+
+# 工作进程全局状态（由_init_worker设置）
+_worker_planner = None
+_worker_cancel_flag = None
+_worker_shms: List[shared_memory.SharedMemory] = []
+
+
+def _export_arrays(obj, fields: Sequence[str], prefix: str, specs: dict, shms: list, exported: dict):
+    """
+    把obj上的数组属性拷贝到共享内存，并在obj上置为None
+
+    exported 记录已导出的数组（id → spec）: 同一个数组挂在多个属性上时
+    （例如circles模式下规划器的 _clearance_map 就是检测器的 distance_map）只导出一次
+    """
+    for name in fields:
+        array = getattr(obj, name, None)
+        if not isinstance(array, np.ndarray):
+            continue
+        if id(array) in exported:
+            specs[(prefix, name)] = exported[id(array)]
+            setattr(obj, name, None)
+            continue
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        specs[(prefix, name)] = exported[id(array)] = (shm.name, array.shape, array.dtype.str)
+        shms.append(shm)
+        setattr(obj, name, None)
+
+
+def _init_worker(template, specs: dict, cancel_flag):
+    """工作进程初始化: 映射共享内存数组，还原规划器"""
+    global _worker_planner, _worker_cancel_flag
+
+    planner = template
+    arrays = {}  # 共享内存名 → 数组（别名属性还原为同一个数组对象）
+    for (prefix, name), (shm_name, shape, dtype) in specs.items():
+        if shm_name not in arrays:
+            # 进程池中的子进程与主进程共用resource_tracker，释放统一由主进程负责
+            shm = shared_memory.SharedMemory(name=shm_name)
+            _worker_shms.append(shm)
+
+            arrays[shm_name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+            arrays[shm_name].flags.writeable = False
+        array = arrays[shm_name]
+        owner = planner if prefix == 'planner' else planner.collision_checker
+        setattr(owner, name, array)
+
+    _worker_planner = planner
+    _worker_cancel_flag = cancel_flag
+
+
+def _plan_worker(goal_index: int, start, goal, plan_kwargs: dict) -> dict:
+    """工作进程: 对单个目标执行规划"""
+    planner = _worker_planner
+    t0 = time.perf_counter()
+    path = planner.plan(
+        start, goal, verbose=False,
+        should_stop=lambda: _worker_cancel_flag.value != 0,
+        **plan_kwargs
+    )
+    return {
+        'goal_index': goal_index,
+        'goal': goal,
+        'status': planner.status,
+        'cost': planner.path_cost,
+        'path': path,
+        'nodes_expanded': planner.nodes_expanded,
+        'time': time.perf_counter() - t0,
+    }
+
+
+def cost_lower_bound(planner, start, goal) -> float:
+    """
+    路径代价下界
+
+    每个原语的代价 ≥ 行驶距离 ≥ 弦长，
+    因此 代价 ≥ 起终点直线距离 - 到达容差
+    """
+    return max(0.0, math.hypot(goal[0] - start[0], goal[1] - start[1]) - planner.goal_pos_tol)
+
+
+def plan_multi_goal(
+    planner,
+    start: Tuple[float, float, float, float],
+    goals: Sequence[Tuple[float, float, float, float]],
+    max_workers: Optional[int] = None,
+    cancel_when_best: bool = True,
+    verbose: bool = True,
+    **plan_kwargs
+) -> List[dict]:
+    """
+    并行规划同一起点到多个候选目标
+
+    Args:
+        planner: HybridAStar规划器（地图、碰撞检测器等都会共享给工作进程）
+        start: 起点 (x, y, θ, v)
+        goals: 候选目标列表
+        max_workers: 进程数，默认CPU核数
+        cancel_when_best: 已找到可证明最优的结果时取消其余搜索
+        verbose: 是否打印信息
+        **plan_kwargs: 传给plan()的其他参数（batch_size, deadline_ms等）
+
+    Returns:
+        结果列表，按代价从小到大排序（失败/取消的排在最后），每项:
+            {'goal_index', 'goal', 'status', 'cost', 'path',
+             'nodes_expanded', 'time'}
+    """
+    from algorithms.hybrid_astar import PlanStatus
+
+    lower_bounds = [cost_lower_bound(planner, start, g) for g in goals]
+    order = np.argsort(lower_bounds)  # 先算下界小的目标，利于提前取消
+
+    # 只读数组放入共享内存，模板对象里置空后再pickle
+    specs: Dict[Tuple[str, str], tuple] = {}
+    shms: List[shared_memory.SharedMemory] = []
+    exported: Dict[int, tuple] = {}
+    template = copy.copy(planner)
+    if planner.collision_checker is not None:
+        template.collision_checker = copy.copy(planner.collision_checker)
+        _export_arrays(template.collision_checker, _CHECKER_SHARED_FIELDS, 'checker', specs, shms, exported)
+    _export_arrays(template, _PLANNER_SHARED_FIELDS, 'planner', specs, shms, exported)
+
+    cancel_flag = mp.RawValue('b', 0)
+    results = []
+    best_cost = math.inf
+    t0 = time.perf_counter()
+
+    if verbose:
+        print(f"\n[Hybrid A*] 多目标并行规划: {len(goals)} 个目标")
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(template, specs, cancel_flag)
+        ) as pool:
+            futures = {
+                pool.submit(_plan_worker, int(i), start, goals[i], plan_kwargs): int(i)
+                for i in order
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except CancelledError:
+                    result = {
+                        'goal_index': i, 'goal': goals[i], 'status': PlanStatus.CANCELLED,
+                        'cost': None, 'path': None, 'nodes_expanded': 0, 'time': 0.0,
+                    }
+                results.append(result)
+
+                if result['status'] == PlanStatus.SUCCESS:
+                    best_cost = min(best_cost, result['cost'])
+
+                # 最优性判断: 未完成目标的下界都不小于当前最优 → 取消
+                if cancel_when_best and best_cost < math.inf and not cancel_flag.value:
+                    pending = [j for f, j in futures.items() if not f.done()]
+                    if pending and all(lower_bounds[j] >= best_cost for j in pending):
+                        cancel_flag.value = 1
+                        for f in futures:
+                            f.cancel()
+                        if verbose:
+                            print(f"  最优代价 {best_cost:.2f} 已可证明，取消其余 {len(pending)} 个搜索")
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    results.sort(key=lambda r: (r['status'] != PlanStatus.SUCCESS,
+                                r['cost'] if r['cost'] is not None else math.inf))
+
+    if verbose:
+        n_success = sum(r['status'] == PlanStatus.SUCCESS for r in results)
+        print(f"  成功: {n_success}/{len(goals)}，用时 {time.perf_counter() - t0:.2f} s")
+        if results and results[0]['status'] == PlanStatus.SUCCESS:
+            print(f"  最优目标: #{results[0]['goal_index']}，代价 {results[0]['cost']:.2f}")
+
+    return results
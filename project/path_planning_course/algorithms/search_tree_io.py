@@ -0,0 +1,272 @@
+"""
+搜索树导出与读取
+
+调试规划失败时需要看到整棵搜索树，而大地图上一次搜索可能扩展上百万个节点。
+这里把每次扩展流式写入一个紧凑的二进制列存文件:
+
+- 写入端只保留一个固定大小的块缓冲，内存占用有上限
+- 读取端用np.memmap按需映射，支持抽稀，适合绘制百万级节点
+
+文件格式（小端序）:
+    MAGIC (8 bytes)
+    块 × N:   uint32 行数n (n>0)，随后依次是每一列的n个值
+    结束块:   uint32 0，uint32 元数据长度，元数据JSON
+    节点id = 写入顺序（行号），不单独存储
+
+写入中途崩溃时没有结束块，读取端仍能读出已完整写入的块。
+
+作者: Path Planning Course Team
+"""
+
+import json
+import os
+import struct
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+MAGIC = b'HASTREE1'
+
+# 列名与数据类型（按文件中的存储顺序）
+COLUMNS = (
+    ('parent_id', np.dtype('<i4')),     # 父节点id，根节点为-1
+    ('primitive_id', np.dtype('<i2')),  # 运动原语编号，根节点为-1
+    ('x', np.dtype('<f4')),
+    ('y', np.dtype('<f4')),
+    ('theta', np.dtype('<f4')),
+    ('g', np.dtype('<f4')),
+    ('h', np.dtype('<f4')),
+)
+_ROW_BYTES = sum(dtype.itemsize for _, dtype in COLUMNS)
+
+
+class SearchTreeWriter:
+    """
+    搜索树流式写入器
+
+    使用方法:
+        >>> with SearchTreeWriter('tree.bin') as writer:
+        ...     planner.plan(start, goal, tree_writer=writer)
+    """
+
+    def __init__(self, path: str, chunk_size: int = 65536, metadata: Optional[dict] = None):
+        """
+        Args:
+            path: 输出文件路径
+            chunk_size: 每块的行数（即内存中缓冲的最大节点数）
+            metadata: 附加元数据（需可JSON序列化），关闭时写入文件尾
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.metadata = dict(metadata or {})
+
+        self._buffers = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in COLUMNS}
+        self._count = 0      # 当前块已缓冲的行数
+        self.n_nodes = 0     # 已写入的总行数
+
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+
+    def write(
+        self,
+        parent_id: int,
+        primitive_id: int,
+        x: float,
+        y: float,
+        theta: float,
+        g: float,
+        h: float
+    ) -> int:
+        """
+        写入一个扩展节点
+
+        Returns:
+            该节点的id（写入顺序）
+        """
+        i = self._count
+        b = self._buffers
+        b['parent_id'][i] = parent_id
+        b['primitive_id'][i] = primitive_id
+        b['x'][i] = x
+        b['y'][i] = y
+        b['theta'][i] = theta
+        b['g'][i] = g
+        b['h'][i] = h
+
+        self._count += 1
+        node_id = self.n_nodes
+        self.n_nodes += 1
+
+        if self._count == self.chunk_size:
+            self.flush()
+
+        return node_id
+
+    def flush(self):
+        """把缓冲的行作为一个块写入文件"""
+        n = self._count
+        if n == 0:
+            return
+        self._file.write(struct.pack('<I', n))
+        for name, _ in COLUMNS:
+            self._file.write(self._buffers[name][:n].tobytes())
+        self._file.flush()
+        self._count = 0
+
+    def close(self):
+        """写入剩余数据和元数据，关闭文件"""
+        if self._file.closed:
+            return
+        self.flush()
+        meta = json.dumps(self.metadata).encode('utf-8')
+        self._file.write(struct.pack('<II', 0, len(meta)))
+        self._file.write(meta)
+        self._file.close()
+
+    def __enter__(self) -> 'SearchTreeWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SearchTreeReader:
+    """
+    搜索树惰性读取器
+
+    打开文件时只扫描块头，数据通过np.memmap按需读取。
+
+    使用方法:
+        >>> tree = SearchTreeReader('tree.bin')
+        >>> data = tree.load(columns=('x', 'y'), max_nodes=100000)
+        >>> edges = tree.load_edges(max_nodes=200000)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 由SearchTreeWriter写出的文件
+        """
+        self.path = path
+        self.metadata: dict = {}
+        self._chunks: List[tuple] = []  # (起始节点id, 行数, 数据偏移)
+
+        file_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是搜索树文件: {path}")
+
+            start = 0
+            while True:
+                header = f.read(4)
+                if len(header) < 4:
+                    break  # 写入被中断，没有结束块
+                n, = struct.unpack('<I', header)
+                if n == 0:
+                    meta_len, = struct.unpack('<I', f.read(4))
+                    self.metadata = json.loads(f.read(meta_len).decode('utf-8'))
+                    break
+
+                offset = f.tell()
+                if offset + n * _ROW_BYTES > file_size:
+                    break  # 不完整的块
+                self._chunks.append((start, n, offset))
+                start += n
+                f.seek(offset + n * _ROW_BYTES)
+
+        self.n_nodes = start
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    def _chunk_columns(self, n: int, offset: int, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+        """映射一个块中的指定列（不读入内存）"""
+        arrays = {}
+        for name, dtype in COLUMNS:
+            if name in columns:
+                arrays[name] = np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=(n,))
+            offset += n * dtype.itemsize
+        return arrays
+
+    def iter_chunks(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        逐块迭代
+
+        Args:
+            columns: 需要的列名，默认全部
+
+        Yields:
+            {列名: memmap数组}，另含'node_id'
+        """
+        columns = [name for name, _ in COLUMNS] if columns is None else columns
+        for start, n, offset in self._chunks:
+            arrays = self._chunk_columns(n, offset, columns)
+            arrays['node_id'] = np.arange(start, start + n)
+            yield arrays
+
+    def _stride(self, decimate: int, max_nodes: Optional[int]) -> int:
+        if max_nodes is not None and self.n_nodes > max_nodes:
+            decimate = max(decimate, -(-self.n_nodes // max_nodes))
+        return max(1, decimate)
+
+    def load(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        decimate: int = 1,
+        max_nodes: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        读取（抽稀后的）节点数据
+
+        Args:
+            columns: 需要的列名，默认全部
+            decimate: 每隔多少个节点取一个
+            max_nodes: 最多返回的节点数，超过时自动增大抽稀间隔
+
+        Returns:
+            {列名: 数组}，另含'node_id'
+        """
+        stride = self._stride(decimate, max_nodes)
+        parts: Dict[str, list] = {}
+
+        for chunk in self.iter_chunks(columns):
+            # 全局节点id是stride整数倍的行
+            first = (-int(chunk['node_id'][0])) % stride
+            for name, array in chunk.items():
+                parts.setdefault(name, []).append(np.asarray(array[first::stride]))
+
+        names = [name for name, _ in COLUMNS] if columns is None else list(columns)
+        result = {}
+        for name in names + ['node_id']:
+            if name in parts:
+                result[name] = np.concatenate(parts[name])
+            else:
+                dtype = dict(COLUMNS).get(name, np.dtype(int))
+                result[name] = np.empty(0, dtype=dtype)
+        return result
+
+    def load_edges(self, decimate: int = 1, max_nodes: Optional[int] = None) -> np.ndarray:
+        """
+        读取父子连线，用于LineCollection绘制
+
+        父节点坐标需要随机访问，因此x/y两列会完整读入（每个节点8字节）；
+        其余列只读取抽稀后的部分。
+
+        Args:
+            decimate: 每隔多少个节点取一个
+            max_nodes: 最多返回的连线数
+
+        Returns:
+            连线数组 (K, 2, 2): [[父x, 父y], [子x, 子y]]
+        """
+        xy = self.load(columns=('x', 'y'))
+        nodes = self.load(columns=('parent_id', 'x', 'y'), decimate=decimate, max_nodes=max_nodes)
+
+        has_parent = nodes['parent_id'] >= 0
+        parent = nodes['parent_id'][has_parent]
+        edges = np.empty((len(parent), 2, 2), dtype=np.float32)
+        edges[:, 0, 0] = xy['x'][parent]
+        edges[:, 0, 1] = xy['y'][parent]
+        edges[:, 1, 0] = nodes['x'][has_parent]
+        edges[:, 1, 1] = nodes['y'][has_parent]
+        return edges
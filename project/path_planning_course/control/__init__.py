@@ -3,14 +3,34 @@
 
 包含:
 - Pure Pursuit控制器 (control.pure_pursuit)
+- 批量Pure Pursuit控制器 (control.batch_pure_pursuit)
 - MPC控制器 (control.mpc_controller)
+- 最近点跟踪查询 (control.path_tracking)
+- 参考路径预计算几何 (control.reference_path)
+- 线段空间索引 (control.segment_index)
+- 流式统计 (control.statistics)
+- 多进程回归测试 (control.campaign)
 """
 
 from .pure_pursuit import PurePursuitController
+from .batch_pure_pursuit import BatchPurePursuitController
 from .mpc_controller import MPCController
+from .path_tracking import NearestPointTracker
+from .reference_path import ReferencePath
+from .segment_index import SegmentIndex
+from .statistics import RunningStats, RingBuffer
+from .campaign import CampaignRunner, make_runs
 
 __all__ = [
     'PurePursuitController',
+    'BatchPurePursuitController',
     'MPCController',
+    'NearestPointTracker',
+    'ReferencePath',
+    'SegmentIndex',
+    'RunningStats',
+    'RingBuffer',
+    'CampaignRunner',
+    'make_runs',
 ]
 
@@ -0,0 +1,447 @@
+"""
+批量Pure Pursuit控制器（车队规模）
+
+一个进程里控制/仿真几百辆车时，逐辆调用 PurePursuitController.control
+的Python开销远大于计算本身。BatchPurePursuitController 把M辆车放在一起:
+
+- 状态是 (M, 4) 数组，一次调用返回 M 个转向角
+- 参考路径可以所有车共用 (N, 2)，也可以每辆车一条、补齐到同样长度 (M, N, 2)
+- 每辆车的跟踪进度（上次匹配的线段）和统计量都存放在长度为M的数组里
+
+几何计算与 PurePursuitController.query_geometry 相同:
+窗口内点到线段投影 → 弧长s和带符号横向误差 → 曲率和目标速度插值 →
+（曲率自适应的）预瞄距离 → 按弧长 s + Ld 插值预瞄点。
+整条路径搜索与单车控制器共用 NearestPointTracker.global_segment_candidates
+（KD树最近路径点 + 前后两段线段），两者选出的线段相同。
+最近点查询方式（nearest_search）、曲率自适应预瞄（curvature_gain）和
+速度曲线（vehicle / a_lat_max）的含义都与 PurePursuitController 相同
+
+作者: Path Planning Course Team
+"""
+
+import time
+import numpy as np
+from typing import Dict, Optional, Union
+from control.path_tracking import NearestPointTracker
+from control.reference_path import ReferencePath
+from control.statistics import RunningStats
+
+
+class BatchPurePursuitController:
+    """
+    批量Pure Pursuit控制器
+
+    使用方法:
+        >>> controller = BatchPurePursuitController(wheelbase=2.7, k_lookahead=1.0, ld_min=2.0)
+        >>> steer = controller.control(states, ref_path)                 # 共用路径 (N, 2)
+        >>> steer = controller.control(states, paths, path_lengths)      # 每车一条 (M, N, 2)
+    """
+
+    def __init__(
+        self,
+        wheelbase: float = 2.7,
+        k_lookahead: Union[float, np.ndarray] = 1.0,
+        ld_min: Union[float, np.ndarray] = 2.0,
+        max_steer: float = np.deg2rad(35),
+        search_window: int = 50,
+        relocalize_dist: float = 5.0,
+        nearest_search: str = 'global',
+        curvature_gain: Union[float, np.ndarray] = 0.0,
+        vehicle=None,
+        a_lat_max: Optional[float] = None,
+        arc_window: float = 20.0
+    ):
+        """
+        初始化批量控制器
+
+        Args:
+            wheelbase: 车辆轴距 (m)
+            k_lookahead: 预瞄距离系数，标量或每车一个 (M,)
+            ld_min: 最小预瞄距离 (m)，标量或每车一个 (M,)
+            max_steer: 最大转向角 (rad)
+            search_window: 跟踪窗口大小（线段数），向后延伸 window // 5
+            relocalize_dist: 窗口内最近距离超过该值的车辆改为整条路径搜索 (m)
+            nearest_search: 最近点查询方式（同PurePursuitController）
+                - 'global': 每个周期整条路径搜索（默认）
+                - 'window': 窗口跟踪，丢失时先在上次弧长 ± arc_window 内重新定位，
+                  再回退到整条路径搜索
+                - 'index': 只在上次弧长 ± arc_window 内搜索，找不到时整条路径搜索
+            curvature_gain: 曲率自适应预瞄系数 c (m)，标量或每车一个 (M,)
+            vehicle: 车辆模型，给定时计算速度曲线，每周期的目标速度见 self.target_speed
+            a_lat_max: 速度曲线的最大横向加速度 (m/s²)，None表示 vehicle.a_max
+            arc_window: 按弧长重新定位时的弧长容差 (m)
+        """
+        if nearest_search not in ('window', 'global', 'index'):
+            raise ValueError(f"未知的最近点查询方式: {nearest_search}")
+
+        self.L = wheelbase
+        self.k = k_lookahead
+        self.ld_min = ld_min
+        self.max_steer = max_steer
+        self.curvature_gain = curvature_gain
+        self.vehicle = vehicle
+        self.a_lat_max = a_lat_max
+        self.nearest_search = nearest_search
+        self.arc_window = arc_window
+        self.search_window = search_window
+        self.backtrack = search_window // 5
+        self.relocalize_dist = relocalize_dist
+
+        # 路径（按传入的数组缓存）
+        self._path_source = None
+        self._lengths_source = None
+
+        # 每车状态（第一次调用时按M分配）
+        self.n_vehicles = 0
+        self.segment: Optional[np.ndarray] = None       # 上次匹配的线段，-1表示未初始化
+        self.s: Optional[np.ndarray] = None             # 投影弧长
+        self.cross_track_error: Optional[np.ndarray] = None
+        self.curvature: Optional[np.ndarray] = None
+        self.target_speed: Optional[np.ndarray] = None  # 没有速度曲线时为None
+        self.lookahead_distance: Optional[np.ndarray] = None
+        self.lookahead_point: Optional[np.ndarray] = None
+
+        self.n_global_queries = 0
+        self.tick_time_stats = RunningStats()  # 每周期计算耗时 (s)
+
+        print(f"[Batch Pure Pursuit] 初始化完成")
+        print(f"  轴距 L = {wheelbase:.2f} m")
+        print(f"  跟踪窗口 = {search_window} 段")
+
+    # ===== 路径预处理 =====
+
+    def set_path(self, ref_path: np.ndarray, path_lengths: Optional[np.ndarray] = None):
+        """
+        预处理参考路径（control()在路径数组变化时自动调用）
+
+        Args:
+            ref_path: 共用路径 (N, 2|4)，或每车一条 (M, N, 2|4)
+            path_lengths: 每车路径的有效点数 (M,)，None表示全部有效；
+                有效点之后的部分会被替换为最后一个有效点（零长度线段）
+        """
+        self._path_source = ref_path
+        self._lengths_source = path_lengths
+
+        xy = np.asarray(ref_path, dtype=float)[..., :2]
+        self.shared_path = xy.ndim == 2
+        if self.shared_path:
+            xy = xy[None]
+
+        n_paths, n_points, _ = xy.shape
+        if path_lengths is not None:
+            lengths = np.asarray(path_lengths, dtype=int)
+            xy = xy.copy()
+            pad = np.arange(n_points)[None, :] >= lengths[:, None]
+            last = xy[np.arange(n_paths), lengths - 1]
+            xy[pad] = np.repeat(last, n_points - lengths, axis=0)
+        else:
+            lengths = np.full(n_paths, n_points)
+
+        self.xy = xy                                            # (P, N, 2)，P=1或M
+        self.lengths = lengths
+        self.seg_vec = np.diff(xy, axis=1)                      # (P, N-1, 2)
+        self.seg_len = np.hypot(self.seg_vec[..., 0], self.seg_vec[..., 1])
+        self.seg_len_sq = np.maximum(self.seg_len**2, 1e-12)
+        self.s_table = np.concatenate(
+            [np.zeros((n_paths, 1)), np.cumsum(self.seg_len, axis=1)], axis=1
+        )                                                       # (P, N)
+        self.path_length = self.s_table[:, -1]
+        self.n_segments = max(n_points - 1, 1)
+
+        # 整条路径搜索用的KD树（每条路径一个，只含有效点，第一次需要时构建）
+        self._trackers: Dict[int, NearestPointTracker] = {}
+
+        # 各行弧长加上递增的偏移后首尾相接，整张表单调，
+        # 一次 np.searchsorted 就能完成所有车辆的逐行二分查找
+        self._row_offset = np.arange(n_paths) * (self.path_length.max() + 1.0)
+        self._s_flat = (self.s_table + self._row_offset[:, None]).ravel()
+
+        # 曲率和速度曲线: 每条路径的有效部分单独计算（与单车控制器相同），
+        # 补齐部分沿用最后一个有效点的值
+        self.curvature_table = np.empty((n_paths, n_points))
+        self.speed_table = None if self.vehicle is None else np.empty((n_paths, n_points))
+        for row in range(n_paths):
+            n = lengths[row]
+            ref = ReferencePath(xy[row, :n], vehicle=self.vehicle, a_lat_max=self.a_lat_max)
+            self.curvature_table[row, :n] = ref.curvature
+            self.curvature_table[row, n:] = ref.curvature[-1]
+            if self.speed_table is not None:
+                self.speed_table[row, :n] = ref.speed
+                self.speed_table[row, n:] = ref.speed[-1]
+
+        self.reset_tracking()
+
+    def _allocate(self, n_vehicles: int):
+        """按车辆数分配每车的进度和统计数组"""
+        self.n_vehicles = n_vehicles
+        self.segment = np.full(n_vehicles, -1, dtype=int)
+        self.s = np.zeros(n_vehicles)
+        self.cross_track_error = np.zeros(n_vehicles)
+        self.curvature = np.zeros(n_vehicles)
+        self.lookahead_distance = np.zeros(n_vehicles)
+        self.lookahead_point = np.zeros((n_vehicles, 2))
+        self.reset_statistics()
+
+    def reset_tracking(self):
+        """忘记所有车辆的跟踪进度，下一周期整条路径搜索"""
+        if self.segment is not None:
+            self.segment[:] = -1
+
+    # ===== 几何查询 =====
+
+    def _path_rows(self, vehicles: np.ndarray) -> np.ndarray:
+        """车辆对应的路径行号（共用路径时全是0）"""
+        return np.zeros_like(vehicles) if self.shared_path else vehicles
+
+    def _tracker(self, row: int) -> NearestPointTracker:
+        """第row条路径（有效部分）的全局查询器"""
+        if row not in self._trackers:
+            self._trackers[row] = NearestPointTracker(self.xy[row, :self.lengths[row]], mode='global')
+        return self._trackers[row]
+
+    def _project(self, pos: np.ndarray, rows: np.ndarray, seg_idx: np.ndarray):
+        """
+        每辆车投影到给定的一组线段上，取最近的一段
+
+        Args:
+            pos: 车辆位置 (K, 2)
+            rows: 路径行号 (K,)
+            seg_idx: 候选线段索引 (K, W)
+
+        Returns:
+            (segment, t, dist_sq)，形状都是 (K,)
+        """
+        r = rows[:, None]
+        a = self.xy[r, seg_idx]                  # (K, W, 2)
+        d = self.seg_vec[r, seg_idx]             # (K, W, 2)
+        rel = pos[:, None, :] - a
+
+        t = np.einsum('kwi,kwi->kw', rel, d) / self.seg_len_sq[r, seg_idx]
+        np.clip(t, 0.0, 1.0, out=t)
+        err = rel - t[..., None] * d
+        dist_sq = np.einsum('kwi,kwi->kw', err, err)
+
+        k = np.argmin(dist_sq, axis=1)
+        pick = np.arange(len(pos))
+        return seg_idx[pick, k], t[pick, k], dist_sq[pick, k]
+
+    def _project_arc_window(self, pos: np.ndarray, rows: np.ndarray, s: np.ndarray):
+        """
+        每辆车投影到弧长在 s ± arc_window 内的线段上（与SegmentIndex.nearest的弧长窗口相同）
+
+        Returns:
+            (segment, t, dist_sq)，形状都是 (K,)
+        """
+        n_points = self.xy.shape[1]
+        offset = self._row_offset[rows]
+        base = rows * n_points
+        lo = np.searchsorted(self._s_flat, s - self.arc_window + offset, side='left') - 1 - base
+        hi = np.searchsorted(self._s_flat, s + self.arc_window + offset, side='right') - 1 - base
+        lo = np.clip(lo, 0, self.n_segments - 1)
+        hi = np.clip(hi, lo, self.n_segments - 1)
+
+        width = int((hi - lo).max()) + 1
+        seg_idx = np.minimum(lo[:, None] + np.arange(width), hi[:, None])
+        return self._project(pos, rows, seg_idx)
+
+    def query_geometry(self, states: np.ndarray, lookahead_dist: Optional[np.ndarray] = None):
+        """
+        所有车辆的路径几何（最近线段、弧长、横向误差、曲率、目标速度、预瞄点），
+        结果保存在对象属性中
+
+        Args:
+            states: 车辆状态 (M, 4)
+            lookahead_dist: 预瞄距离 (M,)，None表示按速度和曲率计算
+        """
+        m = len(states)
+        pos = states[:, :2]
+        vehicles = np.arange(m)
+        rows = self._path_rows(vehicles)
+
+        segment = np.empty(m, dtype=int)
+        t = np.empty(m)
+        dist_sq = np.full(m, np.inf)
+        max_dist_sq = self.relocalize_dist**2
+
+        # 窗口跟踪: 已初始化的车辆只搜索 [上次线段 - backtrack, + window)
+        tracked = self.segment >= 0
+        if self.nearest_search == 'window' and tracked.any():
+            idx = np.flatnonzero(tracked)
+            start = np.maximum(self.segment[idx] - self.backtrack, 0)
+            window = np.arange(self.search_window)
+            # 最近线段落在窗口末端的车辆继续前移窗口（一个周期走过了整个窗口）
+            for _ in range(self.n_segments // max(self.search_window - 1, 1) + 1):
+                seg_idx = np.minimum(start[:, None] + window, self.n_segments - 1)
+                seg, tt, d2 = self._project(pos[idx], rows[idx], seg_idx)
+                segment[idx], t[idx], dist_sq[idx] = seg, tt, d2
+
+                slide = (seg == seg_idx[:, -1]) & (tt >= 1.0) & (seg < self.n_segments - 1) & (seg > start)
+                if not slide.any():
+                    break
+                idx, start = idx[slide], seg[slide]
+
+        # 窗口丢失（或'index'模式）: 在上次弧长附近重新定位，不会跳到另一圈
+        lost = tracked & (dist_sq > max_dist_sq)
+        if self.nearest_search != 'global' and lost.any():
+            idx = np.flatnonzero(lost)
+            seg, tt, d2 = self._project_arc_window(pos[idx], rows[idx], self.s[idx])
+            found = d2 <= max_dist_sq
+            idx = idx[found]
+            segment[idx], t[idx], dist_sq[idx] = seg[found], tt[found], d2[found]
+
+        # 未初始化或偏离过远的车辆: 整条路径搜索（与单车控制器相同的规则）
+        lost = dist_sq > max_dist_sq
+        if lost.any():
+            idx = np.flatnonzero(lost)
+            self.n_global_queries += len(idx)
+            seg_idx = np.empty((len(idx), 2), dtype=int)
+            for row in np.unique(rows[idx]):
+                in_row = rows[idx] == row
+                seg_idx[in_row] = self._tracker(row).global_segment_candidates(pos[idx[in_row]])
+            segment[idx], t[idx], dist_sq[idx] = self._project(pos[idx], rows[idx], seg_idx)
+
+        self.segment = segment
+
+        # 弧长与带符号横向误差（在路径左侧为正）
+        seg_len = self.seg_len[rows, segment]
+        self.s = self.s_table[rows, segment] + t * seg_len
+        d = self.seg_vec[rows, segment]
+        rel = pos - self.xy[rows, segment]
+        cross = d[:, 0] * rel[:, 1] - d[:, 1] * rel[:, 0]
+        self.cross_track_error = np.where(cross >= 0, 1.0, -1.0) * np.sqrt(dist_sq)
+
+        # 投影点处的曲率和目标速度（路径点上的值线性插值）
+        nxt = np.minimum(segment + 1, self.xy.shape[1] - 1)
+        curv = self.curvature_table
+        self.curvature = curv[rows, segment] + t * (curv[rows, nxt] - curv[rows, segment])
+        if self.speed_table is not None:
+            speed = self.speed_table
+            self.target_speed = speed[rows, segment] + t * (speed[rows, nxt] - speed[rows, segment])
+
+        # 预瞄距离（参数可以每车不同），弯道上按曲率缩短
+        if lookahead_dist is None:
+            lookahead_dist = self.k * np.abs(states[:, 3]) + self.ld_min
+            if np.any(np.asarray(self.curvature_gain) > 0):
+                lookahead_dist = np.maximum(
+                    lookahead_dist / (1.0 + self.curvature_gain * np.abs(self.curvature)), self.ld_min
+                )
+        self.lookahead_distance = np.broadcast_to(lookahead_dist, (m,)).astype(float)
+
+        # 预瞄点: 所有车辆一次searchsorted（按行偏移后的弧长表）
+        target = np.minimum(self.s + lookahead_dist, self.path_length[rows])
+        flat = np.searchsorted(self._s_flat, target + self._row_offset[rows], side='right') - 1
+        n_points = self.xy.shape[1]
+        seg = np.clip(flat - rows * n_points, 0, self.n_segments - 1)
+        if n_points == 1:
+            self.lookahead_point = self.xy[rows, 0].copy()
+            return
+        frac = (target - self.s_table[rows, seg]) / np.maximum(self.seg_len[rows, seg], 1e-12)
+        frac = np.clip(frac, 0.0, 1.0)
+        self.lookahead_point = self.xy[rows, seg] + frac[:, None] * self.seg_vec[rows, seg]
+
+    # ===== 控制 =====
+
+    def control(
+        self,
+        states: np.ndarray,
+        ref_path: np.ndarray,
+        path_lengths: Optional[np.ndarray] = None,
+        active: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        批量Pure Pursuit控制
+
+        Args:
+            states: 车辆状态 (M, 4)
+            ref_path: 共用路径 (N, 2|4)，或每车一条 (M, N, 2|4)
+            path_lengths: 每车路径的有效点数 (M,)
+            active: 布尔掩码 (M,)，只有活动车辆计入统计，None表示全部
+
+        Returns:
+            steer: 转向角 (M,)
+        """
+        tick_start = time.perf_counter()
+        states = np.asarray(states, dtype=float)
+
+        if ref_path is not self._path_source or path_lengths is not self._lengths_source:
+            self.set_path(ref_path, path_lengths)
+        if self.segment is None or len(states) != self.n_vehicles:
+            self._allocate(len(states))
+
+        theta = states[:, 2]
+
+        # 步骤1-3: 路径几何（最近线段 + 横向误差 + 曲率自适应预瞄距离 + 预瞄点）
+        self.query_geometry(states)
+        ld = self.lookahead_distance
+
+        # 步骤4-6: 转到车辆坐标系，Pure Pursuit公式
+        dx = self.lookahead_point[:, 0] - states[:, 0]
+        dy = self.lookahead_point[:, 1] - states[:, 1]
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        local_x = dx * cos_theta + dy * sin_theta
+        local_y = -dx * sin_theta + dy * cos_theta
+        alpha = np.arctan2(local_y, local_x)
+        steer = np.arctan2(2 * self.L * np.sin(alpha), ld)
+
+        # 步骤7: 限幅
+        np.clip(steer, -self.max_steer, self.max_steer, out=steer)
+
+        self._update_statistics(steer, active)
+        self.tick_time_stats.update(time.perf_counter() - tick_start)
+
+        return steer
+
+    # ===== 统计 =====
+
+    def _update_statistics(self, steer: np.ndarray, active: Optional[np.ndarray]):
+        """按车更新横向误差和转向角统计（Welford在线均值/方差）"""
+        mask = np.ones(self.n_vehicles, dtype=bool) if active is None else np.asarray(active, dtype=bool)
+        err = np.abs(self.cross_track_error)
+
+        self.count += mask
+        n = np.maximum(self.count, 1)
+        delta = np.where(mask, err - self.err_mean, 0.0)
+        self.err_mean += delta / n
+        self.err_m2 += delta * np.where(mask, err - self.err_mean, 0.0)
+        self.err_max = np.where(mask, np.maximum(self.err_max, err), self.err_max)
+
+        abs_steer = np.abs(steer)
+        self.steer_sum += np.where(mask, abs_steer, 0.0)
+        self.steer_max = np.where(mask, np.maximum(self.steer_max, abs_steer), self.steer_max)
+
+    def get_statistics(self) -> dict:
+        """
+        每车统计信息
+
+        Returns:
+            字典，值都是长度M的数组（与PurePursuitController.get_statistics同名），
+            另有整体的 mean_tick_time / max_tick_time
+        """
+        if self.segment is None:
+            return {}
+
+        n = np.maximum(self.count, 1)
+        stats = {
+            'ticks': self.count.copy(),
+            'mean_lateral_error': self.err_mean.copy(),
+            'max_lateral_error': self.err_max.copy(),
+            'std_lateral_error': np.sqrt(self.err_m2 / n),
+            'mean_steer': self.steer_sum / n,
+            'max_steer': self.steer_max.copy(),
+        }
+        if self.tick_time_stats.count:
+            stats['mean_tick_time'] = self.tick_time_stats.mean
+            stats['max_tick_time'] = self.tick_time_stats.max
+        return stats
+
+    def reset_statistics(self):
+        """重置统计信息"""
+        m = self.n_vehicles
+        self.count = np.zeros(m, dtype=int)
+        self.err_mean = np.zeros(m)
+        self.err_m2 = np.zeros(m)
+        self.err_max = np.zeros(m)
+        self.steer_sum = np.zeros(m)
+        self.steer_max = np.zeros(m)
+        self.tick_time_stats.reset()
@@ -0,0 +1,288 @@
+"""
+路径跟踪回归测试（多进程批量运行）
+
+回归测试要在几百条参考路径（圆、S型曲线、规划器输出）上跑多种控制器。
+一次运行之间互不相关，CampaignRunner 把它们分发到进程池:
+
+- 每次运行是一个字典 {'run_id', 'controller', 'path', 'params'}，
+  controller 为 'pure_pursuit'（PathFollowingSimulator）或 'mpc'（lesson4_demo的MPC循环）
+- 每完成一次运行，立即把指标作为一行JSON追加到结果文件（JSON Lines）并刷到磁盘
+- 中断后用同一个结果文件重新运行: 已成功的run_id直接跳过，只跑剩下的和失败的
+
+使用方法:
+    >>> runs = make_runs({'circle': create_circular_path(), 's_curve': create_s_curve_path()},
+    ...                  {'pp': ('pure_pursuit', {'ld_min': 3.0}), 'mpc': ('mpc', {})})
+    >>> results = CampaignRunner('campaign.jsonl', workers=4).run(runs)
+
+作者: Path Planning Course Team
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+import traceback
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+
+def _default_initial_state(path: np.ndarray) -> np.ndarray:
+    """路径起点、起点航向、参考速度（没有速度列时2 m/s）"""
+    theta = path[0, 2] if path.shape[1] > 2 else 0.0
+    v = path[0, 3] if path.shape[1] > 3 else 2.0
+    return np.array([path[0, 0], path[0, 1], theta, v], dtype=float)
+
+
+def run_pure_pursuit(
+    path: np.ndarray,
+    initial_state: Optional[np.ndarray] = None,
+    max_steps: int = 1000,
+    goal_tolerance: float = 0.5,
+    dt: float = 0.1,
+    **controller_kwargs
+) -> dict:
+    """
+    一次Pure Pursuit路径跟踪（PathFollowingSimulator.simulate）
+
+    Args:
+        path: 参考路径 (N, 2|4)
+        initial_state: 初始状态 [x, y, θ, v]，None表示路径起点
+        max_steps, goal_tolerance, dt: 同 PathFollowingSimulator
+        **controller_kwargs: 传给 PurePursuitController
+
+    Returns:
+        simulate 返回的 info 字典
+    """
+    from control.pure_pursuit import PurePursuitController, PathFollowingSimulator
+    from vehicle.bicycle_model import BicycleModel
+
+    path = np.asarray(path, dtype=float)
+    if initial_state is None:
+        initial_state = _default_initial_state(path)
+
+    controller = PurePursuitController(**controller_kwargs)
+    simulator = PathFollowingSimulator(controller, BicycleModel(L=controller.L), dt=dt)
+    _, info = simulator.simulate(np.asarray(initial_state, dtype=float), path, max_steps, goal_tolerance)
+    return info
+
+
+def run_mpc(
+    path: np.ndarray,
+    initial_state: Optional[np.ndarray] = None,
+    max_steps: int = 200,
+    **controller_kwargs
+) -> dict:
+    """
+    一次MPC轨迹跟踪（与 examples/lesson4_demo.py 的仿真循环相同）
+
+    Args:
+        path: 参考轨迹 (N, 4) [x, y, θ, v]，按时间步长采样
+        initial_state: 初始状态，None表示路径起点
+        max_steps: 最大仿真步数（不超过 len(path) - horizon - 2）
+        **controller_kwargs: 传给 MPCController（Q/R/Qf可以是列表）
+
+    Returns:
+        指标字典: steps / mean_lateral_error / max_lateral_error / mean_steer / max_steer
+        以及 MPCController.get_statistics 的求解耗时
+    """
+    from control.mpc_controller import MPCController
+    from vehicle.bicycle_model import BicycleModel
+
+    path = np.asarray(path, dtype=float)
+    if initial_state is None:
+        initial_state = _default_initial_state(path)
+    for name in ('Q', 'R', 'Qf'):
+        if controller_kwargs.get(name) is not None:
+            controller_kwargs[name] = np.asarray(controller_kwargs[name], dtype=float)
+
+    mpc = MPCController(**controller_kwargs)
+    vehicle = BicycleModel(L=mpc.L)
+
+    state = np.asarray(initial_state, dtype=float).copy()
+    n_steps = min(max_steps, len(path) - mpc.N - 2)
+    trajectory = np.empty((n_steps + 1, 4))
+    trajectory[0] = state
+    steers = np.empty(n_steps)
+
+    for step in range(n_steps):
+        control = mpc.control(state, path[step:])
+        state = vehicle.step(state, control, dt=mpc.dt)
+        trajectory[step + 1] = state
+        steers[step] = control[0]
+
+    # 与lesson4_demo相同: 第i步位置与第i个参考点的距离
+    n = min(len(trajectory), len(path))
+    errors = np.hypot(trajectory[:n, 0] - path[:n, 0], trajectory[:n, 1] - path[:n, 1])
+
+    return {
+        'steps': len(trajectory),
+        'mean_lateral_error': float(np.mean(errors)),
+        'max_lateral_error': float(np.max(errors)),
+        'mean_steer': float(np.mean(np.abs(steers))) if n_steps else 0.0,
+        'max_steer': float(np.max(np.abs(steers))) if n_steps else 0.0,
+        **mpc.get_statistics()
+    }
+
+
+# 控制器名称 → 单次运行函数
+RUNNERS = {
+    'pure_pursuit': run_pure_pursuit,
+    'mpc': run_mpc,
+}
+
+
+def make_runs(
+    paths: Dict[str, np.ndarray],
+    controllers: Dict[str, Tuple[str, dict]]
+) -> List[dict]:
+    """
+    路径 × 控制器配置 的全部组合
+
+    Args:
+        paths: 路径名称 → 参考路径
+        controllers: 配置名称 → (控制器类型, 参数字典)，类型见 RUNNERS
+
+    Returns:
+        运行列表，run_id 为 "配置名称/路径名称"
+    """
+    return [
+        {
+            'run_id': f"{config_name}/{path_name}",
+            'controller': kind,
+            'path': path,
+            'params': params,
+        }
+        for config_name, (kind, params) in controllers.items()
+        for path_name, path in paths.items()
+    ]
+
+
+def _to_builtin(value):
+    """numpy标量/数组 → JSON可序列化的Python类型"""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def execute_run(run: dict) -> dict:
+    """
+    在工作进程中执行一次运行（控制器的打印输出被丢弃）
+
+    Returns:
+        结果记录: run_id / controller / status ('ok' 或 'error') / wall_time / metrics 或 error
+    """
+    record = {'run_id': run['run_id'], 'controller': run['controller']}
+    start = time.perf_counter()
+    try:
+        runner = RUNNERS[run['controller']]
+        with contextlib.redirect_stdout(io.StringIO()):
+            metrics = runner(run['path'], **run.get('params', {}))
+        record['status'] = 'ok'
+        record['metrics'] = _to_builtin(metrics)
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['traceback'] = traceback.format_exc()
+    record['wall_time'] = time.perf_counter() - start
+    return record
+
+
+class CampaignRunner:
+    """
+    多进程回归测试运行器（结果流式写盘，可断点续跑）
+
+    使用方法:
+        >>> runner = CampaignRunner('results/campaign.jsonl', workers=8)
+        >>> results = runner.run(runs)          # 中断后再次调用只跑未完成的
+    """
+
+    def __init__(self, output_path: str, workers: Optional[int] = None, mp_context=None):
+        """
+        Args:
+            output_path: 结果文件（JSON Lines，每行一次运行）
+            workers: 进程数，None表示CPU核数
+            mp_context: multiprocessing上下文（例如 multiprocessing.get_context('spawn')）
+        """
+        self.output_path = output_path
+        self.workers = workers
+        self.mp_context = mp_context
+
+    def load_results(self) -> Dict[str, dict]:
+        """
+        读取已有结果（同一run_id以最后一行为准；中断时写了一半的行被忽略）
+        """
+        results = {}
+        if not os.path.exists(self.output_path):
+            return results
+        with open(self.output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                results[record['run_id']] = record
+        return results
+
+    def pending_runs(self, runs: List[dict]) -> List[dict]:
+        """还没有成功结果的运行"""
+        done = {run_id for run_id, r in self.load_results().items() if r.get('status') == 'ok'}
+        return [run for run in runs if run['run_id'] not in done]
+
+    def run(self, runs: List[dict], verbose: bool = True) -> List[dict]:
+        """
+        运行全部未完成的运行
+
+        Args:
+            runs: 运行列表（见 make_runs），run_id 必须唯一
+            verbose: 是否打印进度
+
+        Returns:
+            runs 中每次运行的结果记录（按 runs 的顺序，包含之前已完成的）
+        """
+        run_ids = [run['run_id'] for run in runs]
+        if len(set(run_ids)) != len(run_ids):
+            raise ValueError("run_id 必须唯一")
+
+        pending = self.pending_runs(runs)
+        if verbose:
+            print(f"[Campaign] 共 {len(runs)} 次运行，已完成 {len(runs) - len(pending)}，"
+                  f"待运行 {len(pending)}")
+
+        if pending:
+            directory = os.path.dirname(self.output_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # 上次中断时最后一行可能没写完，先换行，避免和新记录粘在一起
+            needs_newline = False
+            if os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 0:
+                with open(self.output_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+
+            with open(self.output_path, 'a', encoding='utf-8') as f:
+                if needs_newline:
+                    f.write('\n')
+
+                with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context) as pool:
+                    futures = [pool.submit(execute_run, run) for run in pending]
+                    for n_done, future in enumerate(as_completed(futures), 1):
+                        record = future.result()
+                        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                        if verbose:
+                            print(f"  [{n_done}/{len(pending)}] {record['run_id']}: {record['status']} "
+                                  f"({record['wall_time']:.2f} s)")
+
+        results = self.load_results()
+        return [results[run_id] for run_id in run_ids]
@@ -30,6 +30,9 @@ from typing import Tuple, Optional
 import sys
 sys.path.append('..')
 from vehicle.bicycle_model import BicycleModel
+from control.statistics import RunningStats, RingBuffer
+from control.reference_path import ReferencePath
+from control.segment_index import SegmentIndex
 
 
 class MPCController:
@@ -56,7 +59,10 @@ class MPCController:
         horizon: int = 10,
         Q: Optional[np.ndarray] = None,
         R: Optional[np.ndarray] = None,
-        Qf: Optional[np.ndarray] = None
+        Qf: Optional[np.ndarray] = None,
+        history_size: int = 10000,
+        search_radius: float = 5.0,
+        arc_window: float = 20.0
     ):
         """
         初始化MPC控制器
@@ -68,6 +74,11 @@ class MPCController:
             Q: 状态跟踪权重矩阵 (4×4)
             R: 控制代价权重矩阵 (2×2)
             Qf: 终端状态权重矩阵 (4×4)
+            history_size: 保留最近多少次求解耗时（画图用），0表示不保留；
+                统计量不受影响，始终覆盖全部求解
+            search_radius: 沿路径提取参考时，车辆到路径的最大距离 (m)，
+                超过时视为丢失，改为整条路径投影
+            arc_window: 空间索引查询的弧长容差，相对上一周期的投影弧长 (m)
         
         权重矩阵设计原则:
             Q: 对角矩阵，[q_x, q_y, q_θ, q_v]
@@ -106,8 +117,18 @@ class MPCController:
         # 车辆模型（用于线性化）
         self.vehicle = BicycleModel(L=wheelbase)
         
-        # 统计信息
-        self.solve_times = []
+        # 沿路径提取参考轨迹（按参考路径缓存，换路径时重建）
+        self.search_radius = search_radius
+        self.arc_window = arc_window
+        self.reference: Optional[ReferencePath] = None
+        self.segment_index: Optional[SegmentIndex] = None
+        self._heading: Optional[np.ndarray] = None   # 连续展开的参考航向（随参考路径重建）
+        self.last_s: Optional[float] = None
+        self._s_hint: Optional[float] = None  # reset_tracking给出的初始弧长（下一周期使用）
+        
+        # 统计信息（流式累计 + 最近的历史）
+        self.solve_time_stats = RunningStats()
+        self.solve_times = RingBuffer(history_size)
         
         print(f"[MPC] 初始化完成")
         print(f"  轴距 L = {wheelbase:.2f} m")
@@ -258,9 +279,11 @@ class MPCController:
         u_ref = np.zeros((self.N, 2))  # 参考控制（简化为0）
         x_pred = self.predict_reference(x0, u_ref)
         
+        # 线性化（整个时域一次向量化计算，与逐步调用linearize结果相同）
+        A_seq, B_seq = self.vehicle.linearize_batch(x_pred[:self.N], u_ref, self.dt)
+        
         for k in range(self.N):
-            # 线性化
-            A, B = self.linearize(x_pred[k], u_ref[k])
+            A, B = A_seq[k], B_seq[k]
             
             # 线性化动力学: x[k+1] = x_pred[k+1] + A(x[k] - x_pred[k]) + B(u[k] - u_ref[k])
             constraints.append(
@@ -287,6 +310,7 @@ class MPCController:
             
             if problem.status in [cp.OPTIMAL, cp.OPTIMAL_INACCURATE]:
                 solve_time = time.time() - start_time
+                self.solve_time_stats.update(solve_time)
                 self.solve_times.append(solve_time)
                 return u.value
             else:
@@ -339,16 +363,114 @@ class MPCController:
         # 返回第一个控制（滚动时域原理）
         return u_opt[0]
     
+    def get_reference_path(self, path: np.ndarray) -> ReferencePath:
+        """参考路径的预计算几何和空间索引（按路径数组缓存，换路径时重建）"""
+        if self.reference is None or self.reference.path is not path:
+            self.reference = ReferencePath(path, vehicle=self.vehicle)
+            self.segment_index = SegmentIndex(self.reference, cell_size=self.search_radius)
+            self._heading = np.unwrap(self.reference.heading)
+            self.last_s = None
+        return self.reference
+    
+    def reset_tracking(self, s_hint: Optional[float] = None):
+        """
+        车辆被重定位（或重新开始跟踪同一路径）时调用，下一周期整条路径投影
+        
+        Args:
+            s_hint: 已知的车辆弧长 (m)，给定时下一周期在其附近用空间索引定位
+        """
+        self.last_s = None
+        self._s_hint = s_hint
+    
+    def extract_reference(
+        self,
+        vehicle_state: np.ndarray,
+        ref_path: np.ndarray
+    ) -> np.ndarray:
+        """
+        从几何路径提取预测时域内的参考轨迹
+        
+        1. 车辆投影到路径上: 空间索引查询上一周期弧长附近、search_radius以内的最近线段
+           （路径多次经过同一区域时不会跳到另一圈）；第一次或丢失时整条路径投影
+        2. 从投影弧长开始，按参考速度·dt 沿弧长前进N步，
+           每步按弧长插值位置、航向和速度（二分查找，O(log N)）
+        
+        参考速度: 路径有速度列 (N, 4) 时使用该列，否则使用满足车辆约束的速度曲线
+        
+        Args:
+            vehicle_state: 当前状态 [x, y, θ, v]
+            ref_path: 参考路径 (M, 2) 或 (M, 4)，不需要按时间步长采样
+        
+        Returns:
+            x_ref_seq: 参考轨迹 (N+1, 4)
+        """
+        if ref_path is None or len(ref_path) < 2:
+            raise ValueError("extract_reference需要参考路径（至少2个点）")
+        ref = self.get_reference_path(ref_path)
+        pos = np.asarray(vehicle_state[:2], dtype=float)
+        if self._s_hint is not None:
+            self.last_s, self._s_hint = self._s_hint, None
+        
+        # 步骤1: 投影
+        hit = None
+        if self.last_s is not None:
+            hit = self.segment_index.nearest(pos, self.search_radius, self.last_s, self.arc_window)
+        if hit is None:
+            hit = ref.project(pos)
+        s = ref.arc_length_at(hit[0], hit[1])
+        self.last_s = s
+        
+        # 步骤2: 沿弧长前进
+        speed = ref_path[:, 3] if ref_path.shape[1] > 3 else ref.speed
+        s_seq = np.empty(self.N+1)
+        s_seq[0] = s
+        for k in range(self.N):
+            s_seq[k+1] = min(s_seq[k] + np.interp(s_seq[k], ref.s, speed) * self.dt, ref.length)
+        
+        x_ref_seq = np.empty((self.N+1, 4))
+        x_ref_seq[:, :2] = ref.interpolate(s_seq)[0]
+        x_ref_seq[:, 3] = np.interp(s_seq, ref.s, speed)
+        
+        # 航向: 连续展开后平移到车辆航向附近（避免±π处的跳变进入代价函数）
+        heading = np.interp(s_seq, ref.s, self._heading)
+        theta = vehicle_state[2]
+        offset = (heading[0] - theta + np.pi) % (2 * np.pi) - np.pi
+        x_ref_seq[:, 2] = heading - heading[0] + theta + offset
+        
+        return x_ref_seq
+    
+    def control_path(
+        self,
+        vehicle_state: np.ndarray,
+        ref_path: np.ndarray
+    ) -> np.ndarray:
+        """
+        沿几何路径的MPC控制（参考轨迹由extract_reference按车辆位置提取）
+        
+        与control()不同，调用方不需要按时间步切片参考轨迹:
+            >>> control = controller.control_path(state, path)   # 每个周期传同一条路径
+        
+        Returns:
+            control: 控制输入 [δ, a]
+        """
+        return self.control(vehicle_state, self.extract_reference(vehicle_state, ref_path))
+    
     def get_statistics(self) -> dict:
-        """获取求解统计信息"""
-        if not self.solve_times:
+        """获取求解统计信息（O(1)）"""
+        if not self.solve_time_stats.count:
             return {}
         
         return {
-            'mean_solve_time': np.mean(self.solve_times),
-            'max_solve_time': np.max(self.solve_times),
-            'total_solves': len(self.solve_times),
+            'mean_solve_time': self.solve_time_stats.mean,
+            'max_solve_time': self.solve_time_stats.max,
+            'std_solve_time': self.solve_time_stats.std,
+            'total_solves': self.solve_time_stats.count,
         }
+    
+    def reset_statistics(self):
+        """重置统计信息"""
+        self.solve_time_stats.reset()
+        self.solve_times.clear()
 
 
 # ===== 测试代码 =====
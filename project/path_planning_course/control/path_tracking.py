@@ -0,0 +1,240 @@
+"""
+路径跟踪的最近点查询
+
+控制器每个周期都要找车辆在参考路径上的最近点。对整条路径求距离是O(N)，
+长路径（几万个点）上每个控制周期的耗时会随路径长度增长。
+
+NearestPointTracker 记住上一周期匹配到的索引:
+- 'window'模式: 只在 [上次索引 - backtrack, 上次索引 + window) 内搜索，O(window)；
+  backtrack是允许的少量后退（定位噪声），默认window的1/5
+- 窗口内最近距离超过 relocalize_dist（车辆被重定位/跳变）时，
+  或者还没有上次索引时，回退到全局KD树查询，O(log N)
+- 'global'模式: 每次都用KD树全局查询
+- 'index'模式: 每次用线段空间索引（SegmentIndex）查询距离 relocalize_dist 以内、
+  弧长在上次弧长 ± arc_window 内的最近线段，O(log N)，
+  路径多次经过同一区域（环形、8字形）时不会匹配到另一圈
+
+query() 返回最近的路径点（'index'模式下取索引找到的最近线段上较近的端点）；
+query_segment() 在同样的窗口里做点到线段的投影，
+返回最近线段（横向误差按真实垂直距离计算）。
+query_segment() 在'window'模式下窗口丢失时，也先用空间索引在上次弧长附近重新定位，
+找不到才回退到KD树: KD树找最近路径点，再投影到它前后两段线段上
+（global_segment_candidates，批量控制器共用同一规则）
+
+作者: Path Planning Course Team
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+from control.reference_path import ReferencePath
+from control.segment_index import SegmentIndex
+
+
+class NearestPointTracker:
+    """
+    带进度记忆的最近点查询器
+
+    使用方法:
+        >>> tracker = NearestPointTracker(path, window=50)
+        >>> idx = tracker.query(vehicle_pos)   # 每个控制周期调用一次
+        >>> tracker.reset()                     # 车辆重定位后
+    """
+
+    def __init__(
+        self,
+        path: np.ndarray,
+        mode: str = 'window',
+        window: int = 50,
+        relocalize_dist: float = 5.0,
+        backtrack: Optional[int] = None,
+        reference: Optional[ReferencePath] = None,
+        arc_window: float = 20.0
+    ):
+        """
+        初始化最近点查询器
+
+        Args:
+            path: 参考路径，形状(N, 2)或(N, 4)
+            mode: 'window'（窗口跟踪 + KD树回退）、'global'（每次KD树查询）
+                或 'index'（线段空间索引，按弧长连续跟踪）
+            window: 向前搜索窗口的点数
+            relocalize_dist: 窗口内最近距离超过该值时视为重定位，改用全局查询 (m)
+            backtrack: 窗口向后延伸的点数，None表示 window // 5
+            reference: 同一路径的ReferencePath（线段查询使用），None时按需构建
+            arc_window: 空间索引查询的弧长容差，相对上次匹配的弧长 (m)
+        """
+        if mode not in ('window', 'global', 'index'):
+            raise ValueError(f"未知的最近点查询方式: {mode}")
+
+        self.path = path
+        self.path_xy = np.ascontiguousarray(path[:, :2], dtype=float)
+        self.mode = mode
+        self.window = window
+        self.relocalize_dist = relocalize_dist
+        self.backtrack = window // 5 if backtrack is None else backtrack
+        self.arc_window = arc_window
+
+        self._kdtree = None
+        self._reference = reference
+        self._index = None
+        self.last_index: Optional[int] = None
+        self.last_segment: Optional[int] = None
+        self.last_s: Optional[float] = None
+
+        # 统计信息
+        self.n_queries = 0
+        self.n_global_queries = 0
+
+    def reset(self, s_hint: Optional[float] = None):
+        """
+        忘记上次的匹配索引，下一次查询走全局搜索
+
+        Args:
+            s_hint: 已知的车辆弧长 (m)，给定时下一次查询改为在其附近用空间索引定位
+                （路径重叠时全局搜索无法区分是第几圈）
+        """
+        self.last_index = None
+        self.last_segment = None
+        self.last_s = s_hint
+
+    @property
+    def reference(self) -> ReferencePath:
+        if self._reference is None:
+            self._reference = ReferencePath(self.path)
+        return self._reference
+
+    @property
+    def index(self) -> SegmentIndex:
+        """线段空间索引，第一次使用时构建（格子边长取 relocalize_dist）"""
+        if self._index is None:
+            self._index = SegmentIndex(self.reference, cell_size=self.relocalize_dist)
+        return self._index
+
+    def _nearest_vertex(self, points: np.ndarray) -> np.ndarray:
+        """KD树最近路径点，points为 (2,) 或 (K, 2)；KD树在第一次使用时构建"""
+        if self._kdtree is None:
+            from scipy.spatial import cKDTree
+            self._kdtree = cKDTree(self.path_xy)
+
+        _, index = self._kdtree.query(points)
+        return index
+
+    def query_global(self, vehicle_pos: np.ndarray) -> int:
+        """KD树全局最近点查询，O(log N)"""
+        self.n_global_queries += 1
+        return int(self._nearest_vertex(vehicle_pos[:2]))
+
+    def global_segment_candidates(self, points: np.ndarray) -> np.ndarray:
+        """
+        全局最近线段查询的候选线段: KD树找最近路径点i，取它前后两段 (i-1, i)，
+        截断到有效线段范围。不计入 n_global_queries
+
+        Args:
+            points: 查询点 (2,) 或 (K, 2)（批量控制器对多辆车一次查询）
+
+        Returns:
+            线段索引 (2,) 或 (K, 2)，交给 ReferencePath.project 的segments参数
+            或批量控制器的逐行投影
+        """
+        index = self._nearest_vertex(points)
+        n_seg = max(len(self.path_xy) - 1, 1)
+        return np.stack([np.maximum(index - 1, 0), np.minimum(index, n_seg - 1)], axis=-1)
+
+    def query(self, vehicle_pos: np.ndarray) -> int:
+        """
+        查询最近点索引
+
+        Args:
+            vehicle_pos: 车辆位置 (x, y)
+
+        Returns:
+            最近点的索引（'window'模式下最多比上次的索引后退backtrack）
+        """
+        self.n_queries += 1
+
+        if self.mode == 'index':
+            index = self._query_index(vehicle_pos)
+        elif self.mode == 'global' or self.last_index is None:
+            index = self.query_global(vehicle_pos)
+        else:
+            start = max(self.last_index - self.backtrack, 0)
+            while True:
+                end = min(start + self.window, len(self.path_xy))
+                diff = self.path_xy[start:end] - vehicle_pos[:2]
+                dist_sq = np.einsum('ij,ij->i', diff, diff)
+                k = int(np.argmin(dist_sq))
+
+                # 最近点在窗口末端: 车辆一个周期走过了整个窗口，窗口继续前移
+                if k == end - start - 1 and end < len(self.path_xy) and k > 0:
+                    start += k
+                    continue
+                break
+
+            if dist_sq[k] > self.relocalize_dist**2:
+                index = self.query_global(vehicle_pos)
+            else:
+                index = start + k
+
+        self.last_index = index
+        return index
+
+    def _query_index(self, vehicle_pos: np.ndarray) -> int:
+        """'index'模式的最近点: 上次弧长附近的最近线段上较近的端点，找不到时KD树全局查询"""
+        ref = self.reference
+        hit = None
+        if self.last_s is not None and len(ref.seg_len) > 0:
+            hit = self.index.nearest(vehicle_pos, self.relocalize_dist, self.last_s, self.arc_window)
+
+        if hit is None:
+            index = self.query_global(vehicle_pos)
+        else:
+            segment = hit[0]
+            d0 = self.path_xy[segment] - vehicle_pos[:2]
+            d1 = self.path_xy[segment + 1] - vehicle_pos[:2]
+            index = segment if d0 @ d0 <= d1 @ d1 else segment + 1
+
+        self.last_s = float(ref.s[index])
+        return index
+
+    def query_segment(self, vehicle_pos: np.ndarray) -> Tuple[int, float, float]:
+        """
+        查询最近线段（点到线段投影，窗口/回退规则与query相同）
+
+        Args:
+            vehicle_pos: 车辆位置 (x, y)
+
+        Returns:
+            (segment, t, dist_sq): 见 ReferencePath.project
+        """
+        ref = self.reference
+        n_seg = len(ref.seg_len)
+        self.n_queries += 1
+
+        result = None
+        if self.mode == 'window' and self.last_segment is not None and n_seg > 0:
+            start = max(self.last_segment - self.backtrack, 0)
+            while True:
+                end = min(start + self.window, n_seg)
+                result = ref.project(vehicle_pos, start, end)
+
+                # 最近线段在窗口末端且投影到了线段终点: 窗口继续前移
+                if result[0] == end - 1 and result[1] >= 1.0 and end < n_seg and result[0] > start:
+                    start = result[0]
+                    continue
+                break
+
+            if result[2] > self.relocalize_dist**2:
+                result = None
+
+        # 空间索引: 上次弧长附近、relocalize_dist以内的最近线段（不会跳到另一圈）
+        if result is None and self.mode != 'global' and self.last_s is not None and n_seg > 0:
+            result = self.index.nearest(vehicle_pos, self.relocalize_dist, self.last_s, self.arc_window)
+
+        if result is None:
+            # 全局: KD树找最近路径点，再在它前后两段线段上投影
+            self.n_global_queries += 1
+            result = ref.project(vehicle_pos, segments=self.global_segment_candidates(vehicle_pos[:2]))
+
+        self.last_segment = result[0]
+        self.last_s = ref.arc_length_at(result[0], result[1])
+        return result
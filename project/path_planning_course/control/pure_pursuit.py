@@ -23,10 +23,15 @@ Pure Pursuit是一种基于几何的路径跟踪算法。
 
 import numpy as np
 import math
-from typing import List, Tuple, Optional
+import time
+from typing import Callable, List, Tuple, Optional
 import sys
 sys.path.append('..')
 from vehicle.bicycle_model import BicycleModel
+from control.path_tracking import NearestPointTracker
+from control.reference_path import ReferencePath
+from control.statistics import RunningStats, RingBuffer
+from control.batch_pure_pursuit import BatchPurePursuitController
 
 
 class PurePursuitController:
@@ -49,7 +54,15 @@ class PurePursuitController:
         wheelbase: float = 2.7,
         k_lookahead: float = 1.0,
         ld_min: float = 2.0,
-        max_steer: float = np.deg2rad(35)
+        max_steer: float = np.deg2rad(35),
+        nearest_search: str = 'global',
+        search_window: int = 50,
+        relocalize_dist: float = 5.0,
+        history_size: int = 10000,
+        curvature_gain: float = 0.0,
+        vehicle: Optional[BicycleModel] = None,
+        a_lat_max: Optional[float] = None,
+        arc_window: float = 20.0
     ):
         """
         初始化Pure Pursuit控制器
@@ -59,21 +72,63 @@ class PurePursuitController:
             k_lookahead: 预瞄距离系数 (无量纲)
             ld_min: 最小预瞄距离 (m)
             max_steer: 最大转向角 (rad)
+            nearest_search: 最近点查询方式
+                - 'global': 每个周期都做KD树全局查询，控制器不保存跟踪进度（默认）
+                - 'window': 从上次匹配的索引开始，只搜索向前的窗口，
+                  偏离过远（重定位）时回退到KD树全局查询；
+                  同一条路径重新开始跟踪时需要调用 reset_tracking()
+                  （PathFollowingSimulator 每次仿真开始时会调用）
+                - 'index': 线段空间索引，只匹配上次弧长附近的线段，
+                  适合多次经过同一区域的路径（环形、8字形）
+            search_window: 'window'模式的窗口大小（路径点数）
+            relocalize_dist: 窗口内最近距离超过该值视为重定位 (m)
+            history_size: 保留最近多少个周期的误差/转向角历史（画图用），
+                0表示不保留；统计量不受影响，始终覆盖全部周期
+            curvature_gain: 曲率自适应预瞄系数 c (m)，0表示不随曲率调整
+            vehicle: 车辆模型，给定时参考路径同时计算速度曲线，
+                每周期的目标速度见 self.target_speed
+            a_lat_max: 速度曲线的最大横向加速度 (m/s²)，None表示 vehicle.a_max
+            arc_window: 空间索引重新定位时的弧长容差 (m)，相对上一周期的投影弧长
         
         预瞄距离计算:
-            Ld = k·v + Ld_min
+            Ld = max((k·v + Ld_min) / (1 + c·|κ|), Ld_min)
             
             - k越大，预瞄距离随速度增加越快
             - Ld_min保证低速时也有足够预瞄
+            - κ为车辆投影点处的路径曲率，弯道上缩短预瞄，减少切弯
         """
         self.L = wheelbase
         self.k = k_lookahead
         self.ld_min = ld_min
         self.max_steer = max_steer
-        
-        # 统计信息
-        self.lateral_errors = []  # 横向误差历史
-        self.control_history = []  # 控制历史
+        self.curvature_gain = curvature_gain
+        
+        # 速度曲线的车辆约束（None表示不计算速度曲线）
+        self.vehicle = vehicle
+        self.a_lat_max = a_lat_max
+        self.target_speed: Optional[float] = None
+        
+        # 最近点查询（按参考路径缓存，换路径时重建）
+        self.nearest_search = nearest_search
+        self.search_window = search_window
+        self.relocalize_dist = relocalize_dist
+        self.arc_window = arc_window
+        self.tracker: Optional[NearestPointTracker] = None
+        self._s_hint: Optional[float] = None  # reset_tracking给出的初始弧长（下一次查询使用）
+        self.reference: Optional[ReferencePath] = None  # 累计弧长等预计算几何
+        
+        # 本周期的路径几何（query_geometry的结果）
+        self.geometry: Optional[dict] = None
+        
+        # 统计信息（流式累计，内存固定）
+        self.lateral_error_stats = RunningStats()
+        self.steer_stats = RunningStats()  # |δ|
+        self.tick_time_stats = RunningStats()  # 每周期计算耗时 (s)
+        
+        # 最近的历史（环形缓冲区）
+        self.history_size = history_size
+        self.lateral_errors = RingBuffer(history_size)  # 横向误差历史
+        self.control_history = RingBuffer(history_size)  # 控制历史
         
         print(f"[Pure Pursuit] 初始化完成")
         print(f"  轴距 L = {wheelbase:.2f} m")
@@ -81,12 +136,13 @@ class PurePursuitController:
         print(f"  最小预瞄距离 = {ld_min:.2f} m")
         print(f"  最大转向角 = {np.rad2deg(max_steer):.1f}°")
     
-    def calc_lookahead_distance(self, velocity: float) -> float:
+    def calc_lookahead_distance(self, velocity: float, curvature: float = 0.0) -> float:
         """
-        根据速度计算预瞄距离
+        根据速度和路径曲率计算预瞄距离
         
         Args:
             velocity: 当前速度 (m/s)
+            curvature: 投影点处的路径曲率 (1/m)
         
         Returns:
             预瞄距离 (m)
@@ -94,9 +150,13 @@ class PurePursuitController:
         设计原则:
             - 高速时需要更长预瞄距离（提前规划）
             - 低速时缩短预瞄距离（精确跟踪）
+            - 弯道上缩短预瞄距离（避免切弯）
             - 保证最小预瞄距离（避免过于敏感）
         """
-        return self.k * abs(velocity) + self.ld_min
+        ld = self.k * abs(velocity) + self.ld_min
+        if self.curvature_gain > 0:
+            ld = max(ld / (1.0 + self.curvature_gain * abs(curvature)), self.ld_min)
+        return ld
     
     def find_nearest_point(
         self,
@@ -114,7 +174,7 @@ class PurePursuitController:
             最近点的索引
         
         注意:
-            这是个O(N)算法，大规模路径可用KD树优化
+            这是个O(N)算法，control()中使用 track_nearest_point()
         """
         # 提取路径的xy坐标
         if path.shape[1] >= 2:
@@ -128,6 +188,50 @@ class PurePursuitController:
         # 返回最小距离的索引
         return np.argmin(distances)
     
+    def track_nearest_point(
+        self,
+        vehicle_pos: np.ndarray,
+        path: np.ndarray
+    ) -> int:
+        """
+        带进度记忆的最近点查询（见 control.path_tracking.NearestPointTracker）
+        
+        nearest_search='window' 时，同一条路径上连续调用只搜索上次匹配点之后的窗口，
+        每周期耗时与路径长度无关；传入新的路径数组时重新开始
+        
+        Args:
+            vehicle_pos: 车辆位置 (x, y)
+            path: 路径数组，形状(N, 2)或(N, 4)
+        
+        Returns:
+            最近点的索引
+        """
+        return self._get_tracker(path).query(vehicle_pos)
+    
+    def _get_tracker(self, path: np.ndarray) -> NearestPointTracker:
+        """当前路径的最近点查询器（换路径时重建）"""
+        if self.tracker is None or self.tracker.path is not path:
+            self.tracker = NearestPointTracker(
+                path,
+                mode=self.nearest_search,
+                window=self.search_window,
+                relocalize_dist=self.relocalize_dist,
+                reference=self.get_reference_path(path),
+                arc_window=self.arc_window
+            )
+        return self.tracker
+    
+    def reset_tracking(self, s_hint: Optional[float] = None):
+        """
+        车辆被重定位（或重新开始跟踪同一路径）时调用，下一周期做全局查询
+        
+        Args:
+            s_hint: 已知的车辆弧长 (m)，见 NearestPointTracker.reset
+        """
+        self._s_hint = s_hint
+        if self.tracker is not None:
+            self.tracker.reset()
+    
     def find_lookahead_point(
         self,
         vehicle_pos: np.ndarray,
@@ -172,6 +276,104 @@ class PurePursuitController:
         # 没找到 → 返回路径终点
         return path_xy[-1], len(path) - 1
     
+    def get_reference_path(self, path: np.ndarray) -> ReferencePath:
+        """参考路径的预计算几何（按路径数组缓存，换路径时重建）"""
+        if self.reference is None or self.reference.path is not path:
+            self.reference = ReferencePath(path, vehicle=self.vehicle, a_lat_max=self.a_lat_max)
+        return self.reference
+    
+    def find_lookahead_point_by_arc(
+        self,
+        path: np.ndarray,
+        lookahead_dist: float,
+        start_idx: int = 0
+    ) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        按弧长查找预瞄点（二分查找 + 线段内插值）
+        
+        预瞄点定义:
+            从最近点沿路径向前走 Ld 弧长处的点
+        
+        与 find_lookahead_point 的区别:
+            - 累计弧长每条路径只算一次，查询是 np.searchsorted，O(log N)，没有Python循环
+            - 结果在线段内插值，随车辆前进连续移动，不会在路径点之间跳变
+        
+        Args:
+            path: 路径数组，形状(N, 2)或(N, 4)
+            lookahead_dist: 预瞄距离（沿路径的弧长）
+            start_idx: 起始索引（通常是最近点）
+        
+        Returns:
+            (lookahead_point, index) 或 None
+            - index: 预瞄点所在线段的起点索引
+            超出路径终点时返回终点
+        """
+        if len(path) == 0:
+            return None
+        
+        ref = self.get_reference_path(path)
+        return ref.interpolate(ref.s[start_idx] + lookahead_dist)
+    
+    def query_geometry(
+        self,
+        vehicle_pos: np.ndarray,
+        path: np.ndarray,
+        lookahead_dist: Optional[float] = None,
+        velocity: float = 0.0
+    ) -> dict:
+        """
+        一次查询得到本周期需要的全部路径几何
+        
+        1. 在跟踪窗口内把车辆投影到各线段（一次向量化计算），得到最近线段
+        2. 由投影点得到弧长s和带符号横向误差（点到线段的真实垂直距离）
+        3. 读取投影点处的曲率和目标速度（预计算值插值，O(1)）
+        4. 按弧长 s + Ld 二分查找预瞄点
+        
+        Args:
+            vehicle_pos: 车辆位置 (x, y)
+            path: 参考路径，形状(N, 2)或(N, 4)
+            lookahead_dist: 预瞄距离，None表示按速度和曲率计算
+            velocity: 当前速度 (m/s)，lookahead_dist为None时使用
+        
+        Returns:
+            字典，结果也保存在 self.geometry:
+                - segment: 最近线段的起点索引
+                - s: 投影点的弧长 (m)
+                - cross_track_error: 带符号横向误差 (m)，在路径左侧为正
+                - curvature: 投影点处的路径曲率 (1/m)
+                - target_speed: 投影点处的目标速度 (m/s)，没有速度曲线时为None
+                - lookahead_distance: 使用的预瞄距离 (m)
+                - lookahead_point: 预瞄点 (x, y)
+                - lookahead_segment: 预瞄点所在线段
+        """
+        ref = self.get_reference_path(path)
+        tracker = self._get_tracker(path)
+        if self._s_hint is not None:
+            tracker.reset(self._s_hint)  # reset_tracking给出的初始弧长只用于下一次查询
+            self._s_hint = None
+        segment, t, dist_sq = tracker.query_segment(vehicle_pos)
+        
+        s = ref.arc_length_at(segment, t)
+        cross_track_error = ref.signed_offset(vehicle_pos, segment, math.sqrt(dist_sq))
+        curvature = ref.curvature_at(segment, t)
+        self.target_speed = ref.speed_at(segment, t)
+        
+        if lookahead_dist is None:
+            lookahead_dist = self.calc_lookahead_distance(velocity, curvature)
+        lookahead_point, lookahead_segment = ref.interpolate(s + lookahead_dist)
+        
+        self.geometry = {
+            'segment': segment,
+            's': s,
+            'cross_track_error': cross_track_error,
+            'curvature': curvature,
+            'target_speed': self.target_speed,
+            'lookahead_distance': lookahead_dist,
+            'lookahead_point': lookahead_point,
+            'lookahead_segment': lookahead_segment,
+        }
+        return self.geometry
+    
     def calc_lateral_error(
         self,
         vehicle_pos: np.ndarray,
@@ -190,8 +392,8 @@ class PurePursuitController:
         简化版本:
             使用车辆到最近路径点的距离
             
-        完整版本应该:
-            计算车辆到路径线段的垂直距离
+        完整版本:
+            计算车辆到路径线段的垂直距离，见 query_geometry
         """
         if len(path) == 0:
             return 0.0
@@ -216,12 +418,14 @@ class PurePursuitController:
             steer: 转向角 (rad)
         
         算法步骤:
-        1. 根据速度计算预瞄距离 Ld
-        2. 找到路径上距离车辆≥Ld的预瞄点
+        1. 一次几何查询: 最近线段、横向误差、曲率和目标速度
+        2. 根据速度和曲率计算预瞄距离 Ld，取沿路径Ld处的预瞄点
         3. 计算车头指向预瞄点的角度 α
         4. 应用Pure Pursuit公式: δ = atan(2L·sin(α)/Ld)
         5. 限制转向角在物理约束内
         """
+        tick_start = time.perf_counter()
+        
         # 解包状态
         x, y, theta, v = vehicle_state
         vehicle_pos = np.array([x, y])
@@ -231,20 +435,10 @@ class PurePursuitController:
             print("[Pure Pursuit] 警告: 路径为空")
             return 0.0
         
-        # 步骤1: 计算预瞄距离
-        ld = self.calc_lookahead_distance(v)
-        
-        # 步骤2: 找到最近点（起始搜索位置）
-        nearest_idx = self.find_nearest_point(vehicle_pos, ref_path)
-        
-        # 步骤3: 找到预瞄点
-        result = self.find_lookahead_point(vehicle_pos, ref_path, ld, nearest_idx)
-        
-        if result is None:
-            print("[Pure Pursuit] 警告: 未找到预瞄点")
-            return 0.0
-        
-        lookahead_point, lookahead_idx = result
+        # 步骤1-3: 一次几何查询（最近线段 + 横向误差 + 曲率自适应预瞄距离 + 预瞄点）
+        geometry = self.query_geometry(vehicle_pos, ref_path, velocity=v)
+        ld = geometry['lookahead_distance']
+        lookahead_point = geometry['lookahead_point']
         
         # 步骤4: 计算车辆到预瞄点的向量
         dx = lookahead_point[0] - x
@@ -269,35 +463,43 @@ class PurePursuitController:
         # 步骤7: 限制转向角
         steer = np.clip(steer, -self.max_steer, self.max_steer)
         
-        # 记录统计信息
-        lateral_error = self.calc_lateral_error(vehicle_pos, ref_path)
+        # 记录统计信息（横向误差复用几何查询的结果）
+        lateral_error = abs(geometry['cross_track_error'])
+        self.lateral_error_stats.update(lateral_error)
+        self.steer_stats.update(abs(steer))
         self.lateral_errors.append(lateral_error)
         self.control_history.append(steer)
+        self.tick_time_stats.update(time.perf_counter() - tick_start)
         
         return steer
     
     def get_statistics(self) -> dict:
         """
-        获取控制统计信息
+        获取控制统计信息（O(1)，覆盖重置以来的全部周期）
         
         Returns:
             包含统计指标的字典
         """
-        if not self.lateral_errors:
+        if not self.lateral_error_stats.count:
             return {}
         
         return {
-            'mean_lateral_error': np.mean(self.lateral_errors),
-            'max_lateral_error': np.max(self.lateral_errors),
-            'std_lateral_error': np.std(self.lateral_errors),
-            'mean_steer': np.mean(np.abs(self.control_history)),
-            'max_steer': np.max(np.abs(self.control_history)),
+            'mean_lateral_error': self.lateral_error_stats.mean,
+            'max_lateral_error': self.lateral_error_stats.max,
+            'std_lateral_error': self.lateral_error_stats.std,
+            'mean_steer': self.steer_stats.mean,
+            'max_steer': self.steer_stats.max,
+            'mean_tick_time': self.tick_time_stats.mean,
+            'max_tick_time': self.tick_time_stats.max,
         }
     
     def reset_statistics(self):
         """重置统计信息"""
-        self.lateral_errors = []
-        self.control_history = []
+        self.lateral_error_stats.reset()
+        self.steer_stats.reset()
+        self.tick_time_stats.reset()
+        self.lateral_errors.clear()
+        self.control_history.clear()
 
 
 class PathFollowingSimulator:
@@ -325,6 +527,16 @@ class PathFollowingSimulator:
         self.vehicle = vehicle_model
         self.dt = dt
     
+    def speed_command(self, state: np.ndarray, dt: float) -> float:
+        """
+        纵向控制: 一步内追上控制器给出的目标速度（按车辆最大加速度限幅）；
+        控制器没有速度曲线时返回0（匀速）
+        """
+        target = self.controller.target_speed
+        if target is None:
+            return 0.0
+        return float(np.clip((target - state[3]) / dt, -self.vehicle.a_max, self.vehicle.a_max))
+    
     def simulate(
         self,
         initial_state: np.ndarray,
@@ -350,13 +562,14 @@ class PathFollowingSimulator:
         trajectory = [state.copy()]
         
         goal = ref_path[-1, :2]  # 路径终点
+        self.controller.reset_tracking()  # 新的一次仿真，最近点从全局查询开始
         
         for step in range(max_steps):
             # 计算控制
             steer = self.controller.control(state, ref_path)
             
-            # 执行控制（假设速度控制为匀速）
-            control = np.array([steer, 0.0])  # [转向角, 加速度]
+            # 执行控制（没有速度曲线时匀速，有速度曲线时跟踪目标速度）
+            control = np.array([steer, self.speed_command(state, self.dt)])  # [转向角, 加速度]
             state = self.vehicle.step(state, control, self.dt)
             
             # 记录轨迹
@@ -376,6 +589,274 @@ class PathFollowingSimulator:
         }
         
         return np.array(trajectory), info
+    
+    def simulate_realtime(
+        self,
+        initial_state: np.ndarray,
+        ref_path: np.ndarray,
+        rate_hz: Optional[float] = None,
+        max_steps: int = 1000,
+        goal_tolerance: float = 0.5,
+        deadline: Optional[float] = None,
+        safe_command: Optional[np.ndarray] = None,
+        jitter_bins: int = 20,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> Tuple[np.ndarray, dict]:
+        """
+        实时模式仿真: 按固定频率执行控制周期，检验控制器能否按时算完
+        
+        每个周期按单调时钟（time.perf_counter）的绝对时刻 t0 + k·T 排程，
+        不会因为逐周期sleep误差而累积漂移:
+        
+        1. 等到本周期的计划时刻，记录实际唤醒延迟（抖动）
+        2. 计算控制并计时
+        3. 计算耗时超过deadline视为超时: 丢弃这次结果，改用安全指令
+        4. 车辆模型按周期T前进一步
+        
+        上一周期超时太多、已经错过了后续计划时刻时，直接对齐到下一个计划时刻，
+        错过的周期计入 skipped_ticks。错过的周期里执行器保持原来的指令
+        （给定safe_command时为安全指令），车辆照样按周期T前进，
+        这些状态也记入轨迹，轨迹始终按周期T均匀采样。
+        
+        Args:
+            initial_state: 初始状态 [x, y, θ, v]
+            ref_path: 参考路径
+            rate_hz: 控制频率 (Hz)，None表示 1/dt；车辆模型按 1/rate_hz 积分
+            max_steps: 最大周期数
+            goal_tolerance: 到达终点的容差 (m)
+            deadline: 每周期的计算时间预算 (s)，None表示一个周期
+            safe_command: 超时时使用的控制 [转向角, 加速度]，
+                None表示保持上一周期实际执行的控制（第一周期为 [0, 0]）
+            jitter_bins: 抖动/计算耗时直方图的分箱数（范围 0 到一个周期，
+                最后一箱包含所有更大的值）
+            clock: 单调时钟（秒），测试时可以换成模拟时钟
+            sleep: 与clock配套的sleep函数
+        
+        Returns:
+            (trajectory, info): 同 simulate，info 另含实时统计:
+                - deadline_misses / miss_rate: 超时周期数及比例
+                - skipped_ticks: 因严重超时而错过的周期数
+                - mean/max/p99_compute_time: 每周期计算耗时 (s)
+                - mean/max_jitter: 唤醒延迟 (s)
+                - jitter_histogram / compute_histogram: (counts, bin_edges)
+                - compute_times / jitter: 每周期的原始数据 (s)
+        """
+        period = self.dt if rate_hz is None else 1.0 / rate_hz
+        budget = period if deadline is None else deadline
+        fallback = None if safe_command is None else np.asarray(safe_command, dtype=float)
+        
+        state = initial_state.copy()
+        trajectory = [state.copy()]
+        goal = ref_path[-1, :2]
+        self.controller.reset_tracking()
+        
+        compute_times = np.empty(max_steps)
+        jitter = np.empty(max_steps)
+        missed = np.zeros(max_steps, dtype=bool)
+        skipped_ticks = 0
+        last_command = np.zeros(2)  # [转向角, 加速度]
+        
+        next_tick = clock()
+        n_ticks = 0
+        
+        for step in range(max_steps):
+            # 步骤1: 等到计划时刻（粗粒度sleep + 最后不到1ms忙等）
+            remaining = next_tick - clock()
+            if remaining > 1e-3:
+                sleep(remaining - 1e-3)
+            while clock() < next_tick:
+                pass
+            tick_start = clock()
+            jitter[step] = tick_start - next_tick
+            
+            # 步骤2: 计算控制并计时
+            steer = self.controller.control(state, ref_path)
+            compute_times[step] = clock() - tick_start
+            
+            # 步骤3: 超时则改用安全指令
+            if compute_times[step] > budget:
+                missed[step] = True
+                control = last_command if fallback is None else fallback
+            else:
+                control = np.array([steer, self.speed_command(state, period)])
+            last_command = control
+            
+            # 步骤4: 车辆前进一个周期
+            state = self.vehicle.step(state, control, period)
+            trajectory.append(state.copy())
+            n_ticks = step + 1
+            
+            dist_to_goal = np.linalg.norm(state[:2] - goal)
+            if dist_to_goal < goal_tolerance:
+                break
+            
+            # 下一个计划时刻；已经错过的周期跳过，车辆在这些周期里执行保持的指令
+            next_tick += period
+            late = clock() - next_tick
+            if late > 0:
+                skip = int(late // period) + 1
+                skipped_ticks += skip
+                next_tick += skip * period
+                held = last_command if fallback is None else fallback
+                for _ in range(skip):
+                    state = self.vehicle.step(state, held, period)
+                    trajectory.append(state.copy())
+                    dist_to_goal = np.linalg.norm(state[:2] - goal)
+                    if dist_to_goal < goal_tolerance:
+                        break
+                if dist_to_goal < goal_tolerance:
+                    break
+        
+        compute_times = compute_times[:n_ticks]
+        jitter = jitter[:n_ticks]
+        n_missed = int(missed[:n_ticks].sum())
+        
+        # 直方图: 0 ~ 一个周期等分，超出部分并入最后一箱
+        edges = np.linspace(0.0, period, jitter_bins + 1)
+        clipped_edges = edges.copy()
+        clipped_edges[-1] = np.inf
+        
+        info = {
+            'steps': len(trajectory),
+            'reached_goal': dist_to_goal < goal_tolerance,
+            'final_dist_to_goal': dist_to_goal,
+            'rate_hz': 1.0 / period,
+            'deadline_misses': n_missed,
+            'miss_rate': n_missed / max(n_ticks, 1),
+            'skipped_ticks': skipped_ticks,
+            'mean_compute_time': float(np.mean(compute_times)),
+            'max_compute_time': float(np.max(compute_times)),
+            'p99_compute_time': float(np.percentile(compute_times, 99)),
+            'mean_jitter': float(np.mean(jitter)),
+            'max_jitter': float(np.max(jitter)),
+            'jitter_histogram': (np.histogram(jitter, clipped_edges)[0], edges),
+            'compute_histogram': (np.histogram(compute_times, clipped_edges)[0], edges),
+            'compute_times': compute_times,
+            'jitter': jitter,
+            **self.controller.get_statistics()
+        }
+        
+        return np.array(trajectory), info
+    
+    # 参数扫描结果表的字段（每行一个配置）
+    SWEEP_DTYPE = np.dtype([
+        ('k_lookahead', np.float64),
+        ('ld_min', np.float64),
+        ('initial_state', np.int64),      # initial_states中的行号
+        ('steps', np.int64),
+        ('reached_goal', np.bool_),
+        ('final_dist_to_goal', np.float64),
+        ('mean_lateral_error', np.float64),
+        ('max_lateral_error', np.float64),
+        ('std_lateral_error', np.float64),
+        ('mean_steer', np.float64),
+        ('max_steer', np.float64),
+    ])
+    
+    def sweep(
+        self,
+        ref_path: np.ndarray,
+        k_lookahead: np.ndarray,
+        ld_min: np.ndarray,
+        initial_states: np.ndarray,
+        max_steps: int = 1000,
+        goal_tolerance: float = 0.5
+    ) -> np.ndarray:
+        """
+        参数扫描: k_lookahead × ld_min × 初始状态 的整个网格一起仿真
+        
+        每个配置是一辆"虚拟车"，所有车放进 (M, 4) 数组，每一步只调用一次
+        BatchPurePursuitController.control 和 BicycleModel.step_batch；
+        到达终点的车被掩码掉（状态和统计不再更新），全部到达或步数用完即结束。
+        控制器的其余设置（最近点查询方式、曲率自适应预瞄、速度曲线和纵向控制）
+        原样用于所有配置，每个配置的结果与单独调用 simulate 相同。
+        
+        Args:
+            ref_path: 参考路径
+            k_lookahead: 预瞄距离系数的取值 (K,)
+            ld_min: 最小预瞄距离的取值 (L,)
+            initial_states: 初始状态 (4,) 或 (S, 4)
+            max_steps: 最大仿真步数
+            goal_tolerance: 到达终点的容差 (m)
+        
+        Returns:
+            results: 结构化数组 (K·L·S,)，字段见 SWEEP_DTYPE，
+                按 k_lookahead、ld_min、初始状态 的顺序展开
+        
+        示例:
+            >>> table = simulator.sweep(path, np.linspace(0.2, 2.0, 10), [1.0, 2.0, 3.0], start)
+            >>> best = table[table['reached_goal']]
+            >>> best = best[np.argmin(best['mean_lateral_error'])]
+        """
+        k_values = np.atleast_1d(np.asarray(k_lookahead, dtype=float))
+        ld_values = np.atleast_1d(np.asarray(ld_min, dtype=float))
+        starts = np.atleast_2d(np.asarray(initial_states, dtype=float))
+        
+        # 网格展开: 第i辆车 = (k[a], ld[b], start[c])
+        ka, lb, sc = np.meshgrid(
+            np.arange(len(k_values)), np.arange(len(ld_values)), np.arange(len(starts)),
+            indexing='ij'
+        )
+        ka, lb, sc = ka.ravel(), lb.ravel(), sc.ravel()
+        m = len(ka)
+        
+        # 与单车控制器相同的其余参数（最近点查询、曲率自适应预瞄、速度曲线），
+        # 预瞄参数每车一个
+        single = self.controller
+        batch = BatchPurePursuitController(
+            wheelbase=single.L,
+            k_lookahead=k_values[ka],
+            ld_min=ld_values[lb],
+            max_steer=single.max_steer,
+            search_window=single.search_window,
+            relocalize_dist=single.relocalize_dist,
+            nearest_search=single.nearest_search,
+            curvature_gain=single.curvature_gain,
+            vehicle=single.vehicle,
+            a_lat_max=single.a_lat_max,
+            arc_window=single.arc_window
+        )
+        
+        states = starts[sc].copy()
+        next_states = np.empty_like(states)
+        controls = np.zeros((m, 2))  # [转向角, 加速度]
+        goal = ref_path[-1, :2]
+        a_max = self.vehicle.a_max
+        
+        active = np.ones(m, dtype=bool)
+        steps = np.ones(m, dtype=np.int64)  # 与simulate相同，计入初始状态
+        
+        for step in range(max_steps):
+            controls[:, 0] = batch.control(states, ref_path, active=active)
+            if batch.target_speed is not None:
+                # 纵向控制与speed_command相同: 一步内追上目标速度
+                np.clip((batch.target_speed - states[:, 3]) / self.dt, -a_max, a_max, out=controls[:, 1])
+            self.vehicle.step_batch(states, controls, self.dt, out=next_states)
+            
+            # 已到达终点的车保持不动
+            states[active] = next_states[active]
+            steps += active
+            
+            dist_to_goal = np.hypot(states[:, 0] - goal[0], states[:, 1] - goal[1])
+            active &= dist_to_goal >= goal_tolerance
+            if not active.any():
+                break
+        
+        # 结果表
+        stats = batch.get_statistics()
+        results = np.empty(m, dtype=self.SWEEP_DTYPE)
+        results['k_lookahead'] = k_values[ka]
+        results['ld_min'] = ld_values[lb]
+        results['initial_state'] = sc
+        results['steps'] = steps
+        results['reached_goal'] = dist_to_goal < goal_tolerance
+        results['final_dist_to_goal'] = dist_to_goal
+        for name in ('mean_lateral_error', 'max_lateral_error', 'std_lateral_error',
+                     'mean_steer', 'max_steer'):
+            results[name] = stats[name]
+        
+        return results
 
 
 # ===== 测试代码 =====
@@ -454,8 +935,8 @@ if __name__ == "__main__":
     
     # 子图2: 横向误差
     ax2 = axes[0, 1]
-    time = np.arange(len(controller.lateral_errors)) * 0.1
-    ax2.plot(time, controller.lateral_errors, 'b-', linewidth=2)
+    t_axis = np.arange(len(controller.lateral_errors)) * 0.1
+    ax2.plot(t_axis, controller.lateral_errors, 'b-', linewidth=2)
     ax2.axhline(y=np.mean(controller.lateral_errors), color='r', linestyle='--', 
                 label=f'平均: {np.mean(controller.lateral_errors):.3f}m')
     ax2.set_xlabel('时间 (s)', fontsize=12)
@@ -466,8 +947,8 @@ if __name__ == "__main__":
     
     # 子图3: 转向角
     ax3 = axes[1, 0]
-    time = np.arange(len(controller.control_history)) * 0.1
-    ax3.plot(time, np.rad2deg(controller.control_history), 'g-', linewidth=2)
+    t_axis = np.arange(len(controller.control_history)) * 0.1
+    ax3.plot(t_axis, np.rad2deg(controller.control_history), 'g-', linewidth=2)
     ax3.axhline(y=np.rad2deg(controller.max_steer), color='r', linestyle='--', label='最大转向角')
     ax3.axhline(y=-np.rad2deg(controller.max_steer), color='r', linestyle='--')
     ax3.set_xlabel('时间 (s)', fontsize=12)
@@ -478,8 +959,8 @@ if __name__ == "__main__":
     
     # 子图4: 速度
     ax4 = axes[1, 1]
-    time = np.arange(len(trajectory)) * 0.1
-    ax4.plot(time, trajectory[:, 3], 'm-', linewidth=2)
+    t_axis = np.arange(len(trajectory)) * 0.1
+    ax4.plot(t_axis, trajectory[:, 3], 'm-', linewidth=2)
     ax4.set_xlabel('时间 (s)', fontsize=12)
     ax4.set_ylabel('速度 (m/s)', fontsize=12)
     ax4.set_title('速度曲线', fontsize=14)
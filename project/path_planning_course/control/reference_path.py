@@ -0,0 +1,272 @@
+"""
+参考路径的预计算几何
+
+路径跟踪控制器每个周期都要沿路径找点（预瞄点、目标速度等）。
+这些量只依赖路径本身，换路径时计算一次即可:
+
+- 累计弧长 s[i]: 第i个路径点到起点的路径长度
+- 按弧长插值: np.searchsorted 二分查找所在线段，O(log N)，
+  在线段内线性插值，结果随弧长连续变化，不会在路径点之间跳变
+- 点到线段投影: 一段线段范围内一次向量化计算，
+  同时得到最近线段、投影弧长和带符号横向误差
+- 每个路径点的航向和曲率，以及满足车辆约束的速度曲线（给定车辆模型时）；
+  控制周期内按 (线段, t) 线性插值读取，O(1)
+
+速度曲线（全部向量化，无逐点循环）:
+    1. 曲率限速: v² ≤ min(v_max², a_lat_max / |κ|)
+    2. 加速约束: v_i² ≤ v_j² + 2·a_max·(s_i - s_j)，对所有 j ≤ i 取最小，
+       即 2·a_max·s_i + min_{j≤i}(v_lim_j² - 2·a_max·s_j)，一次 np.minimum.accumulate
+    3. 减速约束: 同理从终点反向累计最小值（弯道前提前减速）
+
+作者: Path Planning Course Team
+"""
+
+import numpy as np
+from typing import Optional, Tuple, Union
+
+
+def _wrap_angle(angle: np.ndarray) -> np.ndarray:
+    """角度归一化到 [-π, π)"""
+    return (angle + np.pi) % (2 * np.pi) - np.pi
+
+
+class ReferencePath:
+    """
+    带累计弧长索引的参考路径
+
+    使用方法:
+        >>> ref = ReferencePath(path)          # 换路径时构建一次
+        >>> point, seg = ref.interpolate(ref.s[nearest_idx] + ld)
+        >>> ref = ReferencePath(path, vehicle=BicycleModel())
+        >>> v_target = ref.speed_at(seg, t)
+    """
+
+    def __init__(
+        self,
+        path: np.ndarray,
+        vehicle=None,
+        a_lat_max: Optional[float] = None
+    ):
+        """
+        Args:
+            path: 参考路径，形状(N, 2)或(N, 4)
+            vehicle: BicycleModel，给定时同时计算速度曲线（见 compute_speed_profile）
+            a_lat_max: 最大横向加速度 (m/s²)，None表示车辆的 a_max
+        """
+        if len(path) == 0:
+            raise ValueError("参考路径为空")
+
+        self.path = path
+        self.xy = np.ascontiguousarray(path[:, :2], dtype=float)
+
+        # 线段长度与累计弧长
+        self.seg_vec = np.diff(self.xy, axis=0)
+        self.seg_len = np.hypot(self.seg_vec[:, 0], self.seg_vec[:, 1])
+        self.s = np.concatenate([[0.0], np.cumsum(self.seg_len)])
+        self.length = float(self.s[-1])
+
+        # 航向与曲率（每个路径点）
+        self.heading, self.curvature = self._compute_heading_curvature()
+
+        # 速度曲线（每个路径点），需要车辆约束
+        self.speed: Optional[np.ndarray] = None
+        self.feasible: Optional[np.ndarray] = None
+        if vehicle is not None:
+            self.compute_speed_profile(vehicle, a_lat_max)
+
+    def __len__(self) -> int:
+        return len(self.xy)
+
+    def _compute_heading_curvature(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        路径点的航向与带符号曲率（左转为正）
+
+        线段航向取 atan2，零长度线段沿用前一段的航向；
+        内部点的航向取相邻两段的平均，曲率 = 转角 / 相邻两段的平均长度；
+        两端点沿用相邻点的值
+        """
+        n = len(self.xy)
+        if n < 2:
+            return np.zeros(n), np.zeros(n)
+
+        seg_heading = np.arctan2(self.seg_vec[:, 1], self.seg_vec[:, 0])
+        valid = self.seg_len > 0
+        if not valid.all():
+            last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), 0))
+            seg_heading = seg_heading[last_valid]
+
+        heading = np.empty(n)
+        heading[0] = seg_heading[0]
+        heading[-1] = seg_heading[-1]
+        curvature = np.zeros(n)
+
+        if n > 2:
+            turn = _wrap_angle(np.diff(seg_heading))
+            heading[1:-1] = _wrap_angle(seg_heading[:-1] + 0.5 * turn)
+            ds = 0.5 * (self.seg_len[:-1] + self.seg_len[1:])
+            curvature[1:-1] = np.where(ds > 0, turn / np.where(ds > 0, ds, 1.0), 0.0)
+            curvature[0] = curvature[1]
+            curvature[-1] = curvature[-2]
+
+        return heading, curvature
+
+    def compute_speed_profile(
+        self,
+        vehicle,
+        a_lat_max: Optional[float] = None,
+        v_start: Optional[float] = None,
+        v_end: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        满足车辆约束的速度曲线（结果保存在 self.speed）
+
+        Args:
+            vehicle: BicycleModel（使用 v_max、a_max、R_min）
+            a_lat_max: 最大横向加速度 (m/s²)，None表示 vehicle.a_max
+            v_start: 起点速度上限 (m/s)，None表示不限制
+            v_end: 终点速度上限 (m/s)，例如0表示在终点停车
+
+        Returns:
+            speed: 每个路径点的目标速度 (N,)
+
+        同时计算 self.feasible: 曲率不超过 1/R_min 的路径点（车辆转得过来）
+        """
+        a_lat = vehicle.a_max if a_lat_max is None else a_lat_max
+        kappa = np.abs(self.curvature)
+
+        # 1. 曲率限速（速度的平方）
+        v_sq = np.minimum(vehicle.v_max**2, a_lat / np.maximum(kappa, 1e-9))
+        if v_start is not None:
+            v_sq[0] = min(v_sq[0], v_start**2)
+        if v_end is not None:
+            v_sq[-1] = min(v_sq[-1], v_end**2)
+
+        # 2-3. 加速/减速约束（累计最小值，见模块说明）
+        two_a_s = 2 * vehicle.a_max * self.s
+        forward = two_a_s + np.minimum.accumulate(v_sq - two_a_s)
+        backward = -two_a_s + np.minimum.accumulate((v_sq + two_a_s)[::-1])[::-1]
+
+        self.speed = np.sqrt(np.maximum(np.minimum(v_sq, np.minimum(forward, backward)), 0.0))
+        self.feasible = kappa <= 1.0 / vehicle.R_min + 1e-9
+        return self.speed
+
+    def sample(self, values: np.ndarray, segment: int, t: float) -> float:
+        """路径点上的量在线段segment位置t处的线性插值，O(1)"""
+        if len(self.seg_len) == 0:
+            return float(values[0])
+        return float(values[segment] + t * (values[segment + 1] - values[segment]))
+
+    def curvature_at(self, segment: int, t: float) -> float:
+        """线段segment上位置t处的曲率 (1/m)"""
+        return self.sample(self.curvature, segment, t)
+
+    def speed_at(self, segment: int, t: float) -> Optional[float]:
+        """线段segment上位置t处的目标速度 (m/s)，没有速度曲线时返回None"""
+        if self.speed is None:
+            return None
+        return self.sample(self.speed, segment, t)
+
+    def interpolate(
+        self,
+        s_query: Union[float, np.ndarray]
+    ) -> Tuple[np.ndarray, Union[int, np.ndarray]]:
+        """
+        按弧长取路径上的点
+
+        Args:
+            s_query: 弧长 (m)，标量或数组；超出 [0, length] 时截断到端点
+
+        Returns:
+            (point, segment):
+                - point: 插值点 (2,) 或 (M, 2)
+                - segment: 所在线段的起点索引（线段 segment → segment+1）
+        """
+        if len(self.xy) == 1:
+            scalar = np.ndim(s_query) == 0
+            point = self.xy[0] if scalar else np.repeat(self.xy[:1], len(s_query), axis=0)
+            return point, 0 if scalar else np.zeros(len(s_query), dtype=int)
+
+        s_query = np.clip(s_query, 0.0, self.length)
+
+        # 二分查找: s[i] ≤ s_query < s[i+1]
+        segment = np.searchsorted(self.s, s_query, side='right') - 1
+        segment = np.clip(segment, 0, len(self.seg_len) - 1)
+
+        # 线段内插值（零长度线段取起点）
+        seg_len = self.seg_len[segment]
+        t = np.where(seg_len > 0, (s_query - self.s[segment]) / np.where(seg_len > 0, seg_len, 1.0), 0.0)
+        point = self.xy[segment] + t[..., None] * self.seg_vec[segment]
+
+        if np.ndim(segment) == 0:
+            return point, int(segment)
+        return point, segment
+
+    def project(
+        self,
+        point: np.ndarray,
+        lo: int = 0,
+        hi: Optional[int] = None,
+        segments: Optional[np.ndarray] = None
+    ) -> Tuple[int, float, float]:
+        """
+        把点投影到线段 [lo, hi) 上，取最近的一段（一次向量化计算）
+
+        Args:
+            point: 查询点 (x, y)
+            lo, hi: 线段索引范围，默认全部线段
+            segments: 候选线段索引数组（例如SegmentIndex的查询结果），给定时忽略lo/hi
+
+        Returns:
+            (segment, t, dist_sq):
+                - segment: 最近线段的起点索引
+                - t: 投影点在线段上的位置，0=起点，1=终点
+                - dist_sq: 点到线段距离的平方
+        """
+        px, py = point[0], point[1]
+        if len(self.seg_len) == 0:
+            dx, dy = px - self.xy[0, 0], py - self.xy[0, 1]
+            return 0, 0.0, float(dx * dx + dy * dy)
+
+        if segments is not None:
+            sel = segments
+        else:
+            sel = slice(lo, len(self.seg_len) if hi is None else hi)
+        a = self.xy[sel]
+        d = self.seg_vec[sel]
+        len_sq = self.seg_len[sel]**2
+
+        # 投影参数 t = (p - a)·d / |d|²，截断到线段内
+        rx = px - a[:, 0]
+        ry = py - a[:, 1]
+        t = (rx * d[:, 0] + ry * d[:, 1]) / np.where(len_sq > 0, len_sq, 1.0)
+        np.clip(t, 0.0, 1.0, out=t)
+
+        ex = rx - t * d[:, 0]
+        ey = ry - t * d[:, 1]
+        dist_sq = ex * ex + ey * ey
+
+        k = int(np.argmin(dist_sq))
+        segment = int(segments[k]) if segments is not None else lo + k
+        return segment, float(t[k]), float(dist_sq[k])
+
+    def arc_length_at(self, segment: int, t: float) -> float:
+        """线段segment上位置t处的弧长"""
+        if len(self.seg_len) == 0:
+            return 0.0
+        return float(self.s[segment] + t * self.seg_len[segment])
+
+    def signed_offset(self, point: np.ndarray, segment: int, dist: float) -> float:
+        """
+        带符号横向误差: 车辆在路径前进方向左侧为正，右侧为负
+
+        Args:
+            point: 车辆位置 (x, y)
+            segment: 最近线段（project的结果）
+            dist: 点到该线段的距离
+        """
+        if len(self.seg_len) == 0:
+            return dist
+        a = self.xy[segment]
+        d = self.seg_vec[segment]
+        cross = d[0] * (point[1] - a[1]) - d[1] * (point[0] - a[0])
+        return dist if cross >= 0 else -dist
@@ -0,0 +1,162 @@
+"""
+参考路径线段的空间索引
+
+环形、8字形路径（create_circular_path等）会多次经过同一片区域:
+- 只按距离做全局最近点查询，可能匹配到另一圈上距离更近的线段
+- 只在向前窗口内搜索，窗口一旦丢失就要O(N)全局搜索
+
+SegmentIndex 在换路径时构建一次，回答
+"距离d以内、弧长在 s ± Δs 附近的最近线段":
+
+1. 把平面划分为边长cell_size的网格，每条线段登记到其包围盒覆盖的所有格子
+2. (格子, 线段) 对编码为一个整数 key = 格子编号·线段数 + 线段索引，排序存放；
+   同一格子的线段按索引（即按弧长）连续排列
+3. 弧长窗口 s ± Δs 先二分查找换算成线段索引区间 [lo, hi]，
+   再对半径d覆盖的每个格子二分查找 [格子·线段数 + lo, 格子·线段数 + hi]，
+   两次 np.searchsorted 得到全部候选，O(格子数·log M)，与路径总长无关
+4. 对候选线段做点到线段投影（ReferencePath.project）取最近
+
+作者: Path Planning Course Team
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+from control.reference_path import ReferencePath
+
+
+class SegmentIndex:
+    """
+    线段网格索引（排序格子编号 + 二分查找）
+
+    使用方法:
+        >>> index = SegmentIndex(ReferencePath(path))      # 换路径时构建一次
+        >>> hit = index.nearest(vehicle_pos, radius=5.0, s_hint=s_last, s_window=20.0)
+        >>> if hit is not None:
+        ...     segment, t, dist_sq = hit
+    """
+
+    def __init__(self, reference: ReferencePath, cell_size: Optional[float] = None):
+        """
+        Args:
+            reference: 参考路径的预计算几何
+            cell_size: 网格边长 (m)，None表示线段长度中位数的4倍
+        """
+        self.reference = reference
+        n_seg = len(reference.seg_len)
+
+        if cell_size is None:
+            positive = reference.seg_len[reference.seg_len > 0]
+            cell_size = 4.0 * float(np.median(positive)) if len(positive) else 1.0
+        self.cell_size = cell_size
+
+        xy = reference.xy
+        self.origin = xy.min(axis=0)
+        self.n_cells_y = int((xy[:, 1].max() - self.origin[1]) // cell_size) + 1
+
+        self.n_segments = n_seg
+        if n_seg == 0:
+            self.keys = np.zeros(0, dtype=np.int64)
+            return
+
+        # 每条线段包围盒覆盖的格子范围
+        a, b = xy[:-1], xy[1:]
+        lo = self._cell(np.minimum(a, b))
+        hi = self._cell(np.maximum(a, b))
+        nx = hi[:, 0] - lo[:, 0] + 1
+        ny = hi[:, 1] - lo[:, 1] + 1
+        count = nx * ny
+
+        # 展开为 (格子, 线段) 对（一次向量化）
+        seg_id = np.repeat(np.arange(n_seg), count)
+        local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        nx_rep = np.repeat(nx, count)
+        cx = np.repeat(lo[:, 0], count) + local % nx_rep
+        cy = np.repeat(lo[:, 1], count) + local // nx_rep
+
+        # (格子, 线段) 编码为一个整数并排序
+        self.keys = np.sort(self._key(cx, cy) * n_seg + seg_id)
+
+    def _cell(self, xy: np.ndarray) -> np.ndarray:
+        """坐标 → 格子坐标 (ix, iy)"""
+        return np.floor((xy - self.origin) / self.cell_size).astype(np.int64)
+
+    def _key(self, cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        """格子坐标 → 一维编号（按列展开，越界的格子编号不会出现在索引里）"""
+        return cx * self.n_cells_y + cy
+
+    def candidates(
+        self,
+        point: np.ndarray,
+        radius: float,
+        seg_lo: int = 0,
+        seg_hi: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        与以point为中心、边长2·radius的正方形相交的格子里，索引在 [seg_lo, seg_hi] 内的线段
+
+        Returns:
+            线段索引（去重、升序）
+        """
+        if seg_hi is None:
+            seg_hi = self.n_segments - 1
+
+        lo = self._cell(np.asarray(point[:2], dtype=float) - radius)
+        hi = self._cell(np.asarray(point[:2], dtype=float) + radius)
+        lo[1] = max(lo[1], 0)
+        hi[1] = min(hi[1], self.n_cells_y - 1)
+        if lo[1] > hi[1]:
+            return np.zeros(0, dtype=np.int64)
+
+        cells = self._key(np.arange(lo[0], hi[0] + 1)[:, None], np.arange(lo[1], hi[1] + 1)[None, :])
+        base = cells.ravel() * self.n_segments
+
+        # 二分查找每个格子里索引在 [seg_lo, seg_hi] 的一段
+        starts = np.searchsorted(self.keys, base + seg_lo)
+        counts = np.searchsorted(self.keys, base + seg_hi, side='right') - starts
+        total = counts.sum()
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # 拼接各格子的区间（一次向量化）
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.unique(self.keys[np.arange(total) + shift] % self.n_segments)
+
+    def nearest(
+        self,
+        point: np.ndarray,
+        radius: float,
+        s_hint: Optional[float] = None,
+        s_window: Optional[float] = None
+    ) -> Optional[Tuple[int, float, float]]:
+        """
+        距离radius以内的最近线段，可限定弧长在 s_hint ± s_window 附近
+
+        Args:
+            point: 查询点 (x, y)
+            radius: 最大距离 (m)
+            s_hint: 期望的弧长 (m)，例如上一周期的投影弧长；None表示不限制
+            s_window: 弧长容差 (m)
+
+        Returns:
+            (segment, t, dist_sq)（见 ReferencePath.project），没有满足条件的线段时返回None
+        """
+        ref = self.reference
+        if len(ref.seg_len) == 0:
+            return None
+
+        # 弧长窗口 → 线段索引区间: 线段i覆盖 [s_i, s_{i+1}]
+        seg_lo, seg_hi = 0, self.n_segments - 1
+        if s_hint is not None and s_window is not None:
+            seg_lo = max(int(np.searchsorted(ref.s, s_hint - s_window, side='left')) - 1, 0)
+            seg_hi = min(int(np.searchsorted(ref.s, s_hint + s_window, side='right')) - 1, seg_hi)
+            if seg_lo > seg_hi:
+                return None
+
+        segments = self.candidates(point, radius, seg_lo, seg_hi)
+        if len(segments) == 0:
+            return None
+
+        result = ref.project(point, segments=segments)
+        if result[2] > radius * radius:
+            return None
+        return result
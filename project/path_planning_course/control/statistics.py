@@ -0,0 +1,135 @@
+"""
+控制器的流式统计
+
+控制器长时间运行（几天）时，把每个周期的误差都存进列表会让内存无限增长，
+get_statistics 每次也要遍历全部历史。这里提供两个固定内存的替代:
+
+- RunningStats: Welford在线算法累计 count / mean / std / min / max，
+  每次更新和查询都是O(1)
+- RingBuffer: 固定容量的环形缓冲区，只保留最近 capacity 个值（画图用），
+  可以直接传给 np.mean / plt.plot 等（支持 np.asarray）
+
+作者: Path Planning Course Team
+"""
+
+import numpy as np
+from typing import Optional
+
+
+class RunningStats:
+    """
+    Welford在线均值/方差 + 最小/最大值
+
+    使用方法:
+        >>> stats = RunningStats()
+        >>> stats.update(0.3)
+        >>> stats.mean, stats.std, stats.max
+    """
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """清空统计量"""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, value: float):
+        """加入一个样本"""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def var(self) -> float:
+        """总体方差（与np.var相同，ddof=0）"""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """总体标准差（与np.std相同）"""
+        return float(np.sqrt(self.var))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return (f"RunningStats(count={self.count}, mean={self.mean:.4g}, "
+                f"std={self.std:.4g}, min={self.min:.4g}, max={self.max:.4g})")
+
+
+class RingBuffer:
+    """
+    固定容量的环形缓冲区（最近的历史）
+
+    使用方法:
+        >>> history = RingBuffer(1000)
+        >>> history.append(0.3)
+        >>> plt.plot(history)        # 按时间顺序，最多1000个
+    """
+
+    def __init__(self, capacity: int, dtype=float):
+        """
+        Args:
+            capacity: 最多保留的样本数，0表示不保留
+        """
+        if capacity < 0:
+            raise ValueError(f"容量不能为负: {capacity}")
+        self.capacity = capacity
+        self._data = np.empty(capacity, dtype=dtype)
+        self._start = 0
+        self._size = 0
+
+    def append(self, value: float):
+        """加入一个样本，满了就覆盖最旧的"""
+        if self.capacity == 0:
+            return
+        end = (self._start + self._size) % self.capacity
+        self._data[end] = value
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def clear(self):
+        """清空缓冲区（不释放内存）"""
+        self._start = 0
+        self._size = 0
+
+    def to_array(self) -> np.ndarray:
+        """按时间顺序（旧→新）返回副本"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate([self._data[self._start:], self._data[:end - self.capacity]])
+
+    def __array__(self, dtype=None, copy: Optional[bool] = None) -> np.ndarray:
+        out = self.to_array()
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if not -self._size <= index < self._size:
+                raise IndexError(f"索引 {index} 超出范围 (长度 {self._size})")
+            return self._data[(self._start + index % self._size) % self.capacity]
+        return self.to_array()[index]
+
+    def __repr__(self) -> str:
+        return f"RingBuffer({self._size}/{self.capacity})"
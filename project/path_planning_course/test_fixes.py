@@ -168,6 +168,1390 @@ def test_unicode_symbols():
     return True
 
 
+def test_footprint_collision():
+    """测试整车footprint碰撞检测"""
+    print("\n" + "="*60)
+    print("测试6: 整车footprint碰撞检测")
+    print("="*60)
+    
+    import numpy as np
+    from algorithms.collision import FootprintCollisionChecker
+    
+    grid = np.zeros((30, 30), dtype=np.uint8)
+    grid[14:16, 13:15] = 1
+    checker = FootprintCollisionChecker(grid, length=4.5, width=1.8)
+    
+    # 中心点空闲但车头压到障碍物
+    assert checker.collides(11.0, 15.0, 0.0), "车头压障碍物未检出"
+    assert not checker.collides(9.0, 15.0, np.pi / 2), "远离障碍物不应碰撞"
+    assert checker.collides(1.0, 15.0, 0.0), "越出地图边界未检出"
+    print("✓ 车头/边界碰撞检出，空闲位姿无碰撞")
+    
+    # 掩码必须保守: 车身采样点落在障碍物上 → 必须检出
+    rng = np.random.default_rng(0)
+    u, v = np.meshgrid(np.linspace(-2.25, 2.25, 30), np.linspace(-0.9, 0.9, 10))
+    for _ in range(500):
+        x, y = rng.uniform(5, 25, 2)
+        theta = rng.uniform(-np.pi, np.pi)
+        px = x + u * np.cos(theta) - v * np.sin(theta)
+        py = y + u * np.sin(theta) + v * np.cos(theta)
+        if grid[py.astype(int), px.astype(int)].any():
+            assert checker.collides(x, y, theta), f"漏检: ({x:.2f}, {y:.2f}, {theta:.2f})"
+    print("✓ 随机位姿无漏检")
+    
+    # 碰撞表与直接按掩码格子检查占据网格一致（含地图外）
+    poses = rng.uniform([-3, -3, -7], [33, 33, 7], (2000, 3))
+    for x, y, theta in poses:
+        ix, iy = int(np.floor(x)), int(np.floor(y))
+        if 0 <= ix < 30 and 0 <= iy < 30:
+            offsets = checker.cell_offsets[checker.yaw_bin(theta)] + checker.pad
+            expected = checker.occupancy[iy + offsets[:, 0], ix + offsets[:, 1]].any()
+        else:
+            expected = True
+        assert checker.collides(x, y, theta) == expected
+    assert np.array_equal(checker.collides_batch(*poses.T), [checker.collides(*p) for p in poses])
+    print("✓ 碰撞表与逐格检查一致，collides_batch 与 collides 一致")
+    
+    return True
+
+
+def test_linearize_batch():
+    """测试批量雅可比矩阵（与有限差分对比）"""
+    print("\n" + "="*60)
+    print("测试7: 批量雅可比矩阵")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    
+    vehicle = BicycleModel(L=2.7)
+    dt = 0.1
+    
+    # 远离速度截断和角度±π处，step在这些点附近可导
+    rng = np.random.default_rng(0)
+    n = 50
+    states = np.column_stack([
+        rng.uniform(-10, 10, n),
+        rng.uniform(-10, 10, n),
+        rng.uniform(-2.5, 2.5, n),
+        rng.uniform(0.5, 4.0, n),
+    ])
+    controls = np.column_stack([
+        rng.uniform(-0.5, 0.5, n),
+        rng.uniform(-1.0, 1.0, n),
+    ])
+    
+    A, B = vehicle.linearize_batch(states, controls, dt)
+    assert A.shape == (n, 4, 4) and B.shape == (n, 4, 2), "雅可比矩阵形状错误"
+    print(f"✓ 形状: A {A.shape}, B {B.shape}")
+    
+    # 中心差分
+    eps = 1e-6
+    max_err = 0.0
+    for k in range(n):
+        for j in range(4):
+            d = np.zeros(4)
+            d[j] = eps
+            col = (vehicle.step(states[k] + d, controls[k], dt)
+                   - vehicle.step(states[k] - d, controls[k], dt)) / (2 * eps)
+            max_err = max(max_err, np.abs(col - A[k, :, j]).max())
+        for j in range(2):
+            d = np.zeros(2)
+            d[j] = eps
+            col = (vehicle.step(states[k], controls[k] + d, dt)
+                   - vehicle.step(states[k], controls[k] - d, dt)) / (2 * eps)
+            max_err = max(max_err, np.abs(col - B[k, :, j]).max())
+    
+    assert max_err < 1e-6, f"与有限差分不一致: {max_err:.2e}"
+    print(f"✓ 与有限差分一致 (最大误差 {max_err:.1e})")
+    
+    return True
+
+
+def test_batch_pure_pursuit():
+    """测试批量Pure Pursuit（与逐车控制器对比）"""
+    print("\n" + "="*60)
+    print("测试8: 批量Pure Pursuit")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController
+    from control.batch_pure_pursuit import BatchPurePursuitController
+    from utils.helper import create_circular_path
+    
+    path = create_circular_path(20.0)
+    rng = np.random.default_rng(0)
+    m = 20
+    idx = rng.integers(0, len(path) - 10, m)
+    states = np.column_stack([
+        path[idx, 0] + rng.normal(0, 0.5, m),
+        path[idx, 1] + rng.normal(0, 0.5, m),
+        rng.uniform(-np.pi, np.pi, m),
+        rng.uniform(0.0, 5.0, m),
+    ])
+    
+    batch = BatchPurePursuitController()
+    singles = [PurePursuitController() for _ in range(m)]
+    
+    # 共用路径，多个周期（检验窗口跟踪进度）
+    max_diff = 0.0
+    for _ in range(20):
+        steer = batch.control(states, path)
+        expected = np.array([c.control(states[i], path) for i, c in enumerate(singles)])
+        max_diff = max(max_diff, np.abs(steer - expected).max())
+        states[:, 0] += states[:, 3] * np.cos(states[:, 2]) * 0.1
+        states[:, 1] += states[:, 3] * np.sin(states[:, 2]) * 0.1
+        states[:, 2] += states[:, 3] / 2.7 * np.tan(steer) * 0.1
+    
+    assert max_diff < 1e-9, f"共用路径转向角不一致: {max_diff:.2e}"
+    errors = batch.get_statistics()['mean_lateral_error']
+    expected = [c.get_statistics()['mean_lateral_error'] for c in singles]
+    assert np.allclose(errors, expected), "每车统计不一致"
+    print(f"✓ 共用路径与逐车控制一致 (最大差 {max_diff:.1e})")
+    
+    # 每车一条路径，补齐到同样长度
+    lengths = rng.integers(20, len(path), m)
+    paths = np.zeros((m, len(path), 2))
+    for i in range(m):
+        paths[i, :lengths[i]] = path[:lengths[i], :2]
+    steer = batch.control(states, paths, lengths)
+    singles = [PurePursuitController() for _ in range(m)]
+    expected = np.array([singles[i].control(states[i], path[:lengths[i]]) for i in range(m)])
+    max_diff = np.abs(steer - expected).max()
+    assert max_diff < 1e-9, f"补齐路径转向角不一致: {max_diff:.2e}"
+    print(f"✓ 补齐路径与逐车控制一致 (最大差 {max_diff:.1e})")
+    
+    return True
+
+
+def test_streaming_statistics():
+    """测试流式统计与环形缓冲区"""
+    print("\n" + "="*60)
+    print("测试9: 流式统计")
+    print("="*60)
+    
+    import numpy as np
+    from control.statistics import RunningStats, RingBuffer
+    from control.pure_pursuit import PurePursuitController
+    from utils.helper import create_circular_path
+    
+    rng = np.random.default_rng(0)
+    values = rng.normal(3.0, 2.0, 1000)
+    stats = RunningStats()
+    history = RingBuffer(100)
+    for v in values:
+        stats.update(v)
+        history.append(v)
+    
+    assert stats.count == len(values)
+    assert np.isclose(stats.mean, np.mean(values)) and np.isclose(stats.std, np.std(values))
+    assert stats.min == values.min() and stats.max == values.max()
+    print("✓ Welford均值/标准差/最值与numpy一致")
+    
+    assert len(history) == 100 and np.array_equal(np.asarray(history), values[-100:])
+    assert history[0] == values[-100] and history[-1] == values[-1]
+    print("✓ 环形缓冲区只保留最近100个（按时间顺序）")
+    
+    # 控制器: 历史有界，统计覆盖全部周期
+    path = create_circular_path(20.0)
+    controller = PurePursuitController(history_size=50)
+    state = np.array([path[0, 0], path[0, 1], path[0, 2], 2.0])
+    steers = [controller.control(state + [0.0, 0.01 * k, 0.0, 0.0], path) for k in range(200)]
+    info = controller.get_statistics()
+    assert len(controller.control_history) == 50
+    assert np.isclose(info['max_steer'], np.max(np.abs(steers)))
+    assert np.isclose(info['mean_steer'], np.mean(np.abs(steers)))
+    print("✓ 控制器历史有界，统计覆盖全部200个周期")
+    
+    return True
+
+
+def test_parameter_sweep():
+    """测试参数扫描（与逐个simulate对比）"""
+    print("\n" + "="*60)
+    print("测试10: 批量参数扫描")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController, PathFollowingSimulator
+    from vehicle.bicycle_model import BicycleModel
+    from utils.helper import create_s_curve_path
+    
+    path = create_s_curve_path()
+    k_values = [0.5, 1.0, 1.5]
+    ld_values = [1.5, 3.0]
+    starts = np.array([
+        [path[0, 0], path[0, 1], path[0, 2], 3.0],
+        [path[0, 0], path[0, 1] + 1.0, path[0, 2], 4.0],
+    ])
+    
+    simulator = PathFollowingSimulator(PurePursuitController(), BicycleModel())
+    table = simulator.sweep(path, k_values, ld_values, starts, max_steps=400)
+    assert len(table) == 3 * 2 * 2, "结果表行数错误"
+    print(f"✓ {len(table)} 个配置一次仿真，到达终点 {table['reached_goal'].sum()} 个")
+    
+    for row in table:
+        controller = PurePursuitController(k_lookahead=row['k_lookahead'], ld_min=row['ld_min'])
+        _, info = PathFollowingSimulator(controller, BicycleModel()).simulate(
+            starts[row['initial_state']].copy(), path, max_steps=400)
+        assert info['steps'] == row['steps'] and info['reached_goal'] == row['reached_goal']
+        for name in ('final_dist_to_goal', 'mean_lateral_error', 'max_lateral_error', 'max_steer'):
+            assert abs(info[name] - row[name]) < 1e-9, f"{name} 不一致"
+    print("✓ 每个配置的指标与单独simulate一致")
+    
+    # 曲率自适应预瞄 + 速度曲线 + 其他最近点查询方式也要原样复现
+    vehicle = BicycleModel()
+    for options in ({'vehicle': vehicle, 'curvature_gain': 5.0},
+                    {'vehicle': vehicle, 'nearest_search': 'index'},
+                    {'nearest_search': 'global'}):
+        simulator = PathFollowingSimulator(PurePursuitController(**options), vehicle)
+        table = simulator.sweep(path, [1.0], [2.0], starts[0], max_steps=400)
+        controller = PurePursuitController(k_lookahead=1.0, ld_min=2.0, **options)
+        _, info = PathFollowingSimulator(controller, vehicle).simulate(starts[0].copy(), path, max_steps=400)
+        assert info['steps'] == table[0]['steps'], f"{options}: 步数不一致"
+        assert abs(info['mean_lateral_error'] - table[0]['mean_lateral_error']) < 1e-9, f"{options}: 误差不一致"
+    print("✓ curvature_gain / 速度曲线 / nearest_search 与单独simulate一致")
+    
+    return True
+
+
+def test_campaign_resume():
+    """测试多进程回归测试（流式写盘、断点续跑）"""
+    print("\n" + "="*60)
+    print("测试11: 回归测试断点续跑")
+    print("="*60)
+    
+    import os
+    import tempfile
+    from control.campaign import CampaignRunner, make_runs
+    from utils.helper import create_circular_path, create_s_curve_path
+    
+    paths = {
+        'circle': create_circular_path(10.0, 100, 3.0)[:80],
+        's_curve': create_s_curve_path(25, 125, 3.0),
+    }
+    controllers = {
+        'pp_short': ('pure_pursuit', {'ld_min': 1.5, 'max_steps': 300}),
+        'pp_long': ('pure_pursuit', {'ld_min': 3.0, 'max_steps': 300}),
+    }
+    runs = make_runs(paths, controllers)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'campaign.jsonl')
+        runner = CampaignRunner(output, workers=2)
+        
+        # 模拟中断: 只完成一半，最后一行写了一半
+        runner.run(runs[:2], verbose=False)
+        with open(output, 'a') as f:
+            f.write('{"run_id": "pp_long/cir')
+        assert len(runner.pending_runs(runs)) == 2
+        
+        results = runner.run(runs, verbose=False)
+        assert [r['run_id'] for r in results] == [run['run_id'] for run in runs]
+        assert all(r['status'] == 'ok' for r in results), "有运行失败"
+        with open(output) as f:
+            n_lines = sum(1 for _ in f)
+        assert n_lines == 5, f"已完成的运行被重复执行 ({n_lines} 行)"
+        print(f"✓ 续跑只执行了剩下的 2 次运行")
+        
+        assert not runner.pending_runs(runs)
+        print(f"✓ 全部 {len(runs)} 次运行已完成并写入结果文件")
+    
+    return True
+
+
+def test_realtime_loop():
+    """测试实时模式（超时检测、安全指令、错过周期的积分）"""
+    print("\n" + "="*60)
+    print("测试12: 实时控制循环")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController, PathFollowingSimulator
+    from vehicle.bicycle_model import BicycleModel
+    from utils.helper import create_s_curve_path
+    
+    class FakeClock:
+        """模拟时钟: sleep直接推进时间，每次读时钟推进1µs（忙等循环能结束）"""
+        now = 0.0
+        
+        def clock(self):
+            self.now += 1e-6
+            return self.now
+        
+        def sleep(self, seconds):
+            self.now += seconds
+    
+    fake = FakeClock()
+    
+    class StallingController(PurePursuitController):
+        """每5个周期卡顿30ms（超过50Hz的20ms周期）"""
+        ticks = 0
+        
+        def control(self, state, ref_path):
+            self.ticks += 1
+            if self.ticks % 5 == 0:
+                fake.sleep(0.03)
+            return super().control(state, ref_path)
+    
+    path = create_s_curve_path(25, 125, 3.0)
+    simulator = PathFollowingSimulator(StallingController(), BicycleModel(), dt=0.02)
+    
+    trajectory, info = simulator.simulate_realtime(
+        np.array([0.0, 0.0, 0.0, 3.0]), path, max_steps=25, safe_command=[0.0, -1.0],
+        clock=fake.clock, sleep=fake.sleep)
+    
+    assert info['deadline_misses'] == 5, f"超时周期数错误: {info['deadline_misses']}"
+    assert info['skipped_ticks'] == 5
+    assert info['compute_histogram'][0][-1] == 5 and info['compute_histogram'][0].sum() == 25
+    print(f"✓ 检出 {info['deadline_misses']} 次超时，错过 {info['skipped_ticks']} 个周期")
+    
+    # 超时周期和错过的周期都执行安全指令（减速1 m/s²），错过的周期也要积分
+    assert len(trajectory) == 1 + 25 + 5, f"轨迹长度错误: {len(trajectory)}"
+    assert np.isclose(trajectory[-1, 3], 3.0 - 10 * 1.0 * 0.02), "安全指令未生效"
+    print("✓ 超时/错过的周期执行安全指令，车辆按周期前进")
+    
+    # 按单调时钟定频: 30个周期 ≈ 0.6 s（模拟时间）
+    assert 0.58 < fake.now < 0.62, f"节拍异常: {fake.now:.3f} s"
+    assert info['max_jitter'] < 1e-3, "绝对时刻排程不应累积漂移"
+    print(f"✓ 30个周期用时 {fake.now:.3f} s (50 Hz)")
+    
+    return True
+
+
+def test_speed_profile():
+    """测试参考路径的曲率与速度曲线"""
+    print("\n" + "="*60)
+    print("测试13: 曲率与速度曲线")
+    print("="*60)
+    
+    import numpy as np
+    from control.reference_path import ReferencePath
+    from control.pure_pursuit import PurePursuitController, PathFollowingSimulator
+    from vehicle.bicycle_model import BicycleModel
+    from utils.helper import create_circular_path
+    
+    # 圆: 曲率 = 1/R
+    ref = ReferencePath(create_circular_path(10.0, 400))
+    assert np.allclose(ref.curvature, 0.1, atol=1e-4), "圆的曲率错误"
+    print("✓ 圆形路径曲率 = 1/R")
+    
+    # 直线 + 半径6m的90°弯 + 直线
+    t = np.linspace(0, np.pi / 2, 100)
+    path = np.vstack([
+        np.column_stack([np.linspace(0, 50, 200), np.zeros(200)]),
+        np.column_stack([50 + 6 * np.sin(t), 6 * (1 - np.cos(t))])[1:],
+        np.column_stack([np.full(99, 56.0), 6 + np.linspace(0, 30, 100)[1:]]),
+    ])
+    vehicle = BicycleModel()
+    ref = ReferencePath(path, vehicle=vehicle, a_lat_max=2.0)
+    
+    dv2 = np.diff(ref.speed**2)
+    assert np.all(np.abs(dv2) <= 2 * vehicle.a_max * np.diff(ref.s) + 1e-9), "超过加速度约束"
+    assert np.all(ref.speed**2 * np.abs(ref.curvature) <= 2.0 + 1e-9), "超过横向加速度约束"
+    assert ref.speed.max() <= vehicle.v_max and ref.feasible.all()
+    print(f"✓ 速度曲线满足约束 (弯道 {ref.speed.min():.2f} m/s, 直道 {ref.speed.max():.2f} m/s)")
+    
+    # 弯前减速 + 曲率自适应预瞄: 切弯误差减小
+    errors = []
+    for kwargs in ({}, {'vehicle': vehicle, 'curvature_gain': 5.0}):
+        controller = PurePursuitController(**kwargs)
+        _, info = PathFollowingSimulator(controller, vehicle).simulate(
+            np.array([0.0, 0.0, 0.0, 5.0]), path, max_steps=600)
+        assert info['reached_goal']
+        errors.append(info['max_lateral_error'])
+    assert errors[1] < errors[0], "切弯误差没有减小"
+    print(f"✓ 最大横向误差 {errors[0]:.2f} m → {errors[1]:.2f} m")
+    
+    return True
+
+
+def test_segment_index():
+    """测试线段空间索引（重叠路径不跳圈）"""
+    print("\n" + "="*60)
+    print("测试14: 线段空间索引")
+    print("="*60)
+    
+    import numpy as np
+    from control.reference_path import ReferencePath
+    from control.segment_index import SegmentIndex
+    from control.path_tracking import NearestPointTracker
+    from control.mpc_controller import MPCController
+    
+    # 8字形走两圈: 每个位置附近都有另一圈的线段
+    t = np.linspace(0, 4 * np.pi, 2001)
+    path = np.column_stack([20 * np.sin(t), 10 * np.sin(2 * t), np.zeros_like(t), np.full_like(t, 3.0)])
+    ref = ReferencePath(path)
+    index = SegmentIndex(ref, cell_size=5.0)
+    
+    # 与暴力搜索对比
+    rng = np.random.default_rng(0)
+    all_segments = np.arange(len(ref.seg_len))
+    for _ in range(300):
+        point = rng.uniform([-22, -12], [22, 12])
+        s_hint, s_window = rng.uniform(0, ref.length), rng.uniform(1, 30)
+        hit = index.nearest(point, 3.0, s_hint, s_window)
+        keep = (ref.s[1:] >= s_hint - s_window) & (ref.s[:-1] <= s_hint + s_window)
+        expected = ref.project(point, segments=all_segments[keep])
+        if expected[2] > 9.0:
+            assert hit is None
+        else:
+            assert hit is not None and np.isclose(hit[2], expected[2])
+    print("✓ 半径 + 弧长窗口查询与暴力搜索一致")
+    
+    # 沿路径跟踪（带噪声）: 弧长连续，不跳到另一圈
+    # 两圈完全重合，第一次查询需要给出初始弧长
+    tracker = NearestPointTracker(path, mode='index')
+    tracker.reset(s_hint=0.0)
+    mpc = MPCController()
+    mpc.reset_tracking(s_hint=0.0)
+    max_jump_tracker = max_jump_mpc = 0.0
+    for i in range(0, len(path), 5):
+        pos = path[i, :2] + rng.normal(0, 0.2, 2)
+        segment, t_seg, _ = tracker.query_segment(pos)
+        max_jump_tracker = max(max_jump_tracker, abs(ref.arc_length_at(segment, t_seg) - ref.s[i]))
+        
+        state = np.array([pos[0], pos[1], 0.0, 3.0])
+        x_ref = mpc.extract_reference(state, path)
+        max_jump_mpc = max(max_jump_mpc, abs(mpc.last_s - ref.s[i]))
+        assert x_ref.shape == (mpc.N + 1, 4)
+    
+    assert max_jump_tracker < 1.0, f"最近点跳圈: {max_jump_tracker:.1f} m"
+    assert max_jump_mpc < 1.0, f"MPC参考跳圈: {max_jump_mpc:.1f} m"
+    print(f"✓ 两圈8字形跟踪弧长误差 < 1 m (跟踪器 {max_jump_tracker:.2f} m, MPC {max_jump_mpc:.2f} m)")
+    
+    # query()（最近路径点）在'index'模式下同样按弧长连续跟踪
+    tracker = NearestPointTracker(path, mode='index')
+    tracker.reset(s_hint=0.0)
+    max_jump_point = 0.0
+    for i in range(0, len(path), 5):
+        pos = path[i, :2] + rng.normal(0, 0.2, 2)
+        max_jump_point = max(max_jump_point, abs(ref.s[tracker.query(pos)] - ref.s[i]))
+    assert max_jump_point < 1.0, f"最近点跳圈: {max_jump_point:.1f} m"
+    assert tracker.n_global_queries == 0, "index模式不应回退到全局查询"
+    print(f"✓ query() 按索引跟踪，弧长误差 {max_jump_point:.2f} m")
+    
+    return True
+
+
+def test_hybrid_astar_lesson2():
+    """测试Hybrid A*完备性（lesson2_demo的查询必须找到路径）"""
+    print("\n" + "="*60)
+    print("测试15: Hybrid A* 完备性回归")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, PlanStatus
+    
+    # 与 examples/lesson2_demo.py 的 demo_hybrid_astar_vs_astar 相同
+    grid = np.zeros((25, 25))
+    grid[10:15, 10:15] = 1
+    planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(45))
+    path = planner.plan((3.0, 3.0, 0.0, 0.0), (20.0, 20.0, np.pi/4, 0.0), verbose=False)
+    
+    assert path is not None, f"未找到路径 (扩展 {planner.nodes_expanded} 个节点)"
+    assert planner.status == PlanStatus.SUCCESS
+    assert np.hypot(path[-1, 0] - 20.0, path[-1, 1] - 20.0) < planner.goal_pos_tol
+    print(f"✓ 找到路径: {len(path)} 个点，扩展 {planner.nodes_expanded} 个节点")
+    
+    return True
+
+
+def test_arc_braking():
+    """测试圆弧积分的速度截断（从静止刹车不后退）"""
+    print("\n" + "="*60)
+    print("测试16: 圆弧积分速度截断")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    
+    vehicle = BicycleModel(L=2.7, v_max=5.0, a_max=2.0)
+    brake = np.array([0.0, -2.0])
+    
+    # 从静止刹车: 位置不变（与欧拉法一致）
+    rest = np.array([0.0, 0.0, 0.0, 0.0])
+    for method in ('euler', 'arc'):
+        assert np.allclose(vehicle.step(rest, brake, 0.5, method=method), rest), f"{method} 从静止刹车后退"
+    assert np.allclose(vehicle.step_batch(rest[None], brake, 0.5, method='arc'), rest)
+    trajs = vehicle.rollout(rest, np.tile(brake, (3, 10, 1)), dt=0.5, method='arc')
+    assert np.allclose(trajs, 0.0), "rollout 从静止刹车后退"
+    print("✓ step / step_batch / rollout 从静止刹车保持原地")
+    
+    # 步内刹停: 1 m/s 以 2 m/s² 刹车 0.5 s 停下，只走 0.25 m
+    state = vehicle.step(np.array([0.0, 0.0, 0.0, 1.0]), brake, 1.0, method='arc')
+    assert np.allclose(state, [0.25, 0.0, 0.0, 0.0]), state
+    
+    # 步内到达v_max: 4 m/s 加速 0.5 s 到 5 m/s，再匀速 0.5 s，共 2.25 + 2.5 m
+    state = vehicle.step(np.array([0.0, 0.0, 0.0, 4.0]), [0.0, 2.0], 1.0, method='arc')
+    assert np.allclose(state, [4.75, 0.0, 0.0, 5.0]), state
+    print("✓ 步内刹停/到达v_max时行驶距离正确")
+    
+    # 转向角不变时任意dt都精确: 与圆的解析解一致，一大步 = 多小步
+    delta, v, T = np.deg2rad(20), 3.0, 4.0
+    R = vehicle.L / np.tan(delta)
+    exact = [R * np.sin(v * T / R), R * (1 - np.cos(v * T / R))]
+    big = vehicle.step(np.array([0.0, 0.0, 0.0, v]), [delta, 0.0], T, method='arc')
+    assert np.allclose(big[:2], exact), "圆弧积分与解析解不一致"
+    small = np.array([0.0, 0.0, 0.0, v])
+    for _ in range(40):
+        small = vehicle.step(small, [delta, 0.0], T / 40, method='arc')
+    assert np.allclose(small, big)
+    euler = vehicle.step(np.array([0.0, 0.0, 0.0, v]), [delta, 0.0], T)
+    print(f"✓ 4 s 一步与解析解一致 (欧拉法误差 {np.hypot(*(euler[:2] - exact)):.1f} m)")
+    
+    return True
+
+
+def test_multi_goal_shared_memory():
+    """测试多目标并行规划（共享内存导出与串行结果一致）"""
+    print("\n" + "="*60)
+    print("测试17: 多目标并行规划")
+    print("="*60)
+    
+    import copy
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, PlanStatus
+    from algorithms import multi_goal
+    
+    grid = np.zeros((30, 30))
+    grid[12:18, 12:16] = 1
+    start = (4.0, 4.0, 0.0, 0.0)
+    goals = [(25.0, 25.0, np.pi/2, 0.0), (25.0, 5.0, 0.0, 0.0), (5.0, 25.0, np.pi/2, 0.0)]
+    
+    for mode in ('footprint', 'circles'):
+        planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0,
+                              yaw_resolution=np.deg2rad(15), collision_mode=mode)
+        planner.clearance(1.0, 1.0)  # circles模式: _clearance_map 就是检测器的 distance_map
+        
+        # 别名数组只导出一次，工作进程里还原为同一个数组
+        template = copy.copy(planner)
+        template.collision_checker = copy.copy(planner.collision_checker)
+        specs, shms, exported = {}, [], {}
+        multi_goal._export_arrays(template.collision_checker, multi_goal._CHECKER_SHARED_FIELDS,
+                                  'checker', specs, shms, exported)
+        multi_goal._export_arrays(template, multi_goal._PLANNER_SHARED_FIELDS, 'planner', specs, shms, exported)
+        try:
+            assert len(shms) == len({spec[0] for spec in specs.values()}), "同一数组导出了多次"
+            if mode == 'circles':
+                assert specs[('planner', '_clearance_map')] == specs[('checker', 'distance_map')]
+            else:
+                assert ('checker', 'collision_table') in specs, "碰撞表未共享"
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+        
+        results = multi_goal.plan_multi_goal(planner, start, goals, max_workers=2,
+                                             cancel_when_best=False, verbose=False)
+        for result in results:
+            planner.plan(start, goals[result['goal_index']], verbose=False)
+            assert result['status'] == planner.status == PlanStatus.SUCCESS
+            assert np.isclose(result['cost'], planner.path_cost), f"{mode}: 并行与串行代价不一致"
+        print(f"✓ {mode}: {len(shms)} 块共享内存，{len(goals)} 个目标与串行规划一致")
+    
+    return True
+
+
+def test_circle_collision():
+    """测试圆覆盖 + 距离变换碰撞检测"""
+    print("\n" + "="*60)
+    print("测试18: 圆覆盖碰撞检测")
+    print("="*60)
+    
+    import numpy as np
+    from algorithms.collision import CircleCollisionChecker
+    
+    grid = np.zeros((30, 30), dtype=np.uint8)
+    grid[14:16, 13:15] = 1
+    grid[5, 20] = 1
+    
+    # 距离图与暴力计算一致（地图外一圈视为障碍物）
+    checker = CircleCollisionChecker(grid, length=4.5, width=1.8)
+    obstacles = np.argwhere(np.pad(grid != 0, 1, constant_values=True)) - 1
+    jj, ii = np.mgrid[0:30, 0:30]
+    expected = np.min(np.hypot(jj[..., None] - obstacles[:, 0], ii[..., None] - obstacles[:, 1]), axis=-1)
+    assert np.allclose(checker.distance_map, expected), "距离变换错误"
+    assert checker.clearance(20.5, 5.5) == 0.0 and checker.clearance(-1.0, 3.0) == 0.0
+    print("✓ 距离图与暴力计算一致")
+    
+    # 批量与逐个检测一致
+    rng = np.random.default_rng(0)
+    poses = rng.uniform([0, 0, -np.pi], [30, 30, np.pi], (1000, 3))
+    batch = checker.collides_batch(poses[:, 0], poses[:, 1], poses[:, 2])
+    assert np.array_equal(batch, [checker.collides(*pose) for pose in poses])
+    print("✓ collides_batch 与 collides 一致")
+    
+    # 默认参数下没有漏检: 位姿集中在障碍物附近，车身矩形采样点落在障碍物格子里就必须判为碰撞
+    u, v = np.meshgrid(np.linspace(-2.25, 2.25, 30), np.linspace(-0.9, 0.9, 10))
+    
+    def misses(c):
+        n = 0
+        for x, y, theta in rng.uniform([8, 9, -np.pi], [20, 21, np.pi], (3000, 3)):
+            px = x + u * np.cos(theta) - v * np.sin(theta)
+            py = y + u * np.sin(theta) + v * np.cos(theta)
+            if grid[py.astype(int), px.astype(int)].any() and not c.collides(x, y, theta):
+                n += 1
+        return n
+    
+    assert misses(checker) == 0, "默认参数下漏检"
+    
+    # 不计格子离散化余量时确实会漏检（说明上面的采样能发现漏检）
+    loose = CircleCollisionChecker(grid, length=4.5, width=1.8)
+    loose.threshold = loose.radius + 0.5
+    assert misses(loose) > 0
+    print("✓ 圆覆盖车身矩形，默认参数无漏检（不加√2余量时会漏检）")
+    
+    return True
+
+
+def test_multiresolution():
+    """测试多分辨率Hybrid A*（走廊内细搜索 + 回退）"""
+    print("\n" + "="*60)
+    print("测试19: 多分辨率Hybrid A*")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, PlanStatus
+    
+    grid = np.zeros((40, 40))
+    grid[12:28, 17:21] = 1
+    start, goal = (4.0, 4.0, 0.0, 0.0), (34.0, 34.0, np.pi/2, 0.0)
+    planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(15))
+    
+    planner.plan(start, goal, verbose=False)
+    full_cost, full_expanded = planner.path_cost, planner.nodes_expanded
+    
+    path = planner.plan_multiresolution(start, goal, verbose=False)
+    stats = planner.multires_stats
+    assert path is not None and planner.status == PlanStatus.SUCCESS
+    assert not stats['fallback'], "走廊搜索不应失败"
+    assert stats['coarse_expanded'] + stats['fine_expanded'] < full_expanded, "两阶段扩展数应少于完整搜索"
+    assert planner.path_cost <= 1.1 * full_cost, f"路径代价变差过多: {planner.path_cost} vs {full_cost}"
+    assert planner.corridor_mask is None, "走廊掩码未清除"
+    assert not any(planner.is_collision(state) for state in path)
+    print(f"✓ 扩展 {stats['coarse_expanded']} + {stats['fine_expanded']} 个节点 "
+          f"(完整搜索 {full_expanded})，代价 {planner.path_cost:.1f} (完整搜索 {full_cost:.1f})")
+    
+    # 走廊宽度为0: 细搜索失败，回退到完整搜索
+    path = planner.plan_multiresolution(start, goal, corridor_width=0.0, verbose=False)
+    assert planner.multires_stats['fallback'] and path is not None, "回退搜索失败"
+    assert np.isclose(planner.path_cost, full_cost)
+    print("✓ 走廊搜索失败时回退到完整搜索")
+    
+    return True
+
+
+def test_adaptive_step():
+    """测试按净空自适应的原语步长"""
+    print("\n" + "="*60)
+    print("测试20: 自适应原语步长")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, HybridAStarNode
+    
+    grid = np.zeros((60, 60))
+    grid[25:35, 28:32] = 1
+    start, goal = (5.0, 5.0, 0.0, 0.0), (55.0, 55.0, np.pi/2, 0.0)
+    vehicle = BicycleModel(L=2.7)
+    fixed = HybridAStar(vehicle, grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(15))
+    adaptive = HybridAStar(vehicle, grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(15), adaptive_step=True)
+    
+    # 步长选择: 开阔处长步，靠近障碍物/目标短步
+    adaptive.goal = goal
+    def step_at(x, y):
+        node = HybridAStarNode(f=0.0, state=(x, y, 0.0, 0.0), g=0.0, h=0.0, parent=None)
+        return adaptive.select_primitives(node)[0].distance
+    assert step_at(10.0, 50.0) == 4.0, "开阔区域应选最长步长"
+    assert step_at(27.0, 30.0) == 1.0, "靠近障碍物应选最短步长"
+    assert step_at(54.0, 54.0) == 1.0, "靠近目标应选最短步长"
+    print("✓ 开阔处 4 m，障碍物/目标附近 1 m")
+    
+    # 代价仍等于行驶距离，路径无碰撞，扩展数更少
+    fixed_path = fixed.plan(start, goal, verbose=False)
+    path = adaptive.plan(start, goal, verbose=False)
+    assert path is not None and fixed_path is not None
+    travelled = np.sum(np.hypot(*np.diff(np.asarray(path)[:, :2], axis=0).T))
+    assert abs(adaptive.path_cost - travelled) < 0.01, f"代价与行驶距离不一致: {adaptive.path_cost} vs {travelled}"
+    assert not any(adaptive.is_collision(state) for state in path)
+    assert adaptive.nodes_expanded < fixed.nodes_expanded
+    print(f"✓ 扩展 {adaptive.nodes_expanded} 个节点 (固定步长 {fixed.nodes_expanded})，"
+          f"代价 {adaptive.path_cost:.1f} = 行驶距离")
+    
+    return True
+
+
+def test_search_budget():
+    """测试规划预算（扩展数/时间上限返回部分路径，取消）"""
+    print("\n" + "="*60)
+    print("测试21: 规划预算与部分路径")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, PlanStatus
+    
+    grid = np.zeros((25, 25))
+    grid[10:15, 10:15] = 1
+    start, goal = (3.0, 3.0, 0.0, 0.0), (20.0, 20.0, np.pi/4, 0.0)
+    planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(45))
+    
+    # 扩展数上限: 正好扩展这么多个节点，返回离目标最近的部分路径
+    path = planner.plan(start, goal, verbose=False, max_expansions=20)
+    assert planner.status == PlanStatus.MAX_EXPANSIONS and planner.nodes_expanded == 20
+    assert path is not None and np.allclose(path[0][:2], start[:2])
+    assert planner.heuristic(tuple(path[-1])) < planner.heuristic(start), "部分路径没有靠近目标"
+    print(f"✓ 扩展 20 个节点后返回部分路径 ({len(path)} 个点)")
+    
+    # 时间上限为0: 立即超时，只有起点
+    path = planner.plan(start, goal, verbose=False, deadline_ms=0.0)
+    assert planner.status == PlanStatus.TIMEOUT and len(path) == 1 and planner.path_cost == 0
+    
+    # 取消回调: 返回None
+    assert planner.plan(start, goal, verbose=False, should_stop=lambda: True) is None
+    assert planner.status == PlanStatus.CANCELLED
+    
+    # 预算足够时与不限预算相同
+    path = planner.plan(start, goal, verbose=False, max_expansions=10000, deadline_ms=60000)
+    assert planner.status == PlanStatus.SUCCESS and path is not None
+    print("✓ 超时 / 取消 / 预算充足 三种状态正确")
+    
+    return True
+
+
+def test_batch_expansion():
+    """测试批量top-k扩展（与逐个扩展一致）"""
+    print("\n" + "="*60)
+    print("测试22: 批量节点扩展")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, HybridAStarNode, PlanStatus
+    
+    grid = np.zeros((30, 30))
+    grid[12:18, 12:16] = 1
+    rng = np.random.default_rng(0)
+    
+    def key(node):
+        return (round(node.g, 9), round(node.h, 9)) + tuple(np.round(node.state, 6))
+    
+    for mode in ('point', 'footprint', 'circles'):
+        planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(15),
+                              use_reverse=True, collision_mode=mode,
+                              clearance_weight=1.0 if mode == 'circles' else 0.0)
+        planner.goal = (25.0, 25.0, np.pi/2, 0.0)
+        
+        # 随机节点（含前进/后退速度，触发换挡代价）
+        samples = rng.uniform([2, 2, -np.pi, -1, 0], [28, 28, np.pi, 1, 10], (40, 5))
+        nodes = [HybridAStarNode(f=0.0, state=tuple(sample[:4]), g=sample[4], h=0.0, parent=None)
+                 for sample in samples]
+        nodes = [node for node in nodes if not planner.is_collision(node.state)]
+        
+        batch = sorted(key(succ) for succ in planner.expand_batch(nodes))
+        single = sorted(key(succ) for node in nodes for succ in planner.expand_node(node))
+        assert batch == single, f"{mode}: 批量扩展与逐个扩展不一致"
+        
+        states = rng.uniform([-2, -2, -np.pi, 0], [32, 32, np.pi, 0], (500, 4))
+        assert np.array_equal(planner.is_collision_batch(states),
+                              [planner.is_collision(tuple(state)) for state in states])
+        print(f"✓ {mode}: {len(batch)} 个后继与逐个扩展一致，批量碰撞检测一致")
+    
+    # top-k搜索仍能找到路径
+    planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(15))
+    path = planner.plan((4.0, 4.0, 0.0, 0.0), (25.0, 25.0, np.pi/2, 0.0), verbose=False, batch_size=8)
+    assert path is not None and planner.status == PlanStatus.SUCCESS
+    print(f"✓ batch_size=8 找到路径 (扩展 {planner.nodes_expanded} 个节点)")
+    
+    return True
+
+
+def test_search_tree_file():
+    """测试搜索树文件（写入/读取往返、抽稀、截断文件）"""
+    print("\n" + "="*60)
+    print("测试23: 搜索树文件")
+    print("="*60)
+    
+    import os
+    import tempfile
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar
+    from algorithms.search_tree_io import SearchTreeWriter, SearchTreeReader, COLUMNS
+    
+    rng = np.random.default_rng(0)
+    rows = {name: rng.uniform(-100, 100, 50).astype(dtype) for name, dtype in COLUMNS}
+    rows['parent_id'] = np.arange(50, dtype=np.int32) - 1
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tree.bin')
+        
+        # 往返: 块大小7（最后一块不满），数据和元数据原样读回
+        with SearchTreeWriter(path, chunk_size=7, metadata={'goal': [1.0, 2.0]}) as writer:
+            for i in range(50):
+                assert writer.write(*(rows[name][i] for name, _ in COLUMNS)) == i
+        tree = SearchTreeReader(path)
+        data = tree.load()
+        assert len(tree) == 50 and tree.metadata == {'goal': [1.0, 2.0]}
+        for name, dtype in COLUMNS:
+            assert data[name].dtype == dtype and np.array_equal(data[name], rows[name]), f"{name} 不一致"
+        print("✓ 50 个节点 / 8 个块 往返一致")
+        
+        # 抽稀: 全局节点id是间隔的整数倍
+        assert np.array_equal(tree.load(decimate=4)['node_id'], np.arange(0, 50, 4))
+        assert len(tree.load(max_nodes=10)['node_id']) <= 10
+        edges = tree.load_edges()
+        assert edges.shape == (49, 2, 2) and np.array_equal(edges[:, 1, 0], rows['x'][1:])
+        
+        # 写入中断（没有结束块、最后一块不完整）: 读出完整的块
+        with open(path, 'rb') as f:
+            raw = f.read()
+        with open(path, 'wb') as f:
+            f.write(raw[:len(raw) - 200])
+        truncated = SearchTreeReader(path)
+        assert len(truncated) % 7 == 0 and 0 < len(truncated) < 50
+        assert np.array_equal(truncated.load()['x'], rows['x'][:len(truncated)])
+        print(f"✓ 抽稀正确，截断文件读出 {len(truncated)} 个完整节点")
+        
+        # 规划器导出: 每扩展一个节点一行，父节点先于子节点写入
+        planner = HybridAStar(BicycleModel(L=2.7), np.zeros((25, 25)), xy_resolution=1.0,
+                              yaw_resolution=np.deg2rad(45))
+        with SearchTreeWriter(path) as writer:
+            planner.plan((3.0, 3.0, 0.0, 0.0), (20.0, 20.0, np.pi/4, 0.0), verbose=False, tree_writer=writer)
+        data = SearchTreeReader(path).load()
+        assert len(data['node_id']) == planner.nodes_expanded
+        assert data['parent_id'][0] == -1 and np.all(data['parent_id'][1:] < data['node_id'][1:])
+        assert np.all(data['primitive_id'][1:] >= 0)
+        print(f"✓ 规划器导出 {planner.nodes_expanded} 个扩展节点，父子顺序正确")
+    
+    return True
+
+
+def test_direction_lattice():
+    """测试Hybrid A*状态区分行驶方向（倒车代价与换挡）"""
+    print("\n" + "="*60)
+    print("测试24: 行驶方向状态")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, HybridAStarNode, PlanStatus
+    
+    # 宽6m的通道，目标在车辆正后方7m
+    grid = np.zeros((20, 30))
+    grid[13:, :] = 1
+    grid[:7, :] = 1
+    planner = HybridAStar(BicycleModel(L=2.7), grid, xy_resolution=1.0, yaw_resolution=np.deg2rad(15),
+                          use_reverse=True)
+    
+    # 前进/倒车到达同一位姿是不同的离散状态，静止按前进处理
+    assert planner.calc_index((10, 10, 0, 1.0)) == planner.calc_index((10, 10, 0, 0.0))
+    assert planner.calc_index((10, 10, 0, 1.0))[:3] == planner.calc_index((10, 10, 0, -1.0))[:3]
+    assert planner.calc_index((10, 10, 0, 1.0)) != planner.calc_index((10, 10, 0, -1.0))
+    
+    # 前进中的节点: 后退原语 = 距离 × reverse_penalty + gear_switch_cost
+    planner.goal = (8.0, 10.0, 0.0, 0.0)
+    node = HybridAStarNode(f=0.0, state=(15.0, 10.0, 0.0, 1.0), g=0.0, h=0.0, parent=None)
+    for succ in planner.expand_node(node):
+        d = succ.primitive.distance
+        expected = d if succ.primitive.direction > 0 else d * planner.reverse_penalty + planner.gear_switch_cost
+        assert np.isclose(succ.g, expected), "倒车/换挡代价错误"
+        assert np.sign(succ.state[3]) == succ.primitive.direction
+    print("✓ 方向位进入索引，倒车与换挡代价正确")
+    
+    # 从静止直接倒车到正后方: 不换挡，代价 = 距离 × reverse_penalty
+    path = planner.plan((15.0, 10.0, 0.0, 0.0), planner.goal, verbose=False)
+    assert planner.status == PlanStatus.SUCCESS and np.all(np.asarray(path)[1:, 3] < 0)
+    assert np.isclose(planner.path_cost, 7.0 * planner.reverse_penalty)
+    print(f"✓ 倒车到正后方目标，代价 {planner.path_cost:.1f}")
+    
+    return True
+
+
+def test_step_batch():
+    """测试批量仿真一步（与逐个step一致）"""
+    print("\n" + "="*60)
+    print("测试25: 批量车辆仿真")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    
+    vehicle = BicycleModel(L=2.7)
+    rng = np.random.default_rng(0)
+    # 速度、转向角、加速度都超出约束的样本也包含在内
+    states = rng.uniform([-50, -50, -np.pi, -1], [50, 50, np.pi, 6], (200, 4))
+    controls = rng.uniform([-1.0, -3.0], [1.0, 3.0], (200, 2))
+    dts = rng.uniform(0.01, 0.5, 200)
+    
+    for method in ('euler', 'arc'):
+        expected = np.array([vehicle.step(s, c, dt, method=method) for s, c, dt in zip(states, controls, dts)])
+        assert np.allclose(vehicle.step_batch(states, controls, dts, method=method), expected), method
+        
+        # 共用控制 (2,)
+        shared = np.array([vehicle.step(s, controls[0], 0.1, method=method) for s in states])
+        assert np.allclose(vehicle.step_batch(states, controls[0], 0.1, method=method), shared)
+        
+        # out就是states: 原地更新
+        buf = states.copy()
+        result = vehicle.step_batch(buf, controls, dts, out=buf, method=method)
+        assert result is buf and np.allclose(buf, expected), f"{method}: 原地更新错误"
+    print("✓ euler / arc: 逐状态控制、共用控制、原地更新 均与step一致")
+    
+    return True
+
+
+def test_rk_integration():
+    """测试26: RK4/RK45 积分精度"""
+    print("\n" + "="*60)
+    print("测试26: RK4/RK45 积分精度")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    
+    vehicle = BicycleModel()
+    delta, v, dt = np.deg2rad(15), 4.0, 1.0
+    controls = [[delta, 0.0]] * 5
+    init = np.array([0.0, 0.0, 0.0, v])
+    
+    # 转向角、速度不变 → 圆弧，解析解
+    R = vehicle.L / np.tan(delta)
+    phi = v * dt * len(controls) / R
+    exact = np.array([R * np.sin(phi), R * (1 - np.cos(phi))])
+    
+    errors = {}
+    for method in ('euler', 'rk4', 'rk45'):
+        traj = vehicle.simulate_trajectory(init, controls, dt=dt, method=method, tol=1e-9)
+        assert traj.shape == (len(controls) + 1, 4)
+        errors[method] = np.hypot(*(traj[-1, :2] - exact))
+        print(f"  {method:5s}: 终点误差 {errors[method]:.2e} m, 统计 {vehicle.integration_stats}")
+    
+    assert errors['rk4'] < errors['euler'] * 1e-3, "RK4 应比欧拉法精确得多"
+    assert errors['rk45'] < 1e-6, "RK45 应满足误差容限"
+    
+    # 大步长下 RK45 自动细分，输出时刻仍为 k·dt
+    stats = vehicle.integration_stats
+    assert stats['steps'] > len(controls), "RK45 应在控制区间内细分步长"
+    
+    # 带加速度: 与很细的RK4比较
+    controls = [[delta, 1.0]] * 3 + [[-delta, -2.0]] * 3
+    ref = vehicle.simulate_trajectory(init, [c for c in controls for _ in range(200)],
+                                      dt=dt / 200, method='rk4')[::200]
+    traj = vehicle.simulate_trajectory(init, controls, dt=dt, method='rk45', tol=1e-9)
+    assert np.allclose(traj[:, :2], ref[:, :2], atol=1e-6)
+    
+    print("✓ RK4/RK45 与解析解、细步长参考一致")
+    
+    return True
+
+
+def test_rollout():
+    """测试27: 批量rollout与逐步仿真一致"""
+    print("\n" + "="*60)
+    print("测试27: 批量rollout与逐步仿真一致")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import BicycleModel
+    
+    vehicle = BicycleModel()
+    rng = np.random.default_rng(0)
+    R, T, dt = 8, 30, 0.1
+    init = np.column_stack([rng.uniform(-5, 5, (R, 2)), rng.uniform(-np.pi, np.pi, R), rng.uniform(0, 5, R)])
+    controls = np.stack([rng.uniform(-0.6, 0.6, (R, T)), rng.uniform(-4, 4, (R, T))], axis=-1)
+    
+    for method in ('euler', 'arc'):
+        trajs = vehicle.rollout(init, controls, dt=dt, method=method)
+        assert trajs.shape == (R, T + 1, 4)
+        for r in range(R):
+            ref = vehicle.simulate_trajectory(init[r], controls[r], dt=dt, method=method)
+            assert np.allclose(trajs[r], ref, atol=1e-9), f"{method}: 第{r}条rollout与逐步仿真不一致"
+    print("✓ euler / arc: 每条rollout与simulate_trajectory一致")
+    
+    # 共同初始状态 + 传入out数组（原地写入，不分配）
+    out = np.empty((R, T + 1, 4))
+    result = vehicle.rollout(init[0], controls, dt=dt, out=out)
+    assert result is out
+    assert np.allclose(out[:, 0], init[0])
+    print("✓ 结果写入传入的out数组")
+    
+    # 过程噪声: 同一种子可复现，且状态约束仍成立
+    noise_std = [0.05, 0.05, 0.02, 0.1]
+    a = vehicle.rollout(init, controls, dt=dt, noise_std=noise_std, rng=np.random.default_rng(42))
+    b = vehicle.rollout(init, controls, dt=dt, noise_std=noise_std, rng=np.random.default_rng(42))
+    clean = vehicle.rollout(init, controls, dt=dt)
+    assert np.array_equal(a, b), "同一种子的噪声rollout应完全相同"
+    assert not np.allclose(a, clean)
+    assert np.all((a[..., 3] >= 0) & (a[..., 3] <= vehicle.v_max))
+    assert np.all((a[..., 2] >= -np.pi) & (a[..., 2] <= np.pi))
+    print("✓ 噪声可复现，速度/航向约束成立")
+    
+    return True
+
+
+def test_state_history():
+    """测试28: StateHistory 与 CompactVehicleState"""
+    print("\n" + "="*60)
+    print("测试28: StateHistory 与 CompactVehicleState")
+    print("="*60)
+    
+    import numpy as np
+    from vehicle.bicycle_model import StateHistory, CompactVehicleState, VehicleState
+    
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((50, 4))
+    
+    # 小容量开始，append + extend 触发多次扩容
+    history = StateHistory(capacity=2)
+    for row in data[:7]:
+        history.append(row)
+    history.extend(data[7:])
+    assert len(history) == len(data)
+    assert np.array_equal(history.states, data)
+    for i, name in enumerate(('x', 'y', 'theta', 'v')):
+        assert np.array_equal(history.records[name], data[:, i])
+    print("✓ 扩容后 states / records 与写入数据一致")
+    
+    # 索引返回零拷贝视图，写入直接修改历史
+    last = history[-1]
+    assert (last.x, last.y, last.theta, last.v) == tuple(data[-1])
+    last.v = 123.0
+    assert history.states[-1, 3] == 123.0
+    assert np.shares_memory(last.to_array(), history.states)
+    try:
+        history[len(data)]
+        assert False, "越界索引应抛出IndexError"
+    except IndexError:
+        pass
+    print("✓ history[i] 为零拷贝视图，越界抛出IndexError")
+    
+    # __slots__: 没有实例字典；接口与VehicleState相同
+    state = CompactVehicleState.from_array(data[0])
+    assert not hasattr(state, '__dict__')
+    assert np.array_equal(state.to_array(), VehicleState.from_array(data[0]).to_array())
+    assert not np.shares_memory(state.to_array(), data), "from_array应复制数据"
+    print("✓ CompactVehicleState 无实例字典，to_array/from_array 与VehicleState一致")
+    
+    return True
+
+
+def test_window_tracker():
+    """测试29: 窗口最近点查询与全局查询一致"""
+    print("\n" + "="*60)
+    print("测试29: 窗口最近点查询与全局查询一致")
+    print("="*60)
+    
+    import numpy as np
+    from control.path_tracking import NearestPointTracker
+    
+    # 不自交的正弦路径，点距0.2 m
+    x = np.arange(0, 200, 0.2)
+    path = np.column_stack([x, 3 * np.sin(x / 10)])
+    rng = np.random.default_rng(0)
+    
+    window = NearestPointTracker(path, mode='window', window=50)
+    global_ = NearestPointTracker(path, mode='global')
+    
+    # 沿路径行驶（带横向噪声），每周期前进0.5~3 m（窗口长度10 m）
+    for xi in np.cumsum(rng.uniform(0.5, 3.0, 80)):
+        if xi >= 199:
+            break
+        pos = np.array([xi, 3 * np.sin(xi / 10)]) + rng.normal(0, 0.3, 2)
+        assert window.query(pos) == global_.query(pos), "窗口查询与全局查询不一致"
+    assert window.n_global_queries == 1, "正常跟踪时只有第一次查询走全局"
+    print(f"✓ {window.n_queries} 次查询结果一致，全局查询 {window.n_global_queries} 次")
+    
+    # 一个周期跨过多个窗口: 窗口继续前移，不触发全局查询
+    n_global = window.n_global_queries
+    idx = window.last_index
+    pos = path[idx + 3 * window.window]
+    assert window.query(pos) == idx + 3 * window.window
+    assert window.n_global_queries == n_global
+    
+    # 小幅后退（定位噪声）: backtrack 范围内找回
+    idx = window.last_index
+    pos = path[idx - window.backtrack // 2]
+    assert window.query(pos) == idx - window.backtrack // 2
+    assert window.n_global_queries == n_global
+    print("✓ 窗口前移与小幅后退不触发全局查询")
+    
+    # 重定位（跳回起点附近）: 窗口内距离超过 relocalize_dist，回退到全局查询
+    pos = path[10] + [0.0, 0.1]
+    assert window.query(pos) == global_.query(pos) == 10
+    assert window.n_global_queries == n_global + 1
+    
+    # reset 后下一次查询走全局
+    window.reset()
+    window.query(path[500])
+    assert window.n_global_queries == n_global + 2
+    print("✓ 重定位/reset 后回退到全局查询")
+    
+    return True
+
+
+def test_arc_lookahead():
+    """测试30: 按弧长查找预瞄点"""
+    print("\n" + "="*60)
+    print("测试30: 按弧长查找预瞄点")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController
+    
+    # 点距不均匀的曲线（含一段零长度线段）
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.1, 2.0, 60))
+    path = np.column_stack([x, 5 * np.sin(x / 8)])
+    path = np.insert(path, 20, path[20], axis=0)
+    
+    def walk(start_idx, ld):
+        """逐段累加长度，直接求弧长ld处的点"""
+        remaining = ld
+        for i in range(start_idx, len(path) - 1):
+            seg = np.linalg.norm(path[i + 1] - path[i])
+            if remaining <= seg and seg > 0:
+                return path[i] + remaining / seg * (path[i + 1] - path[i])
+            remaining -= seg
+        return path[-1]
+    
+    controller = PurePursuitController()
+    for start_idx in (0, 7, 19, 20, 45):
+        for ld in (0.0, 0.3, 2.5, 6.0, 17.3):
+            point, segment = controller.find_lookahead_point_by_arc(path, ld, start_idx)
+            assert np.allclose(point, walk(start_idx, ld)), f"start={start_idx}, Ld={ld}: 预瞄点错误"
+            # 预瞄点落在返回的线段上
+            a, b = path[segment], path[segment + 1]
+            assert np.isclose(np.linalg.norm(point - a) + np.linalg.norm(b - point), np.linalg.norm(b - a))
+    print("✓ 与逐段累加弧长的结果一致")
+    
+    # 超出终点 → 返回终点
+    point, _ = controller.find_lookahead_point_by_arc(path, 1e6, 50)
+    assert np.allclose(point, path[-1])
+    print("✓ 超出路径终点时返回终点")
+    
+    # 预瞄点随Ld连续移动（不在路径点之间跳变）
+    lds = np.linspace(0, 30, 3001)
+    points, _ = controller.get_reference_path(path).interpolate(lds)
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    assert steps.max() <= (lds[1] - lds[0]) + 1e-9
+    print("✓ 预瞄点随预瞄距离连续移动")
+    
+    return True
+
+
+def test_fused_geometry():
+    """测试31: 一次查询的路径几何与分步计算一致"""
+    print("\n" + "="*60)
+    print("测试31: 一次查询的路径几何与分步计算一致")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController
+    from vehicle.bicycle_model import BicycleModel
+    
+    x = np.arange(0, 120, 0.7)
+    path = np.column_stack([x, 6 * np.sin(x / 12)])
+    rng = np.random.default_rng(0)
+    
+    def brute_force(pos):
+        """对所有线段求点到线段距离，取最近；横向误差符号由叉积决定"""
+        a, d = path[:-1], np.diff(path, axis=0)
+        t = np.clip(np.einsum('ij,ij->i', pos - a, d) / np.einsum('ij,ij->i', d, d), 0, 1)
+        dist = np.linalg.norm(a + t[:, None] * d - pos, axis=1)
+        k = int(np.argmin(dist))
+        s = np.linalg.norm(d, axis=1)[:k].sum() + t[k] * np.linalg.norm(d[k])
+        cross = d[k, 0] * (pos[1] - a[k, 1]) - d[k, 1] * (pos[0] - a[k, 0])
+        return k, t[k], s, dist[k] if cross >= 0 else -dist[k]
+    
+    for mode in ('window', 'global', 'index'):
+        controller = PurePursuitController(nearest_search=mode, vehicle=BicycleModel())
+        ref = controller.get_reference_path(path)
+        for xi in np.arange(2, 110, 1.3):
+            pos = np.array([xi, 6 * np.sin(xi / 12)]) + rng.normal(0, 0.5, 2)
+            geo = controller.query_geometry(pos, path, velocity=2.0)
+            k, t, s, cte = brute_force(pos)
+            
+            assert geo['segment'] == k
+            assert np.isclose(geo['s'], s) and np.isclose(geo['cross_track_error'], cte)
+            assert np.isclose(geo['curvature'], ref.curvature[k] + t * (ref.curvature[k + 1] - ref.curvature[k]))
+            assert np.isclose(geo['target_speed'], ref.speed[k] + t * (ref.speed[k + 1] - ref.speed[k]))
+            assert np.isclose(geo['lookahead_distance'], controller.calc_lookahead_distance(2.0, geo['curvature']))
+            point, _ = ref.interpolate(s + geo['lookahead_distance'])
+            assert np.allclose(geo['lookahead_point'], point)
+        print(f"✓ {mode}: 最近线段/弧长/横向误差/曲率/目标速度/预瞄点 与分步计算一致")
+    
+    return True
+
+
+def test_lattice_dedup():
+    """测试32: Hybrid A* 按离散状态的代价去重"""
+    print("\n" + "="*60)
+    print("测试32: Hybrid A* 按离散状态的代价去重")
+    print("="*60)
+    
+    import numpy as np
+    from collections import defaultdict
+    from vehicle.bicycle_model import BicycleModel
+    from algorithms.hybrid_astar import HybridAStar, PlanStatus
+    
+    # 与 examples/benchmark_hybrid_astar.py 的 create_benchmark_map(30) 相同
+    rng = np.random.default_rng(1)
+    grid = np.zeros((30, 30))
+    for _ in range(30 // 4):
+        x, y = rng.integers(8, 30 - 12, 2)
+        grid[y:y + 6, x:x + 6] = 1
+    grid[:10, :10] = 0
+    grid[-10:, -10:] = 0
+    start, goal = (4.0, 4.0, 0.0, 0.0), (25.0, 25.0, np.pi/2, 0.0)
+    
+    for batch_size in (1, 8):
+        planner = HybridAStar(BicycleModel(L=2.7), grid, use_reverse=True)
+        
+        # 记录每个离散状态每次被扩展时的g
+        expanded = defaultdict(list)
+        expand_node, expand_batch = planner.expand_node, planner.expand_batch
+        
+        def record_node(node):
+            expanded[node.index].append(node.g)
+            return expand_node(node)
+        
+        def record_batch(nodes):
+            for node in nodes:
+                expanded[node.index].append(node.g)
+            return expand_batch(nodes)
+        
+        planner.expand_node, planner.expand_batch = record_node, record_batch
+        path = planner.plan(start, goal, verbose=False, batch_size=batch_size)
+        
+        assert path is not None and planner.status == PlanStatus.SUCCESS
+        assert sum(len(g) for g in expanded.values()) == planner.nodes_expanded
+        # 同一状态只有g严格变小时才重新扩展
+        for g in expanded.values():
+            assert all(a > b for a, b in zip(g, g[1:])), "同一状态以不更优的g重复扩展"
+        
+        # 过期的队列项出队即丢弃: 出队数接近扩展数
+        # （只按closed set去重时同一查询出队数约为扩展数的2.4倍）
+        ratio = planner.nodes_visited / planner.nodes_expanded
+        assert ratio < 1.6, f"出队 {planner.nodes_visited} / 扩展 {planner.nodes_expanded}"
+        print(f"✓ k={batch_size}: 扩展 {planner.nodes_expanded}，出队 {planner.nodes_visited}，"
+              f"代价 {planner.path_cost:.1f}，无重复扩展")
+    
+    return True
+
+
+def test_batch_global_search():
+    """测试33: 批量控制器整条路径搜索与逐车控制器一致"""
+    print("\n" + "="*60)
+    print("测试33: 批量控制器整条路径搜索与逐车控制器一致")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController
+    from control.batch_pure_pursuit import BatchPurePursuitController
+    
+    # 发卡形路径: 下边是8 m的长线段，上边是1 m的密集点。
+    # 下边线段中部的车离上边的路径点比离下边的路径点近，
+    # 最近路径点不在最近线段上，两种全局搜索的结果不同
+    lower = np.column_stack([np.arange(0, 41, 8.0), np.zeros(6)])
+    upper = np.column_stack([np.arange(40, -1, -1.0), np.full(41, 6.0)])
+    path = np.vstack([lower, [[44.0, 3.0]], upper])
+    
+    rng = np.random.default_rng(0)
+    m = 200
+    states = np.column_stack([rng.uniform(-2, 46, m), rng.uniform(-3, 9, m),
+                              rng.uniform(-np.pi, np.pi, m), rng.uniform(0, 5, m)])
+    
+    for mode in ('global', 'window'):
+        batch = BatchPurePursuitController(nearest_search=mode)
+        singles = [PurePursuitController(nearest_search=mode) for _ in range(m)]
+        
+        # 第一次查询（未初始化）都走整条路径搜索；'global'模式每个周期都是
+        pos = states.copy()
+        for _ in range(3):
+            steer = batch.control(pos, path)
+            expected = np.array([c.control(pos[i], path) for i, c in enumerate(singles)])
+            segments = [c.geometry['segment'] for c in singles]
+            errors = [c.geometry['cross_track_error'] for c in singles]
+            assert np.array_equal(batch.segment, segments), f"{mode}: 最近线段不一致"
+            assert np.allclose(batch.cross_track_error, errors)
+            assert np.allclose(steer, expected, atol=1e-9)
+            pos[:, :2] += rng.normal(0, 0.3, (m, 2))
+        print(f"✓ {mode}: {m} 辆车的最近线段/横向误差/转向角与逐车控制器一致")
+    
+    return True
+
+
+def test_stateless_default():
+    """测试34: 默认的Pure Pursuit控制器不保存跟踪进度"""
+    print("\n" + "="*60)
+    print("测试34: 默认的Pure Pursuit控制器不保存跟踪进度")
+    print("="*60)
+    
+    import numpy as np
+    from control.pure_pursuit import PurePursuitController
+    from utils.helper import create_circular_path
+    
+    # 环形路径: 终点就在起点旁边，残留的窗口会把起点的车匹配到路径末端
+    path = create_circular_path(20.0)
+    start = np.array([path[0, 0], path[0, 1], path[0, 2], 2.0])
+    
+    reused = PurePursuitController()
+    assert reused.nearest_search == 'global'
+    for point in path[::5]:
+        reused.control(np.array([point[0], point[1], point[2], 2.0]), path)
+    
+    # 同一控制器不调用reset_tracking，直接开始下一圈 → 与新控制器结果相同
+    steer = reused.control(start, path)
+    expected = PurePursuitController().control(start, path)
+    assert steer == expected
+    assert reused.geometry['segment'] == 0
+    print("✓ 复用的默认控制器与新控制器结果相同")
+    
+    # 'window'需要显式开启，并且会保存进度
+    windowed = PurePursuitController(nearest_search='window')
+    for point in path[::5]:
+        windowed.control(np.array([point[0], point[1], point[2], 2.0]), path)
+    assert windowed.tracker.last_segment is not None
+    windowed.reset_tracking()
+    assert windowed.control(start, path) == expected
+    print("✓ 'window'为显式选项，reset_tracking后与新控制器一致")
+    
+    return True
+
+
+def test_mpc_reference_state():
+    """MPC新建后参考路径状态已初始化，缺少参考路径时给出明确错误"""
+    print("\n" + "="*60)
+    print("测试35: MPC参考路径状态初始化")
+    print("="*60)
+    import numpy as np
+    from control.mpc_controller import MPCController
+    
+    mpc = MPCController()
+    assert mpc.reference is None and mpc._heading is None
+    print("✓ 构造后_heading已初始化为None")
+    
+    try:
+        mpc.extract_reference(np.zeros(4), None)
+        assert False, "缺少参考路径时应抛出ValueError"
+    except ValueError:
+        print("✓ 缺少参考路径时抛出ValueError")
+    
+    path = np.column_stack([np.linspace(0, 20, 50), np.zeros(50)])
+    mpc.reset_tracking()
+    x_ref = mpc.extract_reference(np.array([0.0, 0.0, 0.0, 1.0]), path)
+    assert x_ref.shape == (mpc.N + 1, 4) and mpc._heading is not None
+    print("✓ reset_tracking后正常提取参考轨迹")
+    
+    return True
+
+
 def main():
     """运行所有测试"""
     print("\n" + "="*60)
@@ -180,6 +1564,36 @@ def main():
         test_chinese_support,
         test_manim_no_latex,
         test_unicode_symbols,
+        test_footprint_collision,
+        test_linearize_batch,
+        test_batch_pure_pursuit,
+        test_streaming_statistics,
+        test_parameter_sweep,
+        test_campaign_resume,
+        test_realtime_loop,
+        test_speed_profile,
+        test_segment_index,
+        test_hybrid_astar_lesson2,
+        test_arc_braking,
+        test_multi_goal_shared_memory,
+        test_circle_collision,
+        test_multiresolution,
+        test_adaptive_step,
+        test_search_budget,
+        test_batch_expansion,
+        test_search_tree_file,
+        test_direction_lattice,
+        test_step_batch,
+        test_rk_integration,
+        test_rollout,
+        test_state_history,
+        test_window_tracker,
+        test_arc_lookahead,
+        test_fused_geometry,
+        test_lattice_dedup,
+        test_batch_global_search,
+        test_stateless_default,
+        test_mpc_reference_state,
     ]
     
     results = []
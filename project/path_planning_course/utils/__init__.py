@@ -11,6 +11,7 @@ from .visualization import (
     plot_path,
     plot_trajectory,
     plot_vehicle,
+    plot_search_tree,
     animate_path_following
 )
 
@@ -29,6 +30,7 @@ __all__ = [
     'plot_path',
     'plot_trajectory',
     'plot_vehicle',
+    'plot_search_tree',
     'animate_path_following',
     # Helper
     'create_grid_map',
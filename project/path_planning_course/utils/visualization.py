@@ -7,6 +7,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle, FancyArrow
+from matplotlib.collections import LineCollection
 from matplotlib.animation import FuncAnimation
 from typing import Optional, List
 
@@ -353,6 +354,47 @@ def plot_vehicle(
     ax.fill(corners_world[:, 0], corners_world[:, 1], color=color, alpha=0.3)
 
 
+def plot_search_tree(
+    tree,
+    max_edges: int = 200000,
+    color_by: str = 'g',
+    ax: Optional[plt.Axes] = None
+) -> plt.Axes:
+    """
+    绘制导出的Hybrid A*搜索树
+    
+    Args:
+        tree: 搜索树读取器（algorithms.search_tree_io.SearchTreeReader）
+        max_edges: 最多绘制的连线数，节点更多时自动抽稀
+        color_by: 着色依据的列（'g'、'h'或'node_id'）
+        ax: axes对象
+    
+    Returns:
+        ax: axes对象
+    """
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 10))
+    
+    # 与load_edges相同的抽稀，颜色和连线一一对应（node_id总是会返回）
+    edges = tree.load_edges(max_nodes=max_edges)
+    columns = ('parent_id',) if color_by == 'node_id' else ('parent_id', color_by)
+    data = tree.load(columns=columns, max_nodes=max_edges)
+    values = data[color_by][data['parent_id'] >= 0]
+    
+    lines = LineCollection(edges, cmap='viridis', linewidths=0.5, alpha=0.6)
+    lines.set_array(np.asarray(values, dtype=float))
+    ax.add_collection(lines)
+    ax.autoscale()
+    plt.colorbar(lines, ax=ax, label=color_by)
+    
+    ax.set_xlabel('X (m)', fontsize=12)
+    ax.set_ylabel('Y (m)', fontsize=12)
+    ax.set_title(f'Search Tree ({len(tree)} nodes, {len(edges)} shown)', fontsize=14)
+    ax.axis('equal')
+    
+    return ax
+
+
 def animate_path_following(
     trajectory: np.ndarray,
     ref_path: np.ndarray,
@@ -3,9 +3,14 @@
 
 包含:
 - 自行车运动学模型 (vehicle.bicycle_model)
+- 紧凑状态存储 (vehicle.bicycle_model: StateHistory, CompactVehicleState)
 """
 
-from .bicycle_model import BicycleModel
-
-__all__ = ['BicycleModel']
+from .bicycle_model import BicycleModel, CompactVehicleState, StateHistory, STATE_DTYPE
 
+__all__ = [
+    'BicycleModel',
+    'CompactVehicleState',
+    'StateHistory',
+    'STATE_DTYPE',
+]
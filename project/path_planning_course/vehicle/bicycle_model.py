@@ -24,7 +24,7 @@
 """
 
 import numpy as np
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from dataclasses import dataclass
 
 
@@ -57,6 +57,146 @@ class VehicleState:
         return f"VehicleState(x={self.x:.2f}, y={self.y:.2f}, θ={np.rad2deg(self.theta):.1f}°, v={self.v:.2f})"
 
 
+# 状态历史的结构化dtype: 每条记录32字节，与 (N, 4) float64 数组内存布局相同
+STATE_DTYPE = np.dtype([
+    ('x', np.float64),
+    ('y', np.float64),
+    ('theta', np.float64),
+    ('v', np.float64),
+])
+
+
+class CompactVehicleState:
+    """
+    轻量车辆状态（__slots__，无实例字典）
+    
+    只保存 (数组, 行号) 两个引用，不复制数据。由StateHistory创建时，
+    数组就是历史数据本身: 读写属性直接读写历史数组中对应的行（零拷贝）
+    
+    与VehicleState接口相同: x, y, theta, v, to_array(), from_array()
+    """
+    __slots__ = ('_buf', '_i')
+    
+    def __init__(self, x: float = 0.0, y: float = 0.0, theta: float = 0.0, v: float = 0.0):
+        self._buf = np.array([[x, y, theta, v]], dtype=np.float64)
+        self._i = 0
+    
+    @classmethod
+    def view(cls, buf: np.ndarray, i: int) -> 'CompactVehicleState':
+        """引用 (N, 4) float64 数组的第i行（不复制）"""
+        state = cls.__new__(cls)
+        state._buf = buf
+        state._i = i
+        return state
+    
+    @property
+    def x(self) -> float:
+        return float(self._buf[self._i, 0])
+    
+    @x.setter
+    def x(self, value: float):
+        self._buf[self._i, 0] = value
+    
+    @property
+    def y(self) -> float:
+        return float(self._buf[self._i, 1])
+    
+    @y.setter
+    def y(self, value: float):
+        self._buf[self._i, 1] = value
+    
+    @property
+    def theta(self) -> float:
+        return float(self._buf[self._i, 2])
+    
+    @theta.setter
+    def theta(self, value: float):
+        self._buf[self._i, 2] = value
+    
+    @property
+    def v(self) -> float:
+        return float(self._buf[self._i, 3])
+    
+    @v.setter
+    def v(self, value: float):
+        self._buf[self._i, 3] = value
+    
+    def to_array(self) -> np.ndarray:
+        """状态数组 [x, y, θ, v]（视图，修改会写回）"""
+        return self._buf[self._i]
+    
+    @staticmethod
+    def from_array(arr: np.ndarray) -> 'CompactVehicleState':
+        """从numpy数组创建（复制）"""
+        return CompactVehicleState(arr[0], arr[1], arr[2], arr[3])
+    
+    def __str__(self) -> str:
+        return f"CompactVehicleState(x={self.x:.2f}, y={self.y:.2f}, θ={np.rad2deg(self.theta):.1f}°, v={self.v:.2f})"
+
+
+class StateHistory:
+    """
+    状态历史存储（预分配的结构化数组，按需翻倍扩容）
+    
+    用法:
+        >>> history = StateHistory(capacity=1000)
+        >>> history.append(state)            # state: [x, y, θ, v]
+        >>> history.records['x']             # 结构化视图，按字段访问
+        >>> history.states                   # (N, 4) float64 视图，可直接传给step_batch等
+        >>> history[-1].theta                # CompactVehicleState，零拷贝
+    
+    相比每步创建VehicleState对象的列表，内存只有数据本身（32字节/步），
+    也不需要在最后再转换成数组
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._buffer = np.empty(max(1, capacity), dtype=STATE_DTYPE)
+        self._flat = self._buffer.view(np.float64).reshape(-1, 4)  # 同一块内存的 (capacity, 4) 视图
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def records(self) -> np.ndarray:
+        """已写入部分的结构化数组视图 (N,)"""
+        return self._buffer[:self._size]
+    
+    @property
+    def states(self) -> np.ndarray:
+        """已写入部分的 (N, 4) float64 视图"""
+        return self._flat[:self._size]
+    
+    def _reserve(self, size: int):
+        if size > len(self._buffer):
+            capacity = max(size, 2 * len(self._buffer))
+            buffer = np.empty(capacity, dtype=STATE_DTYPE)
+            buffer[:self._size] = self._buffer[:self._size]
+            self._buffer = buffer
+            self._flat = buffer.view(np.float64).reshape(-1, 4)
+    
+    def append(self, state: np.ndarray):
+        """追加一个状态 [x, y, θ, v]"""
+        self._reserve(self._size + 1)
+        self._flat[self._size] = state
+        self._size += 1
+    
+    def extend(self, states: np.ndarray):
+        """追加一批状态 (M, 4)"""
+        states = np.asarray(states, dtype=np.float64).reshape(-1, 4)
+        self._reserve(self._size + len(states))
+        self._flat[self._size:self._size + len(states)] = states
+        self._size += len(states)
+    
+    def __getitem__(self, i: int) -> CompactVehicleState:
+        """第i个状态（零拷贝视图；扩容后旧视图不再跟随新数据）"""
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(f"状态索引越界: {i}")
+        return CompactVehicleState.view(self._flat, i)
+
+
 class BicycleModel:
     """
     自行车运动学模型
@@ -78,7 +218,9 @@ class BicycleModel:
         L: float = 2.7,
         delta_max: float = np.deg2rad(35),
         v_max: float = 5.0,
-        a_max: float = 2.0
+        a_max: float = 2.0,
+        length: Optional[float] = None,
+        width: float = 1.5
     ):
         """
         初始化车辆模型
@@ -88,6 +230,8 @@ class BicycleModel:
             delta_max: 最大转向角 (rad)，典型值: 35°
             v_max: 最大速度 (m/s)，典型值: 5 m/s
             a_max: 最大加速度 (m/s²)，典型值: 2 m/s²
+            length: 车身长度 (m)，默认 1.2·L（与plot_vehicle一致）
+            width: 车身宽度 (m)，典型值: 1.5-1.9m
         
         注意:
             - 轿车轴距通常在2.5-3.0m
@@ -98,6 +242,8 @@ class BicycleModel:
         self.delta_max = delta_max
         self.v_max = v_max
         self.a_max = a_max
+        self.length = L * 1.2 if length is None else length
+        self.width = width
         
         # 计算最小转弯半径
         self.R_min = self.calc_min_turning_radius()
@@ -106,6 +252,7 @@ class BicycleModel:
         print(f"  轴距 L = {L:.2f} m")
         print(f"  最大转向角 = {np.rad2deg(delta_max):.1f}°")
         print(f"  最大速度 = {v_max:.2f} m/s")
+        print(f"  车身尺寸 = {self.length:.2f} × {self.width:.2f} m")
         print(f"  最小转弯半径 = {self.R_min:.2f} m")
     
     def calc_min_turning_radius(self) -> float:
@@ -147,7 +294,8 @@ class BicycleModel:
         self, 
         state: np.ndarray, 
         control: np.ndarray, 
-        dt: float = 0.1
+        dt: float = 0.1,
+        method: str = 'euler'
     ) -> np.ndarray:
         """
         执行一步仿真，更新车辆状态
@@ -159,6 +307,9 @@ class BicycleModel:
             state: 当前状态 [x, y, θ, v]
             control: 控制输入 [δ, a]
             dt: 时间步长 (s)，典型值: 0.1s (10Hz)
+            method: 积分方法
+                - 'euler': 欧拉法（默认）
+                - 'arc': 精确圆弧积分，转向角不变时任意dt都没有误差
         
         Returns:
             new_state: 新状态 [x', y', θ', v']
@@ -171,6 +322,8 @@ class BicycleModel:
         
         注意:
             - 使用欧拉法时，dt不宜过大（建议≤0.1s）
+            - 'arc'的行驶距离考虑步内速度截断: 刹停或加速到v_max之后
+              按截断后的速度行驶（见arc_distance），从静止刹车不会后退
             - 控制输入会被限制在物理约束范围内
             - 速度为负值时，车辆后退
         """
@@ -185,6 +338,14 @@ class BicycleModel:
         # 限制加速度在 [-a_max, a_max] 范围内
         a = np.clip(a, -self.a_max, self.a_max)
         
+        if method == 'arc':
+            # 行驶距离按（带速度截断的）匀加速计算，位姿沿圆弧（或直线）精确更新
+            s_dist, v_new = self.arc_distance(v, a, dt)
+            x_new, y_new, theta_new = self.arc_pose(x, y, theta, s_dist, delta)
+            return np.array([x_new, y_new, theta_new, float(v_new)])
+        elif method != 'euler':
+            raise ValueError(f"未知的积分方法: {method}")
+        
         # ===== 2. 应用运动学方程 =====
         # 计算速度分量
         x_dot = v * np.cos(theta)  # X方向速度
@@ -213,6 +374,127 @@ class BicycleModel:
         
         return np.array([x_new, y_new, theta_new, v_new])
     
+    def arc_distance(self, v, a, dt):
+        """
+        加速度a持续dt时的行驶距离和末速度（速度截断在 [0, v_max]）
+        
+        速度在步内到达0或v_max时，只在到达之前匀加速:
+            t_acc = clip((v' - v)/a, 0, dt)，v' = clip(v + a·dt, 0, v_max)
+            s = v·t_acc + a·t_acc²/2 + v'·(dt - t_acc)
+        刹停后原地不动（s不会为负），到达v_max后匀速行驶
+        
+        Args:
+            v, a, dt: 初速度、加速度（已限幅）、时间步长，标量或数组（可广播）
+        
+        Returns:
+            (s, v'): 行驶距离 (m)、末速度 (m/s)
+        """
+        v_end = np.clip(v + a * dt, 0, self.v_max)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_acc = np.where(a != 0, (v_end - v) / a, dt)
+        t_acc = np.clip(t_acc, 0, dt)
+        s = v * t_acc + 0.5 * a * t_acc**2 + v_end * (dt - t_acc)
+        return s, v_end
+    
+    def arc_pose(self, x, y, theta, s, delta):
+        """
+        转向角不变时，沿圆弧行驶距离s后的精确位姿
+        
+        Args:
+            x, y, theta: 起始位姿，标量或数组（可广播）
+            s: 行驶距离 (m)，负值表示后退
+            delta: 转向角 (rad)，调用方负责限幅
+        
+        Returns:
+            (x', y', θ'): 终点位姿，θ'已归一化到 [-π, π]
+        
+        公式（曲率 κ = tan(δ)/L，航向变化 Δθ = κ·s）:
+            弦长 c = s·sin(Δθ/2)/(Δθ/2)
+            x' = x + c·cos(θ + Δθ/2)
+            y' = y + c·sin(θ + Δθ/2)
+        
+        直线（δ=0）时 sin(u)/u → 1，弦长就是s，
+        np.sinc在u=0处取1，不需要单独分支
+        """
+        dtheta = s * np.tan(delta) / self.L
+        chord = s * np.sinc(dtheta / (2 * np.pi))  # np.sinc(u) = sin(πu)/(πu)
+        mid = theta + 0.5 * dtheta
+        
+        x_new = x + chord * np.cos(mid)
+        y_new = y + chord * np.sin(mid)
+        theta_new = np.arctan2(np.sin(theta + dtheta), np.cos(theta + dtheta))
+        
+        return x_new, y_new, theta_new
+    
+    def step_batch(
+        self,
+        states: np.ndarray,
+        controls: np.ndarray,
+        dt: float = 0.1,
+        out: Optional[np.ndarray] = None,
+        method: str = 'euler'
+    ) -> np.ndarray:
+        """
+        批量仿真一步（与step一致，M个状态一次向量化计算）
+        
+        Args:
+            states: 当前状态 (M, 4)
+            controls: 控制输入 (M, 2)，或 (2,) 表示所有状态共用同一控制
+            dt: 时间步长 (s)，标量或 (M,)
+            out: 输出数组 (M, 4)，None时新建；
+                可以就是states本身（原地更新），循环中反复传入同一数组即可避免分配
+            method: 积分方法，'euler' 或 'arc'（同step）
+        
+        Returns:
+            new_states: 新状态 (M, 4)（传入out时就是out）
+        
+        示例:
+            >>> states = np.zeros((1000, 4)); states[:, 3] = 2.0
+            >>> controls = np.tile([np.deg2rad(10), 0.0], (1000, 1))
+            >>> buf = np.empty_like(states)
+            >>> for _ in range(100):
+            ...     vehicle.step_batch(states, controls, 0.1, out=buf)
+            ...     states, buf = buf, states
+        """
+        states = np.asarray(states, dtype=float)
+        controls = np.asarray(controls, dtype=float)
+        if out is None:
+            out = np.empty_like(states)
+        
+        x, y, theta, v = states[:, 0], states[:, 1], states[:, 2], states[:, 3]
+        
+        # 约束控制输入
+        delta = np.clip(controls[..., 0], -self.delta_max, self.delta_max)
+        a = np.clip(controls[..., 1], -self.a_max, self.a_max)
+        
+        if method == 'arc':
+            s_dist, v_new = self.arc_distance(v, a, dt)
+            x_new, y_new, theta_new = self.arc_pose(x, y, theta, s_dist, delta)
+            out[:, 0] = x_new
+            out[:, 1] = y_new
+            out[:, 2] = theta_new
+            out[:, 3] = v_new
+            return out
+        elif method != 'euler':
+            raise ValueError(f"未知的积分方法: {method}")
+        
+        # 先算完所有依赖旧状态的量，out与states是同一数组时也安全
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        theta_dot = v * np.tan(delta) / self.L
+        
+        # 欧拉积分（列顺序保证v最后才被覆盖）
+        out[:, 0] = x + v * cos_theta * dt
+        out[:, 1] = y + v * sin_theta * dt
+        out[:, 2] = theta + theta_dot * dt
+        out[:, 3] = v + a * dt
+        
+        # 约束状态: 速度限制在 [0, v_max]，角度归一化到 [-π, π]
+        np.clip(out[:, 3], 0, self.v_max, out=out[:, 3])
+        np.arctan2(np.sin(out[:, 2]), np.cos(out[:, 2]), out=out[:, 2])
+        
+        return out
+    
     def step_with_reverse(
         self, 
         state: np.ndarray, 
@@ -248,24 +530,151 @@ class BicycleModel:
         
         return new_state
     
+    def linearize_batch(
+        self,
+        states: np.ndarray,
+        controls: np.ndarray,
+        dt: float = 0.1
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        整个时域的离散时间雅可比矩阵（欧拉离散化，一次向量化计算）
+        
+        对 x[k+1] = x[k] + f(x[k], u[k])·dt 求偏导:
+            A[k] = ∂x[k+1]/∂x[k]，B[k] = ∂x[k+1]/∂u[k]
+        （不考虑step中速度截断和角度归一化，与MPCController.linearize一致）
+        
+        Args:
+            states: 参考状态序列 (N, 4)
+            controls: 参考控制序列 (N, 2)
+            dt: 时间步长 (s)
+        
+        Returns:
+            (A, B): 形状 (N, 4, 4) 和 (N, 4, 2)
+        
+        非零元素:
+            A = I + dt·[[0, 0, -v·sinθ, cosθ       ],
+                        [0, 0,  v·cosθ, sinθ       ],
+                        [0, 0,  0,      tanδ/L     ],
+                        [0, 0,  0,      0          ]]
+            B = dt·[[0,               0],
+                    [0,               0],
+                    [v/(L·cos²δ),     0],
+                    [0,               1]]
+        """
+        states = np.asarray(states, dtype=float)
+        controls = np.asarray(controls, dtype=float)
+        n = len(states)
+        
+        theta, v = states[:, 2], states[:, 3]
+        delta = controls[:, 0]
+        cos_theta = np.cos(theta)
+        sin_theta = np.sin(theta)
+        
+        A = np.zeros((n, 4, 4))
+        A[:, [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+        A[:, 0, 2] = -v * sin_theta * dt
+        A[:, 0, 3] = cos_theta * dt
+        A[:, 1, 2] = v * cos_theta * dt
+        A[:, 1, 3] = sin_theta * dt
+        A[:, 2, 3] = np.tan(delta) / self.L * dt
+        
+        B = np.zeros((n, 4, 2))
+        B[:, 2, 0] = v / (self.L * np.cos(delta)**2) * dt
+        B[:, 3, 1] = dt
+        
+        return A, B
+    
+    def derivatives(self, state: np.ndarray, delta: float, a: float) -> np.ndarray:
+        """
+        连续时间运动学方程的右端 ṡ = f(s, u)
+        
+        Args:
+            state: 状态 [x, y, θ, v]
+            delta: 转向角 (rad)，调用方负责限幅
+            a: 加速度 (m/s²)，调用方负责限幅
+        
+        Returns:
+            [ẋ, ẏ, θ̇, v̇]
+        
+        速度达到 [0, v_max] 边界且加速度继续向外时 v̇=0（与step的截断一致）
+        """
+        x, y, theta, v = state
+        if (v >= self.v_max and a > 0) or (v <= 0 and a < 0):
+            a = 0.0
+        return np.array([
+            v * np.cos(theta),
+            v * np.sin(theta),
+            v * np.tan(delta) / self.L,
+            a
+        ])
+    
+    def _rk4_step(self, state: np.ndarray, delta: float, a: float, h: float) -> np.ndarray:
+        """经典四阶Runge-Kutta积分一步（控制量在步内不变）"""
+        k1 = self.derivatives(state, delta, a)
+        k2 = self.derivatives(state + 0.5 * h * k1, delta, a)
+        k3 = self.derivatives(state + 0.5 * h * k2, delta, a)
+        k4 = self.derivatives(state + h * k3, delta, a)
+        return state + h / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
+    
+    def _dopri_step(
+        self,
+        state: np.ndarray,
+        delta: float,
+        a: float,
+        h: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dormand-Prince 5(4) 嵌入式积分一步
+        
+        Returns:
+            (new_state, error): 五阶解和（五阶 - 四阶）误差估计
+        """
+        k1 = self.derivatives(state, delta, a)
+        k2 = self.derivatives(state + h * (1/5 * k1), delta, a)
+        k3 = self.derivatives(state + h * (3/40 * k1 + 9/40 * k2), delta, a)
+        k4 = self.derivatives(state + h * (44/45 * k1 - 56/15 * k2 + 32/9 * k3), delta, a)
+        k5 = self.derivatives(state + h * (19372/6561 * k1 - 25360/2187 * k2
+                                           + 64448/6561 * k3 - 212/729 * k4), delta, a)
+        k6 = self.derivatives(state + h * (9017/3168 * k1 - 355/33 * k2 + 46732/5247 * k3
+                                           + 49/176 * k4 - 5103/18656 * k5), delta, a)
+        new_state = state + h * (35/384 * k1 + 500/1113 * k3 + 125/192 * k4
+                                 - 2187/6784 * k5 + 11/84 * k6)
+        k7 = self.derivatives(new_state, delta, a)
+        
+        error = h * ((35/384 - 5179/57600) * k1 + (500/1113 - 7571/16695) * k3
+                     + (125/192 - 393/640) * k4 + (-2187/6784 + 92097/339200) * k5
+                     + (11/84 - 187/2100) * k6 - 1/40 * k7)
+        return new_state, error
+    
     def simulate_trajectory(
         self,
         initial_state: np.ndarray,
         controls: List[np.ndarray],
-        dt: float = 0.1
+        dt: float = 0.1,
+        method: str = 'euler',
+        tol: float = 1e-6
     ) -> np.ndarray:
         """
         模拟整条轨迹
         
         Args:
             initial_state: 初始状态 [x, y, θ, v]
-            controls: 控制序列 [(δ₁, a₁), (δ₂, a₂), ...]
-            dt: 时间步长 (s)
+            controls: 控制序列 [(δ₁, a₁), (δ₂, a₂), ...]，每个控制保持dt
+            dt: 时间步长 (s)，也是输出状态的时间间隔
+            method: 积分方法
+                - 'euler': 欧拉法（默认），每个dt一步
+                - 'arc': 精确圆弧积分（见step）
+                - 'rk4': 经典四阶Runge-Kutta，每个dt一步
+                - 'rk45': Dormand-Prince 5(4) 自适应步长，
+                  内部步长由误差控制决定，输出仍在 k·dt 时刻
+            tol: 'rk45'的误差容限，每步误差满足 |e| ≤ tol·(1 + |s|)
         
         Returns:
             trajectory: 轨迹数组，形状为 (N+1, 4)
                        第一行是初始状态，后续是每一步的状态
         
+        积分统计（步数、拒绝步数）保存在 self.integration_stats 中
+        
         示例:
             >>> controls = [
             ...     [np.deg2rad(10), 0.5],  # 右转，加速
@@ -273,15 +682,123 @@ class BicycleModel:
             ...     [0, -0.5],              # 直行，减速
             ... ]
             >>> traj = vehicle.simulate_trajectory(init_state, controls)
+            >>> traj = vehicle.simulate_trajectory(init_state, controls, dt=0.5, method='rk45')
+        """
+        self.integration_stats = {'steps': 0, 'rejected': 0}
+        
+        if method in ('euler', 'arc'):
+            # 预分配整条轨迹，逐行写入（不再先append到列表再转换）
+            trajectory = np.empty((len(controls) + 1, 4))
+            trajectory[0] = initial_state
+            
+            for k, control in enumerate(controls):
+                trajectory[k + 1] = self.step(trajectory[k], control, dt, method=method)
+            
+            self.integration_stats['steps'] = len(controls)
+            return trajectory
+        
+        if method not in ('rk4', 'rk45'):
+            raise ValueError(f"未知的积分方法: {method}")
+        
+        trajectory = np.empty((len(controls) + 1, 4))
+        trajectory[0] = initial_state
+        state = np.asarray(initial_state, dtype=float).copy()
+        h = dt  # 自适应步长在控制区间之间延续
+        
+        for k, (delta, a) in enumerate(controls):
+            delta = np.clip(delta, -self.delta_max, self.delta_max)
+            a = np.clip(a, -self.a_max, self.a_max)
+            
+            if method == 'rk4':
+                state = self._rk4_step(state, delta, a, dt)
+                state[3] = np.clip(state[3], 0, self.v_max)
+                self.integration_stats['steps'] += 1
+            else:
+                # 在 [0, dt] 内自适应积分，最后一步截短以正好落在输出时刻
+                t = 0.0
+                while t < dt - 1e-12:
+                    h_try = min(h, dt - t)
+                    new_state, error = self._dopri_step(state, delta, a, h_try)
+                    scale = tol * (1.0 + np.maximum(np.abs(state), np.abs(new_state)))
+                    err = np.max(np.abs(error) / scale)
+                    
+                    # 步长调整: 五阶方法误差 ∝ h⁵，安全系数0.9，单次缩放限制在[0.2, 5]
+                    factor = 5.0 if err == 0 else min(5.0, max(0.2, 0.9 * err ** -0.2))
+                    if err <= 1.0:
+                        t += h_try
+                        state = new_state
+                        state[3] = np.clip(state[3], 0, self.v_max)
+                        self.integration_stats['steps'] += 1
+                        # 只是为了对齐输出时刻而截短的步，不用它缩小下一步
+                        if h_try == h or factor > 1.0:
+                            h = h_try * factor
+                    else:
+                        h = h_try * factor
+                        self.integration_stats['rejected'] += 1
+            
+            trajectory[k + 1] = state
+            trajectory[k + 1, 2] = self.normalize_angle(state[2])
+        
+        return trajectory
+    
+    def rollout(
+        self,
+        initial_states: np.ndarray,
+        controls: np.ndarray,
+        dt: float = 0.1,
+        method: str = 'euler',
+        noise_std: Optional[np.ndarray] = None,
+        rng: Optional[np.random.Generator] = None,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
-        trajectory = [initial_state.copy()]
-        state = initial_state.copy()
+        批量开环仿真（蒙特卡洛rollout）
         
-        for control in controls:
-            state = self.step(state, control, dt)
-            trajectory.append(state.copy())
+        R条控制序列同时仿真: 时间方向是Python循环（T次），
+        每个时刻用step_batch对R个状态一次向量化计算，结果直接写入预分配数组
         
-        return np.array(trajectory)
+        Args:
+            initial_states: 初始状态 (4,)（所有rollout相同）或 (R, 4)
+            controls: 控制序列 (R, T, 2)
+            dt: 时间步长 (s)
+            method: 积分方法，'euler' 或 'arc'（同step_batch）
+            noise_std: 过程噪声标准差 (4,)，每步在状态上叠加
+                N(0, diag(noise_std²))，None表示无噪声
+            rng: 随机数生成器，默认 np.random.default_rng()
+            out: 输出数组 (R, T+1, 4)，None时新建；反复调用时传入同一数组可避免分配
+        
+        Returns:
+            trajectories: (R, T+1, 4)，[:, 0] 为初始状态
+        
+        示例（1000条带噪声的rollout，用于采样式控制或鲁棒性分析）:
+            >>> controls = np.zeros((1000, 50, 2)); controls[..., 0] = np.deg2rad(10)
+            >>> trajs = vehicle.rollout([0, 0, 0, 2.0], controls, dt=0.1,
+            ...                         noise_std=[0.02, 0.02, 0.01, 0.05])
+        """
+        controls = np.asarray(controls, dtype=float)
+        n_rollouts, horizon, _ = controls.shape
+        if out is None:
+            out = np.empty((n_rollouts, horizon + 1, 4))
+        out[:, 0] = initial_states
+        
+        if noise_std is not None:
+            noise_std = np.asarray(noise_std, dtype=float)
+            if rng is None:
+                rng = np.random.default_rng()
+            noise = np.empty((n_rollouts, 4))
+        
+        for t in range(horizon):
+            state = self.step_batch(out[:, t], controls[:, t], dt, out=out[:, t + 1], method=method)
+            
+            if noise_std is not None:
+                rng.standard_normal(out=noise)
+                noise *= noise_std
+                state += noise
+                # 噪声后重新施加状态约束
+                np.clip(state[:, 3], 0, self.v_max, out=state[:, 3])
+                np.arctan2(np.sin(state[:, 2]), np.cos(state[:, 2]), out=state[:, 2])
+        
+        return out
     
     def calc_turning_radius(self, delta: float) -> float:
         """